@@ -1,12 +1,23 @@
 from django.contrib import admin
-from .models import Athlete, AgeCategory, Discipline
+from common.admin import SoftDeleteAdmin
+from common.paginators import EstimatedCountPaginator
+from .models import Athlete, AgeCategory, Club, ClubMembership, Discipline
 # Register your models here.
 
+class ClubMembershipInline(admin.TabularInline):
+    model = ClubMembership
+    extra = 0
+    autocomplete_fields = ['athlete', 'club']
+
 @admin.register(Athlete)
-class AthletesAdmin(admin.ModelAdmin):
+class AthletesAdmin(SoftDeleteAdmin):
     list_display = ['first_name', 'last_name', 'nationality', 'birth_date', 'gender']
     search_fields = ['first_name', 'last_name']
     list_filter = ['nationality', 'gender']
+    autocomplete_fields = ['disciplines']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    inlines = [ClubMembershipInline]
 
 @admin.register(AgeCategory)
 class AgeCategoriesAdmin(admin.ModelAdmin):
@@ -19,3 +30,10 @@ class DisciplineAdmin(admin.ModelAdmin):
     list_display = ['name']
     search_fields = ['name']
     list_filter = ['name']
+
+@admin.register(Club)
+class ClubAdmin(admin.ModelAdmin):
+    list_display = ['name', 'short_name', 'city', 'country']
+    search_fields = ['name', 'short_name', 'city']
+    list_filter = ['country']
+    inlines = [ClubMembershipInline]
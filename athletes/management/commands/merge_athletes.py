@@ -0,0 +1,49 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from athletes.matching import AthleteMatcher, merge_athletes
+from athletes.models import Athlete
+
+
+class Command(BaseCommand):
+    help = (
+        'Merge duplicate athletes into one: move their results, records, disciplines and club memberships in bulk and '
+        'delete them. Duplicates whose memberships overlap are not merged. '
+        'Either pass the athlete to keep and its duplicates, or use --find to list likely duplicates.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('ids', nargs='*', type=int, help='id of the athlete to keep, then the duplicate ids')
+        parser.add_argument('--find', action='store_true', help='list groups of likely duplicates')
+        parser.add_argument('--apply', action='store_true', help='with --find, merge every group into its oldest athlete')
+
+    def handle(self, *args, **options):
+        if options['find']:
+            return self.find(options['apply'])
+
+        if len(options['ids']) < 2:
+            raise CommandError('Pass the id of the athlete to keep followed by at least one duplicate id.')
+        keep_id, *duplicate_ids = options['ids']
+        athletes = Athlete.all_objects.in_bulk(options['ids'])  # --find lists soft-deleted athletes too
+        missing = set(options['ids']) - set(athletes)
+        if missing:
+            raise CommandError(f'Unknown athlete ids: {", ".join(map(str, sorted(missing)))}')
+
+        try:
+            moved = merge_athletes(athletes[keep_id], [athletes[pk] for pk in duplicate_ids])
+        except ValidationError as e:
+            raise CommandError(' '.join(e.messages))
+        self.stdout.write(self.style.SUCCESS(f'Merged {len(duplicate_ids)} athletes into {athletes[keep_id]}, moved {moved} results.'))
+
+    def find(self, apply: bool):
+        groups = AthleteMatcher().duplicate_groups()
+        for keep, *duplicates in groups:
+            names = ', '.join(f'{athlete} (#{athlete.pk})' for athlete in duplicates)
+            self.stdout.write(f'{keep} (#{keep.pk}), born {keep.birth_date}, {keep.nationality}: {names}')
+            if apply:
+                try:
+                    moved = merge_athletes(keep, duplicates)
+                except ValidationError as e:
+                    self.stdout.write(self.style.WARNING(f'  not merged: {" ".join(e.messages)}'))
+                    continue
+                self.stdout.write(self.style.SUCCESS(f'  merged, moved {moved} results'))
+        self.stdout.write(f'{len(groups)} groups of duplicates found.')
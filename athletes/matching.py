@@ -0,0 +1,149 @@
+from collections import defaultdict
+from datetime import date
+from difflib import SequenceMatcher
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from records.clubs import schedule_club_standings_refresh
+from records.head_to_head import schedule_head_to_head_refresh
+from records.models import Results, ArchivedResult, Record
+from records.snapshot import mark_stale
+from records.utils import bump_results_version
+from .models import Athlete, ClubMembership
+from .utils import normalize, name_key
+
+# minimum name similarity (0-1) for a fuzzy match within a block
+FUZZY_THRESHOLD = 0.85
+
+
+def block_key(birth_date: date, nationality: str) -> tuple:
+    return birth_date, normalize(nationality)
+
+
+class AthleteMatcher:
+    """
+    In-memory matching index of athletes for imports. Rows are resolved by an exact
+    (name key, birth date, nationality) lookup, then by fuzzy name similarity among the
+    few athletes sharing the birth date and nationality block. Both are O(1) per row in the
+    number of athletes, so imports no longer need a query (or a duplicate) per row.
+    """
+
+    def __init__(self, athletes=None):
+        self.exact = {}
+        self.blocks = defaultdict(list)
+        if athletes is None:
+            # soft-deleted athletes too, so an import does not recreate a hidden athlete as a duplicate
+            athletes = Athlete.all_objects.only('id', 'first_name', 'last_name', 'nationality', 'birth_date', 'gender', 'name_key')
+        for athlete in athletes:
+            self.add(athlete)
+
+    def add(self, athlete: Athlete) -> None:
+        key = athlete.name_key or name_key(athlete.first_name, athlete.last_name)
+        block = block_key(athlete.birth_date, athlete.nationality)
+        self.exact.setdefault((key, *block), athlete)
+        self.blocks[block].append((key, athlete))
+
+    def match(self, first_name: str, last_name: str, birth_date: date, nationality: str,
+              gender: str | None = None) -> Athlete | None:
+        key = name_key(first_name, last_name)
+        block = block_key(birth_date, nationality)
+        athlete = self.exact.get((key, *block))
+        if athlete is not None:
+            return athlete
+
+        best, best_score = None, FUZZY_THRESHOLD
+        for candidate_key, candidate in self.blocks.get(block, ()):
+            if gender and candidate.gender != gender:
+                continue
+            score = SequenceMatcher(None, key, candidate_key).ratio()
+            if score >= best_score:
+                best, best_score = candidate, score
+        return best
+
+    def get_or_create(self, **athlete_data) -> tuple[Athlete, bool]:
+        """
+        Drop-in replacement for Athlete.objects.get_or_create(**athlete_data) that tolerates
+        spelling differences in names.
+        """
+        athlete = self.match(
+            athlete_data['first_name'],
+            athlete_data['last_name'],
+            athlete_data['birth_date'],
+            athlete_data['nationality'],
+            athlete_data.get('gender'),
+        )
+        if athlete is not None:
+            return athlete, False
+        athlete = Athlete.objects.create(**athlete_data)
+        self.add(athlete)
+        return athlete, True
+
+    def duplicate_groups(self) -> list[list[Athlete]]:
+        """
+        Groups of indexed athletes that match each other, the oldest (lowest id) first.
+        """
+        groups = []
+        for members in self.blocks.values():
+            remaining = sorted((athlete for _, athlete in members), key=lambda athlete: athlete.pk)
+            while remaining:
+                keep, *rest = remaining
+                keep_key = keep.name_key or name_key(keep.first_name, keep.last_name)
+                group = [keep] + [
+                    athlete for athlete in rest
+                    if athlete.gender == keep.gender and SequenceMatcher(
+                        None, keep_key, athlete.name_key or name_key(athlete.first_name, athlete.last_name)
+                    ).ratio() >= FUZZY_THRESHOLD
+                ]
+                if len(group) > 1:
+                    groups.append(group)
+                remaining = [athlete for athlete in rest if athlete not in group]
+        return groups
+
+
+def merge_athletes(keep: Athlete, duplicates: list[Athlete]) -> int:
+    """
+    Move everything of duplicates onto keep with a few bulk statements, then delete them.
+    Returns the number of results moved. Raises ValidationError, and merges nothing, when a
+    club membership of a duplicate overlaps one of keep's at another club or dates.
+    """
+    duplicate_ids = [athlete.pk for athlete in duplicates if athlete.pk != keep.pk]
+    if not duplicate_ids:
+        return 0
+
+    links = Athlete.disciplines.through
+    with transaction.atomic():
+        competition_ids = set(
+            Results.objects.filter(athlete_id__in=duplicate_ids).values_list('competition_id', flat=True)
+        )
+        _move_memberships(keep, duplicate_ids)
+        moved = Results.objects.filter(athlete_id__in=duplicate_ids).update(athlete=keep)
+        Record.objects.filter(athlete_id__in=duplicate_ids).update(athlete=keep)
+        ArchivedResult.objects.filter(athlete_id__in=duplicate_ids).update(athlete=keep)  # the delete would cascade to them
+        discipline_ids = set(
+            links.objects.filter(athlete_id__in=duplicate_ids).values_list('discipline_id', flat=True)
+        )
+        keep.disciplines.add(*discipline_ids)  # one insert of the links keep does not have yet
+        Athlete.all_objects.filter(pk__in=duplicate_ids).delete()
+
+        # update() sends no signals, so refresh what records.signals would
+        schedule_head_to_head_refresh({keep.pk, *duplicate_ids})
+        schedule_club_standings_refresh(competition_ids)  # the results may count for keep's club now
+        bump_results_version()
+        mark_stale()
+    return moved
+
+
+def _move_memberships(keep: Athlete, duplicate_ids: list[int]) -> None:
+    # memberships keep already has are dropped with the duplicate; others move unless they overlap, which needs a decision
+    held = {(m.club_id, m.start_date, m.end_date) for m in keep.memberships.all()}
+    conflicts = []
+    for membership in ClubMembership.objects.filter(athlete_id__in=duplicate_ids).select_related('club').order_by('start_date'):
+        if (membership.club_id, membership.start_date, membership.end_date) in held:
+            continue
+        membership.athlete = keep
+        if membership.overlapping().exists():
+            conflicts.append(f'{membership.club} from {membership.start_date}')
+            continue
+        membership.save()
+        held.add((membership.club_id, membership.start_date, membership.end_date))
+    if conflicts:
+        raise ValidationError(f'Memberships of the duplicates overlap those of {keep}: {", ".join(conflicts)}.')
@@ -0,0 +1,36 @@
+# Generated by Django 6.0.1 on 2026-10-19 17:03
+
+from django.db import migrations, models
+from athletes.utils import name_key
+
+
+def populate_name_keys(apps, schema_editor):
+    Athlete = apps.get_model('athletes', 'Athlete')
+    batch = []
+    for athlete in Athlete.objects.only('id', 'first_name', 'last_name').iterator(chunk_size=2000):
+        athlete.name_key = name_key(athlete.first_name, athlete.last_name)
+        batch.append(athlete)
+        if len(batch) == 2000:
+            Athlete.objects.bulk_update(batch, ['name_key'])
+            batch = []
+    Athlete.objects.bulk_update(batch, ['name_key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('athletes', '0006_rename_agecategories_agecategory_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='athlete',
+            name='name_key',
+            field=models.CharField(default='', editable=False, max_length=101),
+        ),
+        migrations.RunPython(populate_name_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='athlete',
+            index=models.Index(fields=['name_key', 'birth_date'], name='athlete_name_key_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 17:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('athletes', '0007_athlete_name_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='athlete',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
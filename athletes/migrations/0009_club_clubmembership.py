@@ -0,0 +1,42 @@
+# Generated by Django 6.0.1 on 2026-10-19 17:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('athletes', '0008_athlete_deleted_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Club',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=150, unique=True)),
+                ('short_name', models.CharField(blank=True, max_length=20)),
+                ('city', models.CharField(blank=True, max_length=50)),
+                ('country', models.CharField(max_length=50)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ClubMembership',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField(blank=True, null=True)),
+                ('athlete', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='memberships', to='athletes.athlete')),
+                ('club', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='memberships', to='athletes.club')),
+            ],
+            options={
+                'ordering': ['athlete', '-start_date'],
+                'indexes': [models.Index(fields=['athlete', 'start_date'], name='membership_athlete_start_idx')],
+                'constraints': [models.CheckConstraint(condition=models.Q(('end_date__isnull', True), ('end_date__gte', models.F('start_date')), _connector='OR'), name='membership_end_after_start')],
+            },
+        ),
+    ]
@@ -1,4 +1,7 @@
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from common.models import SoftDeleteModel
+from .utils import is_timed_discipline, name_key
 
 
 # Create your models here.
@@ -8,7 +11,7 @@ class GenderChoice(models.TextChoices):
     FEMALE = 'F', 'Female'
 
 
-class Athlete(models.Model):
+class Athlete(SoftDeleteModel):
     first_name = models.CharField(
         max_length=50
     )
@@ -36,12 +39,24 @@ class Athlete(models.Model):
     updated_at = models.DateTimeField(
         auto_now=True
     )
+    name_key = models.CharField(  # normalized name used to match imported athletes, see athletes.matching
+        max_length=101,
+        editable=False,
+        default=''
+    )
+
+    def save(self, *args, **kwargs):
+        self.name_key = name_key(self.first_name, self.last_name)
+        super().save(*args, **kwargs)
 
     def __str__(self) -> str:
         return f"{self.first_name} {self.last_name}"
 
     class Meta:
         ordering = ['last_name', 'first_name']
+        indexes = [
+            models.Index(fields=['name_key', 'birth_date'], name='athlete_name_key_idx'),
+        ]
 
 
 class AgeCategory(models.Model):
@@ -118,5 +133,90 @@ class Discipline(models.Model):
         unique=True
     )
 
+    @property
+    def is_timed(self) -> bool:
+        return is_timed_discipline(self.name)
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class Club(models.Model):
+    name = models.CharField(
+        max_length=150,
+        unique=True
+    )
+    short_name = models.CharField(
+        max_length=20,
+        blank=True
+    )
+    city = models.CharField(
+        max_length=50,
+        blank=True
+    )
+    country = models.CharField(
+        max_length=50
+    )
+
+    class Meta:
+        ordering = ['name']
+
     def __str__(self) -> str:
         return self.name
+
+
+class ClubMembership(models.Model):
+    """
+    An athlete's time at a club. A result counts for the club the athlete belonged to on the result date.
+    """
+    athlete = models.ForeignKey(
+        Athlete,
+        on_delete=models.CASCADE,
+        related_name='memberships'
+    )
+    club = models.ForeignKey(
+        Club,
+        on_delete=models.CASCADE,
+        related_name='memberships'
+    )
+    start_date = models.DateField()
+    end_date = models.DateField(  # empty while the athlete is still at the club
+        null=True,
+        blank=True
+    )
+
+    class Meta:
+        ordering = ['athlete', '-start_date']
+        indexes = [
+            models.Index(fields=['athlete', 'start_date'], name='membership_athlete_start_idx'),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(end_date__isnull=True) | models.Q(end_date__gte=models.F('start_date')),
+                name='membership_end_after_start'
+            ),
+        ]
+
+    def overlapping(self, athlete_id: int | None = None):
+        # the athlete's other memberships whose dates overlap this one
+        overlapping = ClubMembership.objects.filter(athlete_id=athlete_id or self.athlete_id).exclude(pk=self.pk).filter(
+            models.Q(end_date__isnull=True) | models.Q(end_date__gte=self.start_date)
+        )
+        if self.end_date:
+            overlapping = overlapping.filter(start_date__lte=self.end_date)
+        return overlapping
+
+    def clean(self):
+        # an athlete belongs to one club at a time, otherwise a result would count for two clubs
+        if self.start_date and self.overlapping().exists():
+            raise ValidationError('The athlete is already at a club during these dates.')
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            # lock the athlete, so two concurrent saves cannot both pass the overlap check
+            Athlete.all_objects.select_for_update().only('pk').get(pk=self.athlete_id)
+            self.full_clean()
+            super().save(*args, **kwargs)
+
+    def __str__(self) -> str:
+        return f"{self.athlete} at {self.club} from {self.start_date}"
@@ -1,3 +1,4 @@
+import unicodedata
 from datetime import date
 
 
@@ -10,3 +11,25 @@ def calculate_age(birth_date: date, on_date: date) -> int:
         - birth_date.year
         - ((on_date.month, on_date.day) < (birth_date.month, birth_date.day))
     )
+
+
+def is_timed_discipline(name: str) -> bool:
+    """
+    Track events are named by distance (e.g. '100m Sprint') and measured in seconds, so lower is better.
+    """
+    return name[:1].isdigit()
+
+
+def normalize(value: str) -> str:
+    """
+    Lowercase, strip accents and punctuation and collapse whitespace: 'Jöns-Ólafur ' -> 'jons olafur'.
+    """
+    value = unicodedata.normalize('NFKD', value or '')
+    value = ''.join(char for char in value if not unicodedata.combining(char))
+    value = ''.join(char if char.isalnum() else ' ' for char in value.lower())
+    return ' '.join(value.split())
+
+
+def name_key(first_name: str, last_name: str) -> str:
+    # tokens are sorted, so a swapped first and last name still gives the same key
+    return ' '.join(sorted(normalize(f'{first_name} {last_name}').split()))
@@ -1,6 +1,7 @@
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import render, redirect
 from athletes.models import Athlete
+from common.utils import attach_formatted_dates
 from .forms import CreateAthlete, UpdateAthlete
 from django.shortcuts import get_object_or_404
 
@@ -10,10 +11,18 @@ def overview(request: HttpRequest) -> HttpResponse:
     return render(request, 'athletes/overview.html')
 
 
+def add_display_values(athletes: list[Athlete]) -> list[Athlete]:
+    # joined here once instead of with |join and date localization on every row of the template
+    for athlete in athletes:
+        athlete.discipline_names = ', '.join(str(d) for d in athlete.disciplines.all())
+    attach_formatted_dates(athletes, 'birth_date', 'birth_date_display')
+    return athletes
+
+
 def list_athletes(request: HttpRequest) -> HttpResponse:
-    athletes = Athlete.objects.all()
+    athletes = list(Athlete.objects.prefetch_related('disciplines'))
     context = {
-        'athletes': athletes
+        'athletes': add_display_values(athletes)
     }
     return render(request, 'athletes/list_athletes.html', context)
 
@@ -50,7 +59,7 @@ def update_athlete(request: HttpRequest, athlete_id: int) -> HttpResponse:
 def confirm_delete_athlete(request: HttpRequest, athlete_id: int) -> HttpResponse:
     athlete_to_delete = get_object_or_404(Athlete, pk=athlete_id)
     if request.method == "POST":
-        athlete_to_delete.delete()
+        athlete_to_delete.soft_delete()  # hidden, but their results and records are kept
         return redirect('athletes:list')
     else:
         context = {
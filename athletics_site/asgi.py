@@ -14,3 +14,7 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'athletics_site.settings')
 
 application = get_asgi_application()
+
+from records.snapshot import preload_snapshot  # noqa: E402 - apps are only ready after the application is created
+
+preload_snapshot()
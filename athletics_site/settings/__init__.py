@@ -0,0 +1,32 @@
+"""
+Settings profiles. DJANGO_ENV picks one (dev when unset):
+
+    dev    local development, DEBUG from .env
+    prod   production: no debug, caching, cached sessions, persistent connections
+    bench  prod without external services, for benchmarks and load tests
+    batch  prod without the web stack (admin, sessions, messages, middleware), for data jobs
+
+A profile can also be used directly with DJANGO_SETTINGS_MODULE=athletics_site.settings.<profile>.
+"""
+import os
+from pathlib import Path
+
+# python-dotenv costs ~40 ms to import, so it is only loaded when there is a .env to read;
+# deployments that pass real environment variables skip it. Loaded here, before DJANGO_ENV is read.
+ENV_FILE = Path(__file__).resolve().parent.parent.parent / '.env'
+if ENV_FILE.exists():
+    from dotenv import load_dotenv
+    load_dotenv(ENV_FILE)
+
+ENVIRONMENT = os.getenv("DJANGO_ENV", "dev")
+
+if ENVIRONMENT == "prod":
+    from .prod import *  # noqa: F401,F403
+elif ENVIRONMENT == "bench":
+    from .bench import *  # noqa: F401,F403
+elif ENVIRONMENT == "batch":
+    from .batch import *  # noqa: F401,F403
+elif ENVIRONMENT == "dev":
+    from .dev import *  # noqa: F401,F403
+else:
+    raise ValueError(f'Unknown DJANGO_ENV "{ENVIRONMENT}", expected dev, prod, bench or batch.')
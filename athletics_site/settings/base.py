@@ -1,5 +1,5 @@
 """
-Django settings for athletics_site project.
+Django settings for athletics_site project, shared by every profile in this package.
 
 Generated by 'django-admin startproject' using Django 6.0.1.
 
@@ -12,13 +12,11 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 
 from pathlib import Path
 import os
-from dotenv import load_dotenv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
-BASE_DIR = Path(__file__).resolve().parent.parent
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
-# load .env
-load_dotenv(BASE_DIR / '.env')
+# .env is loaded by the package __init__, before the profile is picked
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/6.0/howto/deployment/checklist/
@@ -27,7 +25,7 @@ load_dotenv(BASE_DIR / '.env')
 SECRET_KEY = os.getenv("SECRET_KEY")
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = False
 
 ALLOWED_HOSTS = []
 
@@ -52,12 +50,14 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'common.middleware.CompressionMiddleware',  # brotli/gzip for dynamic responses; whitenoise above precompresses static files
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'common.profiling.ProfilingMiddleware',  # after auth, so staff can trigger it; a no-op unless PROFILING_ENABLED
 ]
 
 ROOT_URLCONF = 'athletics_site.urls'
@@ -134,3 +134,33 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = []
 STATIC_ROOT = BASE_DIR / "staticfiles"  # added for custom error 404 page
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'  # added for custom error 404 page (caching)
+
+
+# dynamic responses smaller than this are sent uncompressed (common/middleware.py)
+COMPRESSION_MIN_SIZE = 1024
+
+# compressed results pages are cached this long, and dropped earlier whenever results change
+RESULTS_PAGE_CACHE_SECONDS = 300
+# pages for a typed competition name (one per keystroke prefix) are kept briefly, here and in the browser
+RESULTS_FILTER_CACHE_SECONDS = 30
+
+# per-client token buckets of common.ratelimit.rate_limit: name -> (requests per second, burst)
+RATE_LIMITS = {
+    'results': (5, 20),
+    'export': (0.1, 5),  # a few full exports, then one every 10 seconds
+}
+# reverse proxies in front of the app; clients are then told apart by X-Forwarded-For instead of REMOTE_ADDR
+RATE_LIMIT_TRUSTED_PROXIES = int(os.getenv("RATE_LIMIT_TRUSTED_PROXIES", "0"))
+
+# Sampled request profiling, reported at /profiling/ (common/profiling.py)
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "False") == "True"
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))  # share of all requests, 0-1
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN")  # X-Profile header value that triggers it without a staff login
+PROFILING_SLOW_QUERY_MS = 50  # statements at least this slow get an EXPLAIN plan
+
+# In-process columnar snapshot of results for analytical queries (records/snapshot.py)
+RESULTS_SNAPSHOT_ENABLED = os.getenv("RESULTS_SNAPSHOT_ENABLED", "False") == "True"
+RESULTS_SNAPSHOT_PRELOAD = os.getenv("RESULTS_SNAPSHOT_PRELOAD", "False") == "True"  # build at startup instead of on first use
+RESULTS_SNAPSHOT_REFRESH_SECONDS = 60
+# when set, workers map the snapshot published there by `manage.py publish_snapshot` instead of building their own
+RESULTS_SNAPSHOT_DIR = os.getenv("RESULTS_SNAPSHOT_DIR")
@@ -0,0 +1,18 @@
+from copy import deepcopy
+from .prod import *  # noqa: F401,F403
+
+ENVIRONMENT = "batch"
+
+# management commands and scripts such as load_data.py serve no requests, so django.setup()
+# skips the admin (and its autodiscovery of every admin.py), auth, sessions, messages and static files.
+# Run migrate with another profile: the tables of the dropped apps are not managed here.
+INSTALLED_APPS = PROJECT_APPS
+
+MIDDLEWARE = []
+
+ROOT_URLCONF = "athletics_site.urls_batch"
+
+TEMPLATES = deepcopy(TEMPLATES)  # prod's list is not changed when both profiles are imported
+TEMPLATES[0]["OPTIONS"]["context_processors"] = [
+    "django.template.context_processors.request",
+]
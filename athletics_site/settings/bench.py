@@ -0,0 +1,20 @@
+from .prod import *  # noqa: F401,F403
+
+ENVIRONMENT = "bench"
+
+# production behaviour without external services, so benchmarks run anywhere
+ALLOWED_HOSTS = ["*"]
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+# creating benchmark users should not be dominated by password hashing
+PASSWORD_HASHERS = [
+    "django.contrib.auth.hashers.MD5PasswordHasher",
+]
+
+# load generators send every request from one client
+RATE_LIMITS = {}
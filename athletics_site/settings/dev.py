@@ -0,0 +1,6 @@
+from .base import *  # noqa: F401,F403
+
+ENVIRONMENT = "dev"
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = os.getenv("DEBUG", "True") == "True"
@@ -0,0 +1,6 @@
+"""
+URL configuration of the batch settings profile. Batch jobs serve no requests, so no views
+(and none of their imports) are loaded; system checks still find a valid URLconf.
+"""
+
+urlpatterns = []
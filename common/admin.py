@@ -1,3 +1,53 @@
 from django.contrib import admin
+from records.utils import bump_results_version
+from .dashboard import invalidate_widget
 
 # Register your models here.
+
+
+class SoftDeleteAdmin(admin.ModelAdmin):
+    """
+    Admin for a SoftDeleteModel: lists deleted rows too, filterable, with actions to hide and restore them.
+    Deleting from the change page hides the row as well; nothing is ever cascaded away from here.
+    """
+    actions = ['soft_delete', 'restore']
+
+    def get_queryset(self, request):
+        return self.model.all_objects.get_queryset()
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)  # the soft_delete action replaces it
+        return actions
+
+    def get_deleted_objects(self, objs, request):
+        # soft deletion cascades to nothing: the confirmation page lists only the rows themselves,
+        # and needs no delete permission on related models
+        objs = list(objs)
+        return [str(obj) for obj in objs], {self.model._meta.verbose_name_plural: len(objs)}, set(), []
+
+    def delete_model(self, request, obj):
+        obj.soft_delete()
+        self.invalidate_caches()
+
+    def delete_queryset(self, request, queryset):
+        queryset.soft_delete()
+        self.invalidate_caches()
+
+    def get_list_filter(self, request):
+        return [('deleted_at', admin.EmptyFieldListFilter), *super().get_list_filter(request)]
+
+    @admin.action(description='Soft-delete the selected rows')
+    def soft_delete(self, request, queryset):
+        self.message_user(request, f'{queryset.soft_delete()} rows hidden.')
+        self.invalidate_caches()
+
+    @admin.action(description='Restore the selected rows')
+    def restore(self, request, queryset):
+        self.message_user(request, f'{queryset.restore()} rows restored.')
+        self.invalidate_caches()
+
+    def invalidate_caches(self) -> None:
+        # update() sends no signals; cached pages and dashboard widgets hide deleted athletes and competitions
+        bump_results_version()
+        invalidate_widget('upcoming_competitions')
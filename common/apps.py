@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class HomePageConfig(AppConfig):
     name = 'common'
+
+    def ready(self):
+        from . import checks, signals  # noqa: F401
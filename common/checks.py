@@ -0,0 +1,88 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+DEVELOPMENT = 'dev'
+BATCH = 'batch'  # no middleware and no sessions, so the request-serving checks do not apply
+
+
+@register('performance')
+def check_performance_settings(app_configs, **kwargs) -> list[Warning]:
+    """
+    Warn about settings that slow the site down outside local development.
+    """
+    environment = getattr(settings, 'ENVIRONMENT', DEVELOPMENT)
+    if environment == DEVELOPMENT:
+        return []
+    serves_requests = environment != BATCH
+
+    warnings = []
+    if settings.DEBUG:
+        warnings.append(Warning(
+            'DEBUG is on, so every executed SQL query is kept in memory.',
+            hint='Set DEBUG = False outside development.',
+            id='common.W001',
+        ))
+
+    for alias, database in settings.DATABASES.items():
+        if not database.get('CONN_MAX_AGE'):
+            warnings.append(Warning(
+                f'Database "{alias}" opens a new connection for every request.',
+                hint='Set CONN_MAX_AGE (and CONN_HEALTH_CHECKS) to reuse connections.',
+                id='common.W002',
+            ))
+
+    cache_backend = settings.CACHES['default']['BACKEND']
+    if cache_backend.endswith('DummyCache'):
+        warnings.append(Warning(
+            'The default cache is a DummyCache, so nothing is cached.',
+            hint='Configure a real cache backend such as Redis or LocMemCache.',
+            id='common.W003',
+        ))
+
+    if cache_backend.endswith('LocMemCache'):
+        warnings.append(Warning(
+            'The default cache is a per-process LocMemCache, so cache versions bumped in one process '
+            '(a web worker, an import) never reach the others, which keep serving stale pages and statistics.',
+            hint='Use a cache shared by all processes, such as Redis (set REDIS_URL).',
+            id='common.W009',
+        ))
+
+    if serves_requests and settings.SESSION_ENGINE == 'django.contrib.sessions.backends.db':
+        warnings.append(Warning(
+            'Sessions are read from the database on every request.',
+            hint='Use django.contrib.sessions.backends.cached_db.',
+            id='common.W004',
+        ))
+
+    if serves_requests and not {'common.middleware.CompressionMiddleware', 'django.middleware.gzip.GZipMiddleware'} & set(settings.MIDDLEWARE):
+        warnings.append(Warning(
+            'Responses are sent uncompressed.',
+            hint='Add common.middleware.CompressionMiddleware to MIDDLEWARE.',
+            id='common.W005',
+        ))
+
+    query_logger = getattr(settings, 'LOGGING', {}).get('loggers', {}).get('django.db.backends', {})
+    if query_logger.get('level') == 'DEBUG':
+        warnings.append(Warning(
+            'The django.db.backends logger is at DEBUG level and logs every SQL query.',
+            hint='Raise its level to WARNING.',
+            id='common.W006',
+        ))
+
+    for template_settings in settings.TEMPLATES:
+        loaders = template_settings.get('OPTIONS', {}).get('loaders')
+        if loaders and not any(isinstance(loader, (list, tuple)) and loader[0].endswith('cached.Loader')
+                               for loader in loaders):
+            warnings.append(Warning(
+                'Templates are re-read and parsed on every render.',
+                hint='Wrap the template loaders in django.template.loaders.cached.Loader.',
+                id='common.W007',
+            ))
+
+    if getattr(settings, 'PROFILING_ENABLED', False) and getattr(settings, 'PROFILING_SAMPLE_RATE', 0) > 0.01:
+        warnings.append(Warning(
+            'More than 1% of requests are profiled, each with cProfile and a database write.',
+            hint='Lower PROFILING_SAMPLE_RATE, or profile single requests with the X-Profile header.',
+            id='common.W008',
+        ))
+    return warnings
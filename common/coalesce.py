@@ -0,0 +1,42 @@
+from threading import Event, Lock
+
+
+class _Call:
+    def __init__(self):
+        self.done = Event()
+        self.result = None
+        self.error = None
+
+
+_calls = {}
+_lock = Lock()
+
+
+def coalesced(key: str, compute):
+    """
+    Run compute() once for all callers in this process asking for the same key at the same
+    time: the first runs it, the others wait and get its result (or its exception).
+    Callers arriving after it finished run it again, so pair this with a cache.
+    """
+    with _lock:
+        call = _calls.get(key)
+        leader = call is None
+        if leader:
+            call = _calls[key] = _Call()
+
+    if not leader:
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    try:
+        call.result = compute()
+    except Exception as e:
+        call.error = e
+        raise
+    finally:
+        with _lock:
+            del _calls[key]
+        call.done.set()
+    return call.result
@@ -0,0 +1,75 @@
+import gzip
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import patch_vary_headers
+from .coalesce import coalesced
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+# responses smaller than this are not worth compressing
+DEFAULT_MIN_SIZE = 1024
+
+
+def min_size() -> int:
+    return getattr(settings, 'COMPRESSION_MIN_SIZE', DEFAULT_MIN_SIZE)
+
+
+def available_encodings() -> list[str]:
+    # in order of preference
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+
+def accepted_encoding(request: HttpRequest, encodings: list[str] | None = None) -> str | None:
+    """
+    The best of encodings (default: all available) the client accepts, or None to send the response as is.
+    """
+    accepted = {
+        part.split(';')[0].strip().lower()
+        for part in request.headers.get('Accept-Encoding', '').split(',')
+        if not part.strip().endswith(';q=0')
+    }
+    for encoding in encodings or available_encodings():
+        if encoding in accepted:
+            return encoding
+    return None
+
+
+def compress(content: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(content, mode=brotli.MODE_TEXT, quality=5)
+    return gzip.compress(content, compresslevel=6, mtime=0)
+
+
+def cached_compressed(key: str, render, timeout: int) -> dict[str, bytes]:
+    """
+    Compressed variants of render()'s output, built once and kept in the cache so repeated
+    hits skip both rendering and compression. The plain bytes are not stored; clients
+    without compression get the gzip variant decompressed. Concurrent misses on the same
+    key share one render.
+    """
+    def build() -> dict[str, bytes]:
+        content = render().encode()
+        built = {encoding: compress(content, encoding) for encoding in available_encodings()}
+        cache.set(key, built, timeout)
+        return built
+
+    variants = cache.get(key)
+    if variants is None:
+        variants = coalesced(key, build)
+    return variants
+
+
+def compressed_response(request: HttpRequest, variants: dict[str, bytes],
+                        content_type: str = 'text/html; charset=utf-8') -> HttpResponse:
+    encoding = accepted_encoding(request)
+    if encoding in variants:
+        response = HttpResponse(variants[encoding], content_type=content_type)
+        response.headers['Content-Encoding'] = encoding
+    else:
+        response = HttpResponse(gzip.decompress(variants['gzip']), content_type=content_type)
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
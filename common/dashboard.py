@@ -0,0 +1,142 @@
+import time
+from datetime import timedelta
+from typing import Callable, NamedTuple
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from competitions.models import Competition
+from records.models import Results, Record
+from records.utils import RESULTS_VERSION_KEY
+
+
+class Widget(NamedTuple):
+    build: Callable[[], list[dict]]
+    timeout: int  # seconds; also bounds how stale a date window ("this week", "upcoming") can get
+    uses_results: bool  # dropped whenever records.utils.bump_results_version() runs
+
+
+def _version_key(name: str) -> str:
+    return f'dashboard-version:{name}'
+
+
+def invalidate_widget(name: str) -> None:
+    # after commit, so no widget is rebuilt from rows that may still roll back
+    transaction.on_commit(lambda: cache.set(_version_key(name), time.time_ns(), None))
+
+
+def _latest_results() -> list[dict]:
+    results = (
+        Results.objects
+        .filter(athlete__deleted_at__isnull=True, competition__deleted_at__isnull=True)
+        .select_related('athlete', 'competition', 'discipline')
+        .order_by('-result_date', '-id')[:10]
+    )
+    return [
+        {
+            'athlete': str(result.athlete),
+            'discipline': result.discipline.name,
+            'competition': result.competition.name,
+            'mark': result.result_value,
+            'unit': 's' if result.discipline.is_timed else 'm',
+            'position': result.position,
+            'date': result.result_date,
+        }
+        for result in results
+    ]
+
+
+def _upcoming_competitions() -> list[dict]:
+    competitions = (
+        Competition.objects
+        .filter(end_date__gte=timezone.localdate())
+        .order_by('start_date')[:5]
+    )
+    return [
+        {
+            'name': competition.name,
+            'city': competition.city,
+            'country': competition.country,
+            'start_date': competition.start_date,
+            'end_date': competition.end_date,
+        }
+        for competition in competitions
+    ]
+
+
+def _recent_records() -> list[dict]:
+    records = (
+        Record.objects
+        .filter(is_current=True)
+        .select_related('discipline', 'age_category', 'athlete')
+        .order_by('-set_on', '-id')[:5]
+    )
+    return [
+        {
+            'scope': record.get_scope_display(),
+            'discipline': record.discipline.name,
+            'gender': record.get_gender_display(),
+            'age_category': record.age_category.get_name_display() if record.age_category_id else None,
+            'athlete': str(record.athlete),
+            'mark': record.mark,
+            'unit': 's' if record.discipline.is_timed else 'm',
+            'set_on': record.set_on,
+        }
+        for record in records
+    ]
+
+
+def _top_performers() -> list[dict]:
+    # best scored result of each athlete in the last 7 days, by performance points
+    week_ago = timezone.localdate() - timedelta(days=7)
+    results = (
+        Results.objects
+        .filter(result_date__gt=week_ago, points__isnull=False, athlete__deleted_at__isnull=True)
+        .select_related('athlete', 'discipline')
+        .order_by('-points', 'id')[:50]
+    )
+    performers, seen = [], set()
+    for result in results:
+        if result.athlete_id in seen:
+            continue
+        seen.add(result.athlete_id)
+        performers.append({
+            'athlete': str(result.athlete),
+            'discipline': result.discipline.name,
+            'mark': result.result_value,
+            'unit': 's' if result.discipline.is_timed else 'm',
+            'points': result.points,
+        })
+    return performers[:5]
+
+
+WIDGETS = {
+    'latest_results': Widget(_latest_results, 5 * 60, uses_results=True),
+    'upcoming_competitions': Widget(_upcoming_competitions, 60 * 60, uses_results=False),
+    'recent_records': Widget(_recent_records, 60 * 60, uses_results=True),  # records only appear with new results
+    'top_performers': Widget(_top_performers, 15 * 60, uses_results=True),
+}
+
+
+def dashboard() -> dict[str, list[dict]]:
+    """
+    Every widget of the home page. A warm hit is two cache round trips (versions, then widgets)
+    and no queries; a widget is rebuilt only when its TTL ran out or its version changed.
+    """
+    versions = cache.get_many([RESULTS_VERSION_KEY, *(_version_key(name) for name in WIDGETS)])
+    keys = {
+        name: (
+            f'dashboard:{name}:{versions.get(_version_key(name), 0)}'
+            f':{versions.get(RESULTS_VERSION_KEY, 0) if widget.uses_results else ""}'
+        )
+        for name, widget in WIDGETS.items()
+    }
+    cached = cache.get_many(keys.values())
+
+    widgets = {}
+    for name, widget in WIDGETS.items():
+        data = cached.get(keys[name])
+        if data is None:
+            data = widget.build()
+            cache.set(keys[name], data, widget.timeout)
+        widgets[name] = data
+    return widgets
@@ -0,0 +1,81 @@
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# what a fresh process runs before it can do useful work; each prints its own elapsed milliseconds
+TARGETS = {
+    # a management command or script: django.setup() only
+    'setup': 'import django; django.setup()',
+    # a web worker: the WSGI application plus the URLconf (and every view module) its first request resolves
+    'web': (
+        'from django.core.wsgi import get_wsgi_application; get_wsgi_application(); '
+        'from django.urls import get_resolver; get_resolver().url_patterns'
+    ),
+}
+TIMED = 'import time; started = time.perf_counter(); {code}; print((time.perf_counter() - started) * 1000)'
+# packages that a lean startup should not pay for
+HEAVY_MODULES = ['numpy', 'dotenv', 'django.contrib.admin', 'django.contrib.sessions', 'django.contrib.messages']
+IMPORT_TIME = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)')
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure the cold start of fresh processes per settings profile (DJANGO_ENV): process wall time, '
+        'time spent in django.setup() or loading the web application, and the costliest imports by -X importtime.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', nargs='+', default=[settings.ENVIRONMENT, 'batch'])
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--top', type=int, default=15, help='costliest top-level imports to list per profile')
+
+    def handle(self, *args, **options):
+        for profile in options['profiles']:
+            self.stdout.write(f'\n{profile}')
+            # batch serves no requests, so it has no web target
+            targets = ['setup'] if profile == 'batch' else list(TARGETS)
+            for target in targets:
+                walls, inner = [], []
+                for _ in range(options['repeat']):
+                    started = time.perf_counter()
+                    output = self.run(profile, TIMED.format(code=TARGETS[target]))
+                    walls.append((time.perf_counter() - started) * 1000)
+                    inner.append(float(output.stdout.split()[-1]))
+                self.stdout.write(
+                    f'  {target:<6} process median {statistics.median(walls):7.1f} ms, min {min(walls):7.1f} ms'
+                    f'  (in {target}: median {statistics.median(inner):7.1f} ms)'
+                )
+            self.report_imports(profile, options['top'])
+
+    def run(self, profile: str, code: str, *flags: str) -> subprocess.CompletedProcess:
+        env = {**os.environ, 'DJANGO_ENV': profile}
+        output = subprocess.run(
+            [sys.executable, *flags, '-c', code], env=env, cwd=settings.BASE_DIR, capture_output=True, text=True
+        )
+        if output.returncode:
+            raise RuntimeError(f'{profile} failed to start:\n{output.stderr}')
+        return output
+
+    def report_imports(self, profile: str, top: int) -> None:
+        stderr = self.run(profile, TARGETS['setup'], '-X', 'importtime').stderr
+        # top-level imports only (no indentation), so nested modules are not counted twice
+        modules = sorted(
+            (
+                (int(match[2]), match[4]) for match in IMPORT_TIME.finditer(stderr)
+                if len(match[3]) == 1
+            ),
+            reverse=True
+        )
+        total = sum(cumulative for cumulative, _ in modules)
+        self.stdout.write(f'  imports during setup: {len(IMPORT_TIME.findall(stderr))} modules, {total / 1000:.1f} ms')
+        for cumulative, module in modules[:top]:
+            self.stdout.write(f'    {cumulative / 1000:7.1f} ms  {module}')
+        loaded = {match[4] for match in IMPORT_TIME.finditer(stderr)}
+        for heavy in HEAVY_MODULES:
+            imported = any(module == heavy or module.startswith(heavy + '.') for module in loaded)
+            self.stdout.write(f'  {heavy}: {"imported" if imported else "not imported"}')
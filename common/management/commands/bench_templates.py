@@ -0,0 +1,124 @@
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.template import engines
+from django.template.loader import get_template
+from django.template.loaders.cached import Loader as CachedLoader
+from athletes.models import Athlete, AgeCategory, Discipline
+from athletes.views import add_display_values as athlete_display_values
+from competitions.models import Competition, CompetitionCategory
+from records.models import Results
+from records.views import add_display_values as result_display_values
+
+DISCIPLINE_NAMES = ['100m Sprint', '200m Sprint', '400m', 'Long Jump', 'High Jump', 'Shot Put', 'Javelin Throw']
+
+
+class Command(BaseCommand):
+    help = 'Measure template loading and the render time of the listing templates on unsaved, in-memory rows.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 10_000])
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        self.report_loading()
+        for rows in options['rows']:
+            self.stdout.write(f'\n{rows:,} rows')
+            for template_name, context in self.listing_contexts(rows).items():
+                template = get_template(template_name)
+                timings = []
+                for _ in range(options['repeat']):
+                    started = time.perf_counter()
+                    template.render(context)
+                    timings.append(time.perf_counter() - started)
+                best = min(timings)
+                self.stdout.write(
+                    f'  {template_name:<38} best {best * 1000:8.1f} ms  ({best / rows * 1e6:.1f} us per row)'
+                )
+
+    def report_loading(self):
+        engine = engines['django'].engine
+        names = ['common/base.html', 'records/list.html', 'athletes/list_athletes.html',
+                 'competitions/list_competitions.html']
+        cached_loaders = [loader for loader in engine.template_loaders if isinstance(loader, CachedLoader)]
+        self.stdout.write(f'Cached template loader: {"on" if cached_loaders else "off"}')
+        for loader in cached_loaders:
+            loader.reset()  # so the first load below includes parsing
+        for name in names:
+            started = time.perf_counter()
+            get_template(name)
+            first = time.perf_counter() - started
+            started = time.perf_counter()
+            get_template(name)
+            again = time.perf_counter() - started
+            self.stdout.write(f'  {name:<38} first load {first * 1000:6.2f} ms, next {again * 1000:6.3f} ms')
+
+    def listing_contexts(self, rows: int) -> dict:
+        """
+        Contexts shaped exactly like the views build them, with related objects attached
+        up front the way select_related / prefetch_related would, so no queries run.
+        """
+        disciplines = [Discipline(id=i, name=name) for i, name in enumerate(DISCIPLINE_NAMES, start=1)]
+        age_groups = [AgeCategory(id=1, name='U20', gender='M'), AgeCategory(id=2, name='SENIOR', gender='M')]
+        category = CompetitionCategory(id=1, category_name=CompetitionCategory.Categories.OUTDOOR)
+        first_day = date(2015, 1, 1)
+
+        athletes = []
+        for i in range(1, rows + 1):
+            athlete = Athlete(
+                id=i,
+                first_name='Ivan',
+                last_name=f'Petrov {i}',
+                nationality='BG',
+                birth_date=first_day - timedelta(days=i % 7000),
+                gender='M'
+            )
+            _prefetch(athlete, 'disciplines', disciplines[i % 5:i % 5 + 2])
+            athletes.append(athlete)
+
+        competitions = []
+        for i in range(1, rows + 1):
+            competition = Competition(
+                id=i,
+                name=f'Meeting {i}',
+                country='Bulgaria',
+                city='Sofia',
+                start_date=first_day + timedelta(days=i % 3000),
+                end_date=first_day + timedelta(days=i % 3000 + 2),
+                category=category
+            )
+            _prefetch(competition, 'age_groups', age_groups)
+            competitions.append(competition)
+
+        results = [
+            Results(
+                id=i,
+                athlete=athletes[i % rows],
+                competition=competitions[i % 200],
+                discipline=disciplines[i % len(disciplines)],
+                position=i % 8 + 1,
+                result_value=Decimal('10.50'),
+                result_date=competitions[i % 200].start_date,
+            )
+            for i in range(rows)
+        ]
+
+        return {
+            'records/_results_partial.html': {
+                'results': result_display_values(results),
+                'years': sorted({r.result_date.year for r in results}),
+                'selected_year': None,
+                'selected_competition_name': None,
+            },
+            'athletes/list_athletes.html': {'athletes': athlete_display_values(athletes)},
+            'competitions/list_competitions.html': {'competitions': competitions},
+        }
+
+
+def _prefetch(instance, relation: str, objects: list) -> None:
+    # fill the prefetch cache the way prefetch_related() does
+    queryset = getattr(instance, relation).get_queryset().none()
+    queryset._result_cache = list(objects)
+    queryset._prefetch_done = True
+    instance._prefetched_objects_cache = {**getattr(instance, '_prefetched_objects_cache', {}), relation: queryset}
@@ -0,0 +1,16 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from common.models import ProfiledRequest
+
+
+class Command(BaseCommand):
+    help = 'Delete profiled requests (and their statements) older than --days.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help='keep this many days (default 30)')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        deleted, _ = ProfiledRequest.objects.filter(created_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} rows.'))
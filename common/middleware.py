@@ -0,0 +1,60 @@
+from django.http import FileResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_sequence, compress_string
+from .compression import accepted_encoding, compress, min_size
+
+# media and archive formats that are compressed already, so compressing them again only costs CPU
+INCOMPRESSIBLE_TYPES = (
+    'image/', 'video/', 'audio/', 'font/woff', 'application/zip', 'application/gzip', 'application/x-gzip',
+    'application/pdf', 'application/octet-stream',
+)
+COMPRESSIBLE_EXCEPTIONS = {'image/svg+xml'}
+# random gzip padding against BREACH, as django.middleware.gzip.GZipMiddleware adds it
+MAX_RANDOM_BYTES = 100
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Brotli (when installed) or gzip compression of dynamic responses above
+    COMPRESSION_MIN_SIZE bytes. Replaces django.middleware.gzip.GZipMiddleware.
+    Responses that already carry a Content-Encoding, such as precompressed cached
+    pages, file downloads and content types that are compressed already pass through untouched.
+    HTML pages (which carry CSRF tokens) and streams are gzipped with Django's random padding,
+    which mitigates BREACH; brotli has no such padding, so only other content types get it.
+    """
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding') or isinstance(response, FileResponse):
+            return response
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type.startswith(INCOMPRESSIBLE_TYPES) and content_type not in COMPRESSIBLE_EXCEPTIONS:
+            return response
+        if not response.streaming and len(response.content) < min_size():
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        # streams (e.g. results exports) are gzipped chunk by chunk
+        padded = response.streaming or content_type == 'text/html'
+        encoding = accepted_encoding(request, ['gzip'] if padded else None)
+        if encoding is None or response.streaming and response.is_async:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_sequence(response.streaming_content, max_random_bytes=MAX_RANDOM_BYTES)
+            del response.headers['Content-Length']
+        else:
+            if padded:
+                compressed = compress_string(response.content, max_random_bytes=MAX_RANDOM_BYTES)
+            else:
+                compressed = compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
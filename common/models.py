@@ -1,3 +1,106 @@
 from django.db import models
+from django.utils import timezone
+
 
 # Create your models here.
+class SoftDeleteQuerySet(models.QuerySet):
+    def soft_delete(self) -> int:
+        return self.update(deleted_at=timezone.now())
+
+    def restore(self) -> int:
+        return self.update(deleted_at=None)
+
+
+class ActiveManager(models.Manager.from_queryset(SoftDeleteQuerySet)):
+    def get_queryset(self) -> SoftDeleteQuerySet:
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
+class SoftDeleteModel(models.Model):
+    """
+    Rows are hidden instead of deleted, so nothing that references them is cascaded away.
+    `objects` only sees live rows, `all_objects` sees deleted ones too. Related lookups
+    (result.athlete) use the base manager and still reach deleted rows.
+    """
+    deleted_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False
+    )
+
+    objects = ActiveManager()
+    all_objects = models.Manager.from_queryset(SoftDeleteQuerySet)()
+
+    class Meta:
+        abstract = True
+
+    @property
+    def is_deleted(self) -> bool:
+        return self.deleted_at is not None
+
+    def soft_delete(self) -> None:
+        self.deleted_at = timezone.now()
+        self.save(update_fields=['deleted_at'])
+
+    def restore(self) -> None:
+        self.deleted_at = None
+        self.save(update_fields=['deleted_at'])
+
+
+class ProfiledRequest(models.Model):
+    """
+    A request sampled by common.profiling.ProfilingMiddleware, with its cProfile stats.
+    """
+    path = models.CharField(
+        max_length=500
+    )
+    view_name = models.CharField(  # resolved URL name, so /athletes/update/1 and /2 group together
+        max_length=200,
+        db_index=True
+    )
+    method = models.CharField(
+        max_length=10
+    )
+    status_code = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField()
+    sql_count = models.PositiveIntegerField()
+    sql_ms = models.FloatField()
+    profile = models.TextField(  # pstats output, by cumulative time
+        blank=True
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        db_index=True
+    )
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self) -> str:
+        return f"{self.method} {self.path} ({self.duration_ms:.0f} ms)"
+
+
+class ProfiledQuery(models.Model):
+    """
+    One SQL statement of a profiled request, with its plan when it was slow.
+    """
+    request = models.ForeignKey(
+        ProfiledRequest,
+        on_delete=models.CASCADE,
+        related_name='queries'
+    )
+    fingerprint = models.CharField(  # hash of the statement without its parameters, groups repeats of one query
+        max_length=32,
+        db_index=True
+    )
+    sql = models.TextField()
+    duration_ms = models.FloatField()
+    plan = models.TextField(
+        blank=True
+    )
+
+    class Meta:
+        ordering = ['-duration_ms']
+
+    def __str__(self) -> str:
+        return f"{self.sql[:80]} ({self.duration_ms:.1f} ms)"
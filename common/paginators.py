@@ -0,0 +1,38 @@
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator for admin lists of very large tables. For an unfiltered queryset on PostgreSQL
+    the planner's row estimate is used instead of COUNT(*), which has to scan the whole table.
+    Filtered lists and small tables still get an exact count.
+    """
+    exact_count_threshold = 10000
+
+    @cached_property
+    def count(self) -> int:
+        estimate = self._estimated_count()
+        if estimate is not None and estimate > self.exact_count_threshold:
+            return estimate
+        return super().count
+
+    def _estimated_count(self) -> int | None:
+        queryset = self.object_list
+        query = getattr(queryset, 'query', None)
+        if query is None or query.where or query.distinct:
+            return None
+
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+        # reltuples is -1 (or 0) until the table has been analyzed
+        return row[0] if row and row[0] > 0 else None
@@ -0,0 +1,152 @@
+import cProfile
+import hashlib
+import hmac
+import io
+import pstats
+import random
+import re
+import threading
+import time
+from django.conf import settings
+from django.db import connection
+from django.urls import resolve, Resolver404
+from .models import ProfiledRequest, ProfiledQuery
+
+# statements slower than this get an EXPLAIN plan
+DEFAULT_SLOW_QUERY_MS = 50
+# at most this many plans per request, slowest first
+MAX_PLANS = 5
+# pstats lines kept per request
+PROFILE_LINES = 40
+
+# one profiler per process: from Python 3.12 a second cProfile.enable() raises while another is active
+_profiler_lock = threading.Lock()
+
+_IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def fingerprint(sql: str) -> str:
+    # parameters are placeholders already; IN lists of any length count as one statement
+    normalized = _WHITESPACE.sub(' ', _IN_LIST.sub('IN (...)', sql)).strip()
+    return hashlib.md5(normalized.encode()).hexdigest()
+
+
+def explain(sql: str, params) -> str:
+    prefix = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '  # plans only, never ANALYZE
+    with connection.cursor() as cursor:
+        cursor.execute(prefix + sql, params)
+        return '\n'.join(' '.join(str(column) for column in row) for row in cursor.fetchall())
+
+
+class QueryCapture:
+    """
+    connection.execute_wrapper() hook that times every statement of the request.
+    """
+
+    def __init__(self):
+        self.queries = []  # (sql, params, milliseconds)
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, None if many else params, (time.perf_counter() - started) * 1000))
+
+
+class ProfilingMiddleware:
+    """
+    Opt-in profiling of sampled requests: cProfile stats, every SQL statement with its time,
+    and EXPLAIN plans of the slow ones, stored as ProfiledRequest/ProfiledQuery rows and
+    aggregated on the staff-only /profiling/ page.
+
+    A request is profiled when PROFILING_ENABLED is on and either it is picked by
+    PROFILING_SAMPLE_RATE (0-1) or it sends the X-Profile header as a staff user (or with
+    PROFILING_TOKEN as its value). Everything else passes straight through, and so does a
+    request that arrives while another one is being profiled.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+        if not _profiler_lock.acquire(blocking=False):
+            return self.get_response(request)  # another thread is profiling, serve this one unprofiled
+
+        capture = QueryCapture()
+        profiler = cProfile.Profile()
+        try:
+            started = time.perf_counter()
+            with connection.execute_wrapper(capture):
+                profiler.enable()
+                try:
+                    response = self.get_response(request)
+                finally:
+                    profiler.disable()
+            duration_ms = (time.perf_counter() - started) * 1000
+        finally:
+            _profiler_lock.release()
+
+        self.store(request, response, duration_ms, profiler, capture.queries)
+        return response
+
+    def should_profile(self, request) -> bool:
+        if not getattr(settings, 'PROFILING_ENABLED', False):
+            return False
+        header = request.headers.get('X-Profile')
+        if header is not None:
+            token = getattr(settings, 'PROFILING_TOKEN', None)
+            user = getattr(request, 'user', None)
+            # constant-time comparison, so response timing does not reveal the token
+            if (token and hmac.compare_digest(header.encode(), token.encode())) or (user is not None and user.is_staff):
+                return True
+        return random.random() < getattr(settings, 'PROFILING_SAMPLE_RATE', 0.0)
+
+    def store(self, request, response, duration_ms: float, profiler: cProfile.Profile, queries: list) -> None:
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(PROFILE_LINES)
+        try:
+            view_name = resolve(request.path_info).view_name
+        except Resolver404:
+            view_name = ''
+
+        slow_ms = getattr(settings, 'PROFILING_SLOW_QUERY_MS', DEFAULT_SLOW_QUERY_MS)
+        slowest = sorted(
+            (
+                index for index, (sql, _, milliseconds) in enumerate(queries)
+                if milliseconds >= slow_ms and sql.lstrip().upper().startswith('SELECT')
+            ),
+            key=lambda index: queries[index][2],
+            reverse=True
+        )[:MAX_PLANS]
+        plans = {}
+        for index in slowest:
+            sql, params, _ = queries[index]
+            try:
+                plans[index] = explain(sql, params)
+            except Exception as e:  # a plan is a nice-to-have, never fail the request for it
+                plans[index] = f'EXPLAIN failed: {e}'
+
+        profiled = ProfiledRequest.objects.create(
+            path=request.get_full_path()[:500],
+            view_name=view_name,
+            method=request.method,
+            status_code=response.status_code,
+            duration_ms=duration_ms,
+            sql_count=len(queries),
+            sql_ms=sum(query[2] for query in queries),
+            profile=stream.getvalue(),
+        )
+        ProfiledQuery.objects.bulk_create(
+            ProfiledQuery(
+                request=profiled,
+                fingerprint=fingerprint(sql),
+                sql=sql,
+                duration_ms=milliseconds,
+                plan=plans.get(index, ''),
+            )
+            for index, (sql, _, milliseconds) in enumerate(queries)
+        )
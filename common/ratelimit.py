@@ -0,0 +1,92 @@
+import time
+from functools import wraps
+from threading import Lock
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+
+# buckets idle this long are full again and dropped, so the table only holds active clients
+PRUNE_AFTER_SECONDS = 300
+
+
+class TokenBucket:
+    """
+    In-memory token buckets, one per client: each request takes a token, tokens refill at
+    `rate` per second up to `burst`. Per process, so with N workers a client gets up to
+    N times the limit; fine for shedding keystroke bursts without an external store.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.buckets = {}  # client -> (tokens, last refill)
+        self.lock = Lock()
+        self.last_prune = time.monotonic()
+
+    def take(self, client: str) -> float:
+        """
+        Take a token for client. Returns 0 when allowed, else the seconds until a token is free.
+        """
+        now = time.monotonic()
+        with self.lock:
+            tokens, last = self.buckets.get(client, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens >= 1:
+                self.buckets[client] = (tokens - 1, now)
+                wait = 0.0
+            else:
+                self.buckets[client] = (tokens, now)
+                wait = (1 - tokens) / self.rate
+            if now - self.last_prune > PRUNE_AFTER_SECONDS:
+                self.buckets = {key: value for key, value in self.buckets.items() if now - value[1] < PRUNE_AFTER_SECONDS}
+                self.last_prune = now
+        return wait
+
+
+_limiters = {}
+_limiters_lock = Lock()
+
+
+def client_ip(request: HttpRequest) -> str:
+    # behind RATE_LIMIT_TRUSTED_PROXIES proxies REMOTE_ADDR is the last proxy, so every visitor would share one bucket;
+    # each trusted proxy appends the address it saw to X-Forwarded-For, entries left of those may be forged
+    proxies = getattr(settings, 'RATE_LIMIT_TRUSTED_PROXIES', 0)
+    forwarded = [address.strip() for address in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if address.strip()]
+    if proxies and forwarded:
+        return forwarded[-min(proxies, len(forwarded))]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def client_key(request: HttpRequest) -> str:
+    if request.user.is_authenticated:
+        return f'user:{request.user.pk}'
+    return f'ip:{client_ip(request)}'
+
+
+def get_limiter(name: str) -> TokenBucket | None:
+    rate_limits = getattr(settings, 'RATE_LIMITS', {})
+    if name not in rate_limits:
+        return None
+    with _limiters_lock:
+        if name not in _limiters:
+            _limiters[name] = TokenBucket(*rate_limits[name])
+        return _limiters[name]
+
+
+def rate_limit(name: str):
+    """
+    Limit a view per client with the (rate per second, burst) of settings.RATE_LIMITS[name];
+    over the limit the client gets 429 Too Many Requests with a Retry-After header.
+    Views without an entry in RATE_LIMITS are not limited.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+            limiter = get_limiter(name)
+            wait = limiter.take(client_key(request)) if limiter else 0
+            if wait:
+                response = HttpResponse('Too many requests, slow down.', status=429, content_type='text/plain')
+                response.headers['Retry-After'] = str(max(1, round(wait)))
+                return response
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,18 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from competitions.models import Competition
+from records.models import Record
+from .dashboard import invalidate_widget
+
+
+@receiver(post_save, sender=Competition)
+@receiver(post_delete, sender=Competition)
+def drop_upcoming_competitions(sender, **kwargs) -> None:
+    invalidate_widget('upcoming_competitions')
+
+
+@receiver(post_save, sender=Record)
+@receiver(post_delete, sender=Record)
+def drop_recent_records(sender, **kwargs) -> None:
+    # records from new results are covered by the results version, this catches edits in the admin
+    invalidate_widget('recent_records')
@@ -1,3 +1,108 @@
-from django.test import TestCase
+import cProfile
+import gzip
+import io
+from django.contrib.auth.models import AnonymousUser, User
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from .middleware import CompressionMiddleware
+from .models import ProfiledRequest, ProfiledQuery
+from .profiling import ProfilingMiddleware, _profiler_lock
+from .views import DEFAULT_PROFILING_DAYS
 
-# Create your tests here.
+
+class ProfilingTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.middleware = ProfilingMiddleware(lambda request: HttpResponse('ok'))
+
+    def request(self, user=None, **headers):
+        request = self.factory.get(reverse('common:contact_page'), headers=headers)
+        request.user = user or AnonymousUser()
+        return request
+
+    def test_should_profile(self):
+        staff = User(username='staff', is_staff=True)
+        with override_settings(PROFILING_ENABLED=False):
+            self.assertFalse(self.middleware.should_profile(self.request(staff, X_Profile='1')))
+        with override_settings(PROFILING_ENABLED=True, PROFILING_TOKEN='secret', PROFILING_SAMPLE_RATE=0):
+            self.assertTrue(self.middleware.should_profile(self.request(staff, X_Profile='1')))
+            self.assertTrue(self.middleware.should_profile(self.request(X_Profile='secret')))
+            self.assertFalse(self.middleware.should_profile(self.request(X_Profile='guess')))
+            self.assertFalse(self.middleware.should_profile(self.request()))
+        with override_settings(PROFILING_ENABLED=True, PROFILING_TOKEN=None, PROFILING_SAMPLE_RATE=1):
+            self.assertTrue(self.middleware.should_profile(self.request()))
+
+    @override_settings(PROFILING_ENABLED=True, PROFILING_TOKEN='secret', PROFILING_SLOW_QUERY_MS=0)
+    def test_store(self):
+        response = self.middleware(self.request(X_Profile='secret'))
+
+        profiled = ProfiledRequest.objects.get()
+        self.assertEqual((profiled.view_name, profiled.method, profiled.status_code), ('common:contact_page', 'GET', 200))
+        self.assertIn('function calls', profiled.profile)
+        self.assertEqual(response.content, b'ok')
+
+        profiler = cProfile.Profile()
+        profiler.runcall(sum, [1, 2])
+        queries = [('SELECT 1 WHERE 1 IN (%s, %s)', (1, 2), 5.0), ('SELECT 1 WHERE 1 IN (%s)', (1,), 1.0)]
+        self.middleware.store(self.request(), HttpResponse(), 10.0, profiler, queries)
+        stored = ProfiledQuery.objects.filter(request=ProfiledRequest.objects.latest('pk')).order_by('pk')
+        self.assertEqual(stored.count(), 2)
+        self.assertEqual(stored[0].fingerprint, stored[1].fingerprint)  # IN lists of any length are one statement
+        self.assertTrue(all(query.plan for query in stored))
+
+    @override_settings(PROFILING_ENABLED=True, PROFILING_TOKEN='secret')
+    def test_busy_profiler_serves_unprofiled(self):
+        with _profiler_lock:
+            response = self.middleware(self.request(X_Profile='secret'))
+        self.assertEqual(response.content, b'ok')
+        self.assertFalse(ProfiledRequest.objects.exists())
+        self.middleware(self.request(X_Profile='secret'))
+        self.assertEqual(ProfiledRequest.objects.count(), 1)  # the lock was released
+
+    def test_report_clamps_days(self):
+        self.client.force_login(User.objects.create_user('staff', password='x', is_staff=True))
+        for days in ('99999999999', 'abc', '3'):
+            response = self.client.get(reverse('common:profiling'), {'days': days})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.context['days'], DEFAULT_PROFILING_DAYS)
+        response = self.client.get(reverse('common:profiling'), {'days': '30'})
+        self.assertEqual(response.context['days'], 30)
+
+
+class CompressionTests(TestCase):
+    body = b'<p>results</p>' * 500
+
+    def compressed(self, response, encoding='br, gzip'):
+        request = RequestFactory().get('/', headers={'Accept-Encoding': encoding})
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_html_is_gzipped_with_padding(self):
+        response = self.compressed(HttpResponse(self.body))
+        self.assertEqual(response['Content-Encoding'], 'gzip')  # never brotli, which is not padded
+        self.assertTrue(response.content[3] & 0x08)  # the random FNAME padding of django.utils.text
+        self.assertEqual(gzip.decompress(response.content), self.body)
+
+        stream = self.compressed(StreamingHttpResponse([self.body, self.body], content_type='text/csv'))
+        self.assertEqual(gzip.decompress(b''.join(stream.streaming_content)), self.body * 2)
+
+    def test_svg_is_compressed(self):
+        response = self.compressed(HttpResponse(self.body, content_type='image/svg+xml'), 'gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    def test_pass_through(self):
+        encoded = HttpResponse(gzip.compress(self.body))
+        encoded['Content-Encoding'] = 'gzip'
+        responses = [
+            FileResponse(io.BytesIO(self.body), content_type='text/html'),
+            encoded,
+            HttpResponse(self.body, content_type='image/png'),
+            HttpResponse(self.body, content_type='application/pdf'),
+            HttpResponse(b'<p>small</p>'),
+        ]
+        for response in responses:
+            encoding = response.get('Content-Encoding')
+            passed = self.compressed(response)
+            self.assertEqual(passed.get('Content-Encoding'), encoding)
+            self.assertNotIn('Accept-Encoding', passed.get('Vary', ''))
+        self.assertEqual(b''.join(responses[0].streaming_content), self.body)
@@ -1,5 +1,5 @@
 from django.urls import path
-from common.views import home_page, redirect_home, disciplines, contact_page
+from common.views import home_page, redirect_home, disciplines, contact_page, profiling_report, profiling_detail
 
 app_name = 'common'
 urlpatterns = [
@@ -7,4 +7,6 @@ urlpatterns = [
     path('redirect-home/', redirect_home, name='redirect_home'),
     path("disciplines/", disciplines, name='disciplines'),
     path("contact/", contact_page, name='contact_page'),
+    path("profiling/", profiling_report, name='profiling'),
+    path("profiling/<int:request_id>/", profiling_detail, name='profiling_detail'),
 ]
@@ -0,0 +1,33 @@
+import importlib.util
+import sys
+from django.utils.formats import date_format
+
+
+def lazy_import(name: str):
+    """
+    Import a module on first attribute access rather than here. Keeps heavy libraries
+    (numpy) out of django.setup() for processes that never use them.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def attach_formatted_dates(objects, field: str, attribute: str, format_string: str | None = None) -> None:
+    """
+    Store a display string of a date field on each object. Gives the same output as
+    the |date filter (or a bare {{ date }} when format_string is None), but every
+    distinct date is formatted once instead of once per row.
+    """
+    formatted = {}
+    for obj in objects:
+        value = getattr(obj, field)
+        if value not in formatted:
+            formatted[value] = date_format(value, format_string) if value else ''
+        setattr(obj, attribute, formatted[value])
@@ -1,11 +1,23 @@
+from datetime import timedelta
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db.models import Avg, Count, Max, Sum
 from django.http import HttpResponse, HttpRequest, Http404
-from django.shortcuts import render, redirect
-from athletes.models import Discipline
+from django.shortcuts import render, redirect, get_object_or_404
+from django.utils import timezone
+from records.statistics import discipline_summaries
+from .dashboard import dashboard
+from .models import ProfiledRequest, ProfiledQuery
+
+PROFILING_DAY_CHOICES = [1, 7, 30, 90]
+DEFAULT_PROFILING_DAYS = 7
 
 
 # Create your views here.
 def home_page(request: HttpRequest) -> HttpResponse:
-    return render(request, 'common/home.html')
+    context = {
+        'widgets': dashboard()  # each widget is cached with its own TTL and invalidation, see common.dashboard
+    }
+    return render(request, 'common/home.html', context)
 
 
 def redirect_home(request: HttpRequest) -> HttpResponse:
@@ -13,9 +25,8 @@ def redirect_home(request: HttpRequest) -> HttpResponse:
 
 
 def disciplines(request: HttpRequest) -> HttpResponse:
-    all_disciplines = Discipline.objects.all()
     context = {
-        "disciplines": all_disciplines
+        "disciplines": discipline_summaries()
     }
     return render(request, 'common/disciplines.html', context)
 
@@ -24,5 +35,67 @@ def contact_page(request: HttpRequest) -> HttpResponse:
     return render(request, 'common/contact.html')
 
 
+@staff_member_required
+def profiling_report(request: HttpRequest) -> HttpResponse:
+    try:
+        days = int(request.GET.get('days') or DEFAULT_PROFILING_DAYS)
+    except ValueError:
+        days = DEFAULT_PROFILING_DAYS
+    if days not in PROFILING_DAY_CHOICES:  # a huge value would overflow timedelta
+        days = DEFAULT_PROFILING_DAYS
+    since = timezone.now() - timedelta(days=days)
+    profiled = ProfiledRequest.objects.filter(created_at__gte=since)
+
+    endpoints = (
+        profiled
+        .values('view_name')
+        .annotate(
+            requests=Count('id'),
+            avg_ms=Avg('duration_ms'),
+            max_ms=Max('duration_ms'),
+            avg_sql_count=Avg('sql_count'),
+            avg_sql_ms=Avg('sql_ms'),
+        )
+        .order_by('-avg_ms')[:20]
+    )
+    statements = (
+        ProfiledQuery.objects
+        .filter(request__created_at__gte=since)
+        .values('fingerprint')
+        .annotate(
+            executions=Count('id'),
+            requests=Count('request', distinct=True),
+            total_ms=Sum('duration_ms'),
+            avg_ms=Avg('duration_ms'),
+            max_ms=Max('duration_ms'),
+            sample_id=Max('id'),
+        )
+        .order_by('-total_ms')[:20]
+    )
+    statements = list(statements)
+    samples = ProfiledQuery.objects.in_bulk([statement['sample_id'] for statement in statements])
+    for statement in statements:
+        statement['sql'] = samples[statement['sample_id']].sql
+
+    context = {
+        'days': days,
+        'day_choices': PROFILING_DAY_CHOICES,
+        'endpoints': endpoints,
+        'statements': statements,
+        'slowest': profiled.order_by('-duration_ms')[:20],
+    }
+    return render(request, 'common/profiling.html', context)
+
+
+@staff_member_required
+def profiling_detail(request: HttpRequest, request_id: int) -> HttpResponse:
+    profiled = get_object_or_404(ProfiledRequest, pk=request_id)
+    context = {
+        'profiled': profiled,
+        'queries': profiled.queries.all(),
+    }
+    return render(request, 'common/profiling_detail.html', context)
+
+
 def custom_404_view(request, exception):
     return render(request, 'common/404.html', status=404)
@@ -3,7 +3,9 @@ from django.contrib import admin
 # Register your models here.
 
 from django.contrib import admin
-from .models import CompetitionCategory, Competition
+from common.admin import SoftDeleteAdmin
+from common.paginators import EstimatedCountPaginator
+from .models import CompetitionCategory, Competition, ScheduledEvent
 
 
 # Register your models here.
@@ -15,8 +17,30 @@ class CompetitionCategoryAdmin(admin.ModelAdmin):
     list_filter = ['category_name', ]
 
 
+class ScheduledEventInline(admin.TabularInline):
+    model = ScheduledEvent
+    autocomplete_fields = ['discipline', 'age_category']
+    extra = 0
+
+
 @admin.register(Competition)
-class CompetitionAdmin(admin.ModelAdmin):
+class CompetitionAdmin(SoftDeleteAdmin):
     list_display = ['name', 'country', 'city']
+    list_select_related = ['category']  # Competition.__str__ renders the category on every row
     search_fields = ['name', 'country']
-    list_filter = ['name', 'country']
+    list_filter = ['category', 'country']  # filtering by name listed every competition in the sidebar
+    autocomplete_fields = ['age_groups', 'category']
+    date_hierarchy = 'start_date'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    inlines = [ScheduledEventInline]
+
+
+@admin.register(ScheduledEvent)
+class ScheduledEventAdmin(admin.ModelAdmin):
+    list_display = ['competition', 'discipline', 'age_category', 'round', 'start_time', 'end_time']
+    list_select_related = ['competition__category', 'discipline', 'age_category']
+    list_filter = ['round']
+    search_fields = ['competition__name', 'discipline__name']
+    autocomplete_fields = ['competition', 'discipline', 'age_category']
+    date_hierarchy = 'start_time'
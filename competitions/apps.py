@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class CompetitionsConfig(AppConfig):
     name = 'competitions'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,31 @@
+# Generated by Django 6.0.1 on 2026-10-19 17:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('athletes', '0006_rename_agecategories_agecategory_and_more'),
+        ('competitions', '0003_rename_date_competition_end_date_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduledEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('round', models.CharField(choices=[('QUALIFICATION', 'Qualification'), ('HEATS', 'Heats'), ('QUARTER_FINAL', 'Quarter-final'), ('SEMI_FINAL', 'Semi-final'), ('FINAL', 'Final')], default='FINAL', max_length=20)),
+                ('start_time', models.DateTimeField()),
+                ('end_time', models.DateTimeField()),
+                ('age_category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='scheduled_events', to='athletes.agecategory')),
+                ('competition', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='schedule', to='competitions.competition')),
+                ('discipline', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scheduled_events', to='athletes.discipline')),
+            ],
+            options={
+                'ordering': ['start_time'],
+                'indexes': [models.Index(fields=['competition', 'start_time'], name='schedule_competition_start_idx'), models.Index(fields=['start_time'], name='schedule_start_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 6.0.1 on 2026-10-19 17:45
+
+import datetime
+import django.db.models.expressions
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('athletes', '0009_club_clubmembership'),
+        ('competitions', '0005_competition_deleted_at'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='scheduledevent',
+            constraint=models.CheckConstraint(condition=models.Q(('end_time__gt', models.F('start_time')), ('end_time__lte', django.db.models.expressions.CombinedExpression(models.F('start_time'), '+', models.Value(datetime.timedelta(seconds=21600))))), name='schedule_duration_within_max'),
+        ),
+    ]
@@ -1,6 +1,8 @@
+from datetime import timedelta
 from django.db import models
 from django.db.models import ForeignKey
 from django.core.exceptions import ValidationError
+from common.models import SoftDeleteModel
 
 
 # Create your models here.
@@ -19,7 +21,7 @@ class CompetitionCategory(models.Model):
         return self.category_name
 
 
-class Competition(models.Model):
+class Competition(SoftDeleteModel):
     name = models.CharField(
         max_length=150
     )
@@ -48,3 +50,85 @@ class Competition(models.Model):
 
     def __str__(self) -> str:
         return f"{self.name} is in country {self.country} and is {self.category}"
+
+
+# longest session allowed, so "on now" only has to scan sessions that started within it
+MAX_SESSION_DURATION = timedelta(hours=6)
+
+
+class ScheduledEvent(models.Model):
+    """
+    One session of a meet's timetable: a discipline's round for an age category.
+    """
+    MAX_DURATION = MAX_SESSION_DURATION
+
+    class RoundType(models.TextChoices):
+        QUALIFICATION = "QUALIFICATION", "Qualification"
+        HEATS = "HEATS", "Heats"
+        QUARTER_FINAL = "QUARTER_FINAL", "Quarter-final"
+        SEMI_FINAL = "SEMI_FINAL", "Semi-final"
+        FINAL = "FINAL", "Final"
+
+    competition = models.ForeignKey(
+        Competition,
+        on_delete=models.CASCADE,
+        related_name='schedule'
+    )
+    discipline = models.ForeignKey(
+        'athletes.Discipline',
+        on_delete=models.CASCADE,
+        related_name='scheduled_events'
+    )
+    age_category = models.ForeignKey(
+        'athletes.AgeCategory',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='scheduled_events'
+    )
+    round = models.CharField(
+        max_length=20,
+        choices=RoundType.choices,
+        default=RoundType.FINAL
+    )
+    start_time = models.DateTimeField()
+    end_time = models.DateTimeField()
+
+    class Meta:
+        ordering = ['start_time']
+        indexes = [
+            # a meet's timetable and its "on now / next" lookups are range scans on this index
+            models.Index(fields=['competition', 'start_time'], name='schedule_competition_start_idx'),
+            # the same lookups across all meets
+            models.Index(fields=['start_time'], name='schedule_start_idx'),
+        ]
+        constraints = [
+            # "on now" relies on it, so it holds for rows saved without clean() too
+            models.CheckConstraint(
+                condition=models.Q(end_time__gt=models.F('start_time'))
+                & models.Q(end_time__lte=models.F('start_time') + MAX_SESSION_DURATION),
+                name='schedule_duration_within_max'
+            ),
+        ]
+
+    def clean(self):
+        errors = {}
+        if self.start_time and self.end_time:
+            if self.end_time <= self.start_time:
+                errors['end_time'] = 'End time must be after start time.'
+            elif self.end_time - self.start_time > self.MAX_DURATION:
+                errors['end_time'] = f'A session cannot be longer than {self.MAX_DURATION}.'
+
+        if self.competition_id and self.start_time:
+            if not self.competition.start_date <= self.start_time.date() <= self.competition.end_date:
+                errors['start_time'] = (
+                    'Start time must be within the competition dates '
+                    f'({self.competition.start_date} – {self.competition.end_date}).'
+                )
+
+        if errors:
+            raise ValidationError(errors)
+
+    def __str__(self) -> str:
+        category = f" {self.age_category.get_name_display()}" if self.age_category_id else ""
+        return f"{self.discipline.name}{category} {self.get_round_display()} at {self.start_time:%Y-%m-%d %H:%M}"
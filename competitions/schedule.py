@@ -0,0 +1,138 @@
+import json
+import time
+from datetime import datetime, timezone
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone as django_timezone
+from .models import Competition, ScheduledEvent
+
+FEED_CACHE_SECONDS = 60 * 60 * 24  # feeds are dropped by bump_schedule_version() as soon as the schedule changes
+ICS_LINE_LIMIT = 75
+
+
+def on_now(competition_id: int | None = None, at: datetime | None = None):
+    """
+    Sessions running at `at` (default: now). Sessions last at most ScheduledEvent.MAX_DURATION,
+    so only the start_time range [at - MAX_DURATION, at] of the index is scanned.
+    """
+    at = at or django_timezone.now()
+    events = _events(competition_id).filter(
+        start_time__gt=at - ScheduledEvent.MAX_DURATION,
+        start_time__lte=at,
+        end_time__gt=at,
+    )
+    return events.order_by('start_time')
+
+
+def up_next(competition_id: int | None = None, at: datetime | None = None, limit: int = 5):
+    """
+    The next `limit` sessions starting after `at`, read straight off the start_time index.
+    """
+    at = at or django_timezone.now()
+    return _events(competition_id).filter(start_time__gt=at).order_by('start_time')[:limit]
+
+
+def _events(competition_id: int | None):
+    events = ScheduledEvent.objects.select_related('discipline', 'age_category')
+    if competition_id is not None:
+        events = events.filter(competition_id=competition_id)
+    return events
+
+
+def event_data(event: ScheduledEvent) -> dict:
+    return {
+        'id': event.pk,
+        'competition_id': event.competition_id,
+        'discipline': event.discipline.name,
+        'age_category': event.age_category.get_name_display() if event.age_category_id else None,
+        'gender': event.age_category.gender if event.age_category_id else None,
+        'round': event.round,
+        'start_time': event.start_time.isoformat(),
+        'end_time': event.end_time.isoformat(),
+    }
+
+
+def _version_key(competition_id: int) -> str:
+    return f'schedule-version:{competition_id}'
+
+
+def bump_schedule_version(competition_id: int) -> None:
+    # after commit, so no feed is rebuilt and cached from a schedule that may still roll back
+    transaction.on_commit(lambda: cache.set(_version_key(competition_id), time.time_ns(), None))
+
+
+def schedule_feed(competition: Competition, feed_format: str) -> str:
+    """
+    The competition's full timetable as ICS or JSON text, built once per schedule version.
+    """
+    version = cache.get(_version_key(competition.pk), 0)
+    key = f'schedule-feed:{competition.pk}:{feed_format}:{version}'
+    feed = cache.get(key)
+    if feed is None:
+        events = list(_events(competition.pk).order_by('start_time'))
+        feed = _ics(competition, events) if feed_format == 'ics' else _json(competition, events)
+        cache.set(key, feed, FEED_CACHE_SECONDS)
+    return feed
+
+
+def _json(competition: Competition, events: list[ScheduledEvent]) -> str:
+    return json.dumps({
+        'competition': {
+            'id': competition.pk,
+            'name': competition.name,
+            'city': competition.city,
+            'country': competition.country,
+            'start_date': competition.start_date.isoformat(),
+            'end_date': competition.end_date.isoformat(),
+        },
+        'events': [event_data(event) for event in events],
+    })
+
+
+def _ics(competition: Competition, events: list[ScheduledEvent]) -> str:
+    stamp = _ics_time(django_timezone.now())
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//Athletics Site//Schedule//EN',
+        'CALSCALE:GREGORIAN',
+        f'X-WR-CALNAME:{_ics_text(competition.name)}',
+    ]
+    for event in events:
+        summary = ' '.join(filter(None, [
+            event.discipline.name,
+            event.age_category.get_name_display() if event.age_category_id else None,
+            event.get_round_display(),
+        ]))
+        lines += [
+            'BEGIN:VEVENT',
+            f'UID:scheduled-event-{event.pk}@athletics-site',
+            f'DTSTAMP:{stamp}',
+            f'DTSTART:{_ics_time(event.start_time)}',
+            f'DTEND:{_ics_time(event.end_time)}',
+            f'SUMMARY:{_ics_text(summary)}',
+            f'LOCATION:{_ics_text(f"{competition.city}, {competition.country}")}',
+            'END:VEVENT',
+        ]
+    lines.append('END:VCALENDAR')
+    return ''.join(_fold(line) + '\r\n' for line in lines)
+
+
+def _ics_time(value: datetime) -> str:
+    return value.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _ics_text(value: str) -> str:
+    return value.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+
+def _fold(line: str) -> str:
+    # RFC 5545: lines longer than 75 octets continue on the next line after a space
+    parts, current = [], ''
+    for char in line:
+        if len((current + char).encode()) > ICS_LINE_LIMIT:
+            parts.append(current)
+            current = ' '
+        current += char
+    parts.append(current)
+    return '\r\n'.join(parts)
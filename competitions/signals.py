@@ -0,0 +1,26 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from athletes.models import Discipline
+from .models import Competition, ScheduledEvent
+from .schedule import bump_schedule_version
+
+
+@receiver(post_save, sender=ScheduledEvent)
+@receiver(post_delete, sender=ScheduledEvent)
+def drop_cached_schedule(sender, instance: ScheduledEvent, **kwargs) -> None:
+    bump_schedule_version(instance.competition_id)
+
+
+@receiver(post_save, sender=Competition)
+def drop_cached_schedule_on_rename(sender, instance: Competition, **kwargs) -> None:
+    # the feeds carry the competition's name and location
+    bump_schedule_version(instance.pk)
+
+
+@receiver(post_save, sender=Discipline)
+def drop_cached_schedule_on_discipline_rename(sender, instance: Discipline, created: bool, raw: bool = False, **kwargs) -> None:
+    # the feeds name each session after its discipline
+    if created or raw:
+        return
+    for competition_id in ScheduledEvent.objects.filter(discipline=instance).values_list('competition_id', flat=True).distinct():
+        bump_schedule_version(competition_id)
@@ -1,7 +1,9 @@
 from django.urls import path
-from .views import list_competitions
+from .views import list_competitions, competition_schedule, whats_on
 app_name = 'competitions'
 
 urlpatterns = [
-    path('list/', list_competitions, name='list')
+    path('list/', list_competitions, name='list'),
+    path('<int:competition_id>/schedule.<str:feed_format>', competition_schedule, name='schedule'),
+    path('now/', whats_on, name='whats_on'),
 ]
@@ -1,13 +1,45 @@
-from django.http import HttpRequest, HttpResponse
-from django.shortcuts import render
+from django.http import HttpRequest, HttpResponse, JsonResponse, Http404
+from django.shortcuts import render, get_object_or_404
 
 from competitions.models import Competition
+from .schedule import on_now, up_next, event_data, schedule_feed
+
+FEED_CONTENT_TYPES = {
+    'ics': 'text/calendar; charset=utf-8',
+    'json': 'application/json',
+}
 
 
 # Create your views here.
 def list_competitions(request: HttpRequest) -> HttpResponse:
-    all_competitions = Competition.objects.all().order_by('-end_date')
+    all_competitions = (
+        Competition.objects
+        .select_related('category')
+        .prefetch_related('age_groups')
+        .order_by('-end_date')
+    )
     context = {
         "competitions": all_competitions
     }
     return render(request, 'competitions/list_competitions.html', context)
+
+
+def competition_schedule(request: HttpRequest, competition_id: int, feed_format: str) -> HttpResponse:
+    if feed_format not in FEED_CONTENT_TYPES:
+        raise Http404('Unknown schedule format.')
+    competition = get_object_or_404(Competition, pk=competition_id)
+    response = HttpResponse(schedule_feed(competition, feed_format), content_type=FEED_CONTENT_TYPES[feed_format])
+    if feed_format == 'ics':
+        response['Content-Disposition'] = f'inline; filename="competition-{competition.pk}.ics"'
+    return response
+
+
+def whats_on(request: HttpRequest) -> JsonResponse:
+    try:
+        competition_id = int(request.GET['competition']) if request.GET.get('competition') else None
+    except ValueError:
+        return JsonResponse({'error': 'competition must be an id.'}, status=400)
+    return JsonResponse({
+        'on_now': [event_data(event) for event in on_now(competition_id)],
+        'up_next': [event_data(event) for event in up_next(competition_id)],
+    })
@@ -23,9 +23,13 @@ from datetime import date, timedelta
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'athletics_site.settings')
 django.setup()
 
+from athletes.matching import AthleteMatcher
 from athletes.models import Athlete, AgeCategory, Discipline
 from competitions.models import Competition, CompetitionCategory
 from records.models import Results
+from records.scoring import load_default_coefficients
+from records.snapshot import publish_snapshot
+from django.conf import settings
 
 
 def load_data():
@@ -79,7 +83,7 @@ def load_data():
     Results.objects.all().delete()
     print("  ✓ Cleared Results")
 
-    Competition.objects.all().delete()
+    Competition.all_objects.all().delete()
     print("  ✓ Cleared Competitions")
 
     # Now we can safely delete CompetitionCategory
@@ -87,7 +91,7 @@ def load_data():
     print("  ✓ Cleared Competition Categories")
 
     # Clear athlete-related data
-    Athlete.objects.all().delete()
+    Athlete.all_objects.all().delete()
     print("  ✓ Cleared Athletes")
 
     AgeCategory.objects.all().delete()
@@ -123,6 +127,10 @@ def load_data():
         if created:
             print(f"  ✓ Created: {disc['name']}")
 
+    # Scoring tables, so results get performance points as they are created
+    print("\nLoading scoring tables...")
+    print(f"  ✓ Loaded {load_default_coefficients()} coefficients")
+
     # 2. Create Age Categories
     print("\nCreating age categories...")
     # All age categories from your model, for both genders
@@ -255,9 +263,10 @@ def load_data():
     ]
 
     athletes = {}
+    matcher = AthleteMatcher()  # resolves differently spelled names to the same athlete
     for athlete_data in athletes_data:
         disciplines_list = athlete_data.pop('disciplines')
-        athlete, created = Athlete.objects.get_or_create(**athlete_data)
+        athlete, created = matcher.get_or_create(**athlete_data)
         athletes[f"{athlete_data['first_name']} {athlete_data['last_name']}"] = athlete
 
         # Add disciplines
@@ -502,6 +511,10 @@ def load_data():
     print(f"  • Competitions: {Competition.objects.count()}")
     print(f"  • Results: {Results.objects.count()}")
 
+    # Publish a fresh results snapshot for the web workers, if they share one
+    if settings.RESULTS_SNAPSHOT_DIR:
+        print(f"\n✓ Published results snapshot {publish_snapshot(settings.RESULTS_SNAPSHOT_DIR)}")
+
 
 if __name__ == '__main__':
     try:
@@ -1,11 +1,80 @@
 from django.contrib import admin
-from .models import Results
+from common.paginators import EstimatedCountPaginator
+from .models import Results, Record, ScoringCoefficient, Round, Heat, ClubStanding
+from .qualification import qualify_round
 
 
 # Register your models here.
 
 @admin.register(Results)
 class ResultsAdmin(admin.ModelAdmin):
-    list_display = ['athlete', 'age_category', 'competition', 'discipline', 'position', 'result_value', 'result_date']
+    list_display = ['athlete', 'age_category', 'competition', 'discipline', 'position', 'result_value', 'qualification', 'points', 'result_date']
+    list_select_related = ['athlete', 'age_category', 'competition__category', 'discipline']  # every column is rendered via __str__
     search_fields = ['athlete__first_name', 'athlete__last_name', 'competition__name']
     list_filter = ['age_category', 'discipline']
+    autocomplete_fields = ['athlete', 'age_category', 'competition', 'discipline', 'heat']
+    date_hierarchy = 'result_date'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(Record)
+class RecordAdmin(admin.ModelAdmin):
+    list_display = ['discipline', 'gender', 'age_category', 'scope', 'scope_key', 'mark', 'athlete', 'set_on', 'is_current']
+    list_select_related = ['discipline', 'age_category', 'athlete']
+    search_fields = ['athlete__first_name', 'athlete__last_name', 'scope_key']
+    list_filter = ['is_current', 'scope', 'gender', 'discipline']
+    autocomplete_fields = ['discipline', 'age_category', 'athlete', 'competition', 'result', 'previous']
+    date_hierarchy = 'set_on'
+
+
+@admin.register(ScoringCoefficient)
+class ScoringCoefficientAdmin(admin.ModelAdmin):
+    list_display = ['discipline', 'gender', 'a', 'b', 'c', 'unit_scale']
+    list_select_related = ['discipline']
+    list_filter = ['gender', 'discipline']
+
+
+class HeatInline(admin.TabularInline):
+    model = Heat
+    extra = 0
+
+
+@admin.register(Round)
+class RoundAdmin(admin.ModelAdmin):
+    list_display = ['competition', 'discipline', 'age_category', 'round_type', 'qualifiers_per_heat', 'fastest_losers']
+    list_select_related = ['competition', 'discipline', 'age_category']
+    search_fields = ['competition__name', 'discipline__name']
+    list_filter = ['round_type', 'discipline']
+    autocomplete_fields = ['competition', 'discipline', 'age_category', 'next_round']
+    inlines = [HeatInline]
+    actions = ['compute_qualifiers']
+
+    @admin.action(description='Compute qualifiers (Q/q) for the selected rounds')
+    def compute_qualifiers(self, request, queryset):
+        for round_ in queryset.select_related('competition', 'discipline'):
+            flags = qualify_round(round_)
+            self.message_user(request, f'{round_}: {len(flags)} qualified.')
+
+
+@admin.register(Heat)
+class HeatAdmin(admin.ModelAdmin):
+    list_display = ['round', 'number']
+    list_select_related = ['round__competition', 'round__discipline']
+    search_fields = ['round__competition__name', 'round__discipline__name']
+    autocomplete_fields = ['round']
+
+
+@admin.register(ClubStanding)
+class ClubStandingAdmin(admin.ModelAdmin):
+    # computed by records.clubs, rebuilt with manage.py refresh_club_standings
+    list_display = ['club', 'competition', 'season', 'points', 'scoring_results', 'wins']
+    list_select_related = ['club', 'competition']
+    search_fields = ['club__name', 'competition__name']
+    list_filter = ['season']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,134 @@
+import logging
+from collections import defaultdict
+from django.db import transaction
+from django.db.models import Case, When, Q, F, Value, IntegerField
+from django.db.models.functions import ExtractYear, ExtractMonth, ExtractDay
+from django.db.models.lookups import LessThan
+from athletes.models import AgeCategory
+from competitions.models import Competition
+from .clubs import schedule_club_standings_refresh
+from .models import Results
+from .registry import detect_records, held_records, schedule_records_rebuild
+from .snapshot import mark_stale
+from .statistics import invalidate_statistics
+from .utils import schedule, schedule_rerank, bump_results_version
+
+logger = logging.getLogger(__name__)
+
+
+def age_at_competition():
+    """
+    SQL twin of athletes.utils.calculate_age(birth_date, competition start): whole years,
+    one less when the birthday is still ahead in the competition's year.
+    """
+    start, birth = 'competition__start_date', 'athlete__birth_date'
+    birthday_ahead = LessThan(
+        ExtractMonth(start) * 100 + ExtractDay(start),
+        ExtractMonth(birth) * 100 + ExtractDay(birth),
+    )
+    return (
+        ExtractYear(start) - ExtractYear(birth)
+        - Case(When(birthday_ahead, then=Value(1)), default=Value(0), output_field=IntegerField())
+    )
+
+
+def mismatched_results(category_ids=None):
+    """
+    Results whose age category no longer fits the athlete, by the same rules as Results.clean:
+    too young, too old or the wrong gender. One query, the age is computed by the database.
+    """
+    queryset = Results.objects.filter(age_category__isnull=False)
+    if category_ids is not None:
+        queryset = queryset.filter(age_category_id__in=category_ids)
+    return queryset.annotate(age=age_at_competition()).filter(
+        Q(age__lt=F('age_category__min_age'))
+        | Q(age__gt=F('age_category__max_age'))
+        | ~Q(athlete__gender=F('age_category__gender'))
+    )
+
+
+def fitting_category(categories: list[AgeCategory], gender: str, age: int) -> AgeCategory | None:
+    # the narrowest category that fits, so a 17 year old goes to U18 rather than an open range
+    fitting = [
+        category for category in categories
+        if category.gender == gender
+        and (category.min_age is None or category.min_age <= age)
+        and (category.max_age is None or age <= category.max_age)
+    ]
+    return min(fitting, key=lambda category: (category.max_age or 999) - (category.min_age or 0), default=None)
+
+
+def revalidate_age_categories(category_ids=None, fix: bool = False) -> list[dict]:
+    """
+    Find results whose age category does not fit any more, e.g. after its bounds changed.
+    With fix, move each of them to the fitting category the competition holds, with one UPDATE
+    per target category, then rerank the partitions they left and joined and move the age
+    category records they set. Rows that no category
+    of the competition fits, or that belong to a heat of the old category's round, are left for
+    an editor and get a `skipped` reason instead. Returns the mismatched rows.
+    """
+    rows = list(
+        mismatched_results(category_ids)
+        .order_by('id')
+        .values('id', 'age', 'athlete__gender', 'age_category_id', 'competition_id', 'discipline_id', 'heat_id')
+    )
+    if not fix or not rows:
+        return rows
+
+    age_groups = defaultdict(list)
+    links = Competition.age_groups.through.objects.filter(
+        competition_id__in={row['competition_id'] for row in rows}
+    ).select_related('agecategory')
+    for link in links:
+        age_groups[link.competition_id].append(link.agecategory)
+
+    moves = defaultdict(list)
+    for row in rows:
+        if row['heat_id']:
+            row['skipped'] = 'in a heat of a round of its category'
+            continue
+        target = fitting_category(age_groups[row['competition_id']], row['athlete__gender'], row['age'])
+        if target is None:
+            row['skipped'] = 'no age group of the competition fits'
+            continue
+        row['fixed_category_id'] = target.pk
+        moves[target.pk].append(row['id'])
+    moved = [row for row in rows if 'fixed_category_id' in row]
+    if not moved:
+        return rows
+
+    moved_ids = [row['id'] for row in moved]
+    with transaction.atomic():
+        # records the rows hold in their old category lose them; the open (all ages) ones stay
+        schedule_records_rebuild({held for held in held_records(moved_ids) if held[2] is not None})
+        for category_id, ids in moves.items():
+            Results.objects.filter(pk__in=ids).update(age_category_id=category_id)
+        moved_results = Results.objects.filter(pk__in=moved_ids).select_related('athlete', 'competition', 'discipline')
+        for result in moved_results.order_by('result_date', 'id'):
+            detect_records(result)  # the new category's records; earlier-dated ones rebuild its chains
+        # update() sends no signals, so refresh what records.signals would
+        schedule_rerank(
+            {(row['competition_id'], row['discipline_id'], row['age_category_id']) for row in moved}
+            | {(row['competition_id'], row['discipline_id'], row['fixed_category_id']) for row in moved}
+        )
+        schedule_club_standings_refresh({row['competition_id'] for row in moved})  # positions change
+        invalidate_statistics(
+            {(row['discipline_id'], row['age_category_id']) for row in moved}
+            | {(row['discipline_id'], row['fixed_category_id']) for row in moved}
+        )
+        bump_results_version()
+        mark_stale()
+    return rows
+
+
+def report_mismatches(category_ids) -> None:
+    count = mismatched_results(category_ids).count()
+    if count:
+        logger.warning(
+            '%d results no longer fit their age category; run "manage.py revalidate_age_categories --fix".', count
+        )
+
+
+def schedule_revalidation(category_ids) -> None:
+    # once per transaction, after commit, however many categories were saved
+    schedule(report_mismatches, category_ids)
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class ResultsConfig(AppConfig):
     name = 'records'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,125 @@
+from datetime import date
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from .head_to_head import schedule_head_to_head_refresh
+from .models import Results, ArchivedResult, Record
+from .snapshot import mark_stale
+from .statistics import invalidate_statistics
+from .utils import bump_results_version
+
+RESULTS_TABLE = connection.ops.quote_name(Results._meta.db_table)
+ARCHIVE_TABLE = connection.ops.quote_name(ArchivedResult._meta.db_table)
+
+# the same row in both tables; the archive keeps the original id in result_id
+RESULTS_COLUMNS = [
+    'id', 'athlete_id', 'competition_id', 'discipline_id', 'age_category_id', 'heat_id',
+    'position', 'result_value', 'result_date', 'points', 'qualification',
+]
+ARCHIVE_COLUMNS = ['result_id', *RESULTS_COLUMNS[1:]]
+
+
+def season_bounds(season: int) -> tuple[date, date]:
+    # a season is a calendar year of result dates, like the year filter of the results page
+    return date(season, 1, 1), date(season + 1, 1, 1)
+
+
+def archived_seasons() -> list[int]:
+    return [d.year for d in ArchivedResult.objects.dates('result_date', 'year')]
+
+
+def is_archived(season: int) -> bool:
+    start, end = season_bounds(season)
+    return ArchivedResult.objects.filter(result_date__gte=start, result_date__lt=end).exists()
+
+
+def archive_season(season: int) -> int:
+    """
+    Move every result of a season from Results into the archive with one INSERT ... SELECT
+    and one DELETE. Records keep their mark and remember the archived result's id, so a restore links them again.
+    The current season cannot be archived. Returns the number of results moved.
+    """
+    if season >= timezone.localdate().year:
+        raise ValueError(f'{season} is not a finished season.')
+    start, end = season_bounds(season)
+    hot = Results.objects.filter(result_date__gte=start, result_date__lt=end)
+
+    with transaction.atomic():
+        touched = _touched(hot)
+        if connection.vendor == 'postgresql':
+            _create_partition(season)
+        Record.objects.filter(result__in=hot).update(archived_result_id=F('result_id'), result=None)
+        moved = _move(RESULTS_TABLE, RESULTS_COLUMNS, ARCHIVE_TABLE, ARCHIVE_COLUMNS, start, end)
+        _delete(RESULTS_TABLE, start, end)
+        _refresh(touched)
+    return moved
+
+
+def restore_season(season: int) -> int:
+    """
+    Move an archived season back into Results, under the ids it had there, and link the
+    records set by its results to them again. Returns the number of results moved.
+    """
+    start, end = season_bounds(season)
+    archived = ArchivedResult.objects.filter(result_date__gte=start, result_date__lt=end)
+
+    with transaction.atomic():
+        touched = _touched(archived)
+        moved = _move(ARCHIVE_TABLE, ARCHIVE_COLUMNS, RESULTS_TABLE, RESULTS_COLUMNS, start, end)
+        Record.objects.filter(archived_result_id__in=archived.values('result_id')).update(
+            result=F('archived_result_id'), archived_result_id=None
+        )
+        if connection.vendor == 'postgresql':
+            # the season's partition is empty now, dropping it is cheaper than deleting its rows
+            with connection.cursor() as cursor:
+                cursor.execute(f'DROP TABLE IF EXISTS {_partition_name(season)}')
+        else:
+            _delete(ARCHIVE_TABLE, start, end)
+        _refresh(touched)
+    return moved
+
+
+def _partition_name(season: int) -> str:
+    return connection.ops.quote_name(f'{ArchivedResult._meta.db_table}_{season}')
+
+
+def _create_partition(season: int) -> None:
+    start, end = season_bounds(season)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {_partition_name(season)} PARTITION OF {ARCHIVE_TABLE} "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+
+
+def _move(source: str, source_columns: list[str], target: str, target_columns: list[str], start: date, end: date) -> int:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {target} ({', '.join(target_columns)})
+            SELECT {', '.join(source_columns)} FROM {source}
+            WHERE result_date >= %s AND result_date < %s
+            """,
+            [start, end]
+        )
+        return cursor.rowcount
+
+
+def _delete(table: str, start: date, end: date) -> None:
+    # raw, so Django does not load and signal every row; ranking of the other seasons is unaffected
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table} WHERE result_date >= %s AND result_date < %s', [start, end])
+
+
+def _touched(queryset) -> tuple[set, set]:
+    rows = set(queryset.values_list('athlete_id', 'discipline_id', 'age_category_id').distinct())
+    return {row[0] for row in rows}, {row[1:] for row in rows}
+
+
+def _refresh(touched: tuple[set, set]) -> None:
+    # head-to-head, statistics, the snapshot and cached pages only cover results in Results
+    athlete_ids, statistics_partitions = touched
+    schedule_head_to_head_refresh(athlete_ids)
+    invalidate_statistics(statistics_partitions)
+    bump_results_version()
+    mark_stale()
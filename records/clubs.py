@@ -0,0 +1,103 @@
+import time
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import ExtractYear
+from .models import Results, ArchivedResult, ClubStanding
+from .utils import schedule, deciding_round
+
+# points for places 1-8 in every ranked partition, as in most national club competitions
+CLUB_POINTS = {1: 8, 2: 7, 3: 6, 4: 5, 5: 4, 6: 3, 7: 2, 8: 1}
+CACHE_TIMEOUT = 60 * 60 * 24  # rankings are dropped by a new standings version as soon as they change
+STANDINGS_VERSION_KEY = 'club-standings-version'
+
+
+def club_points():
+    return Case(
+        *[When(position=place, then=Value(points)) for place, points in CLUB_POINTS.items()],
+        default=Value(0),
+        output_field=IntegerField()
+    )
+
+
+def compute_standings(competition_ids) -> list[ClubStanding]:
+    """
+    Club scores of the given competitions from one grouped query: every result placed within
+    CLUB_POINTS in the deciding round (not heats or semis) counts for the club its athlete
+    belonged to on the result date.
+    """
+    on_result_date = Q(athlete__memberships__start_date__lte=F('result_date')) & (
+        Q(athlete__memberships__end_date__isnull=True) | Q(athlete__memberships__end_date__gte=F('result_date'))
+    )
+    rows = (
+        Results.objects
+        .filter(deciding_round(), competition_id__in=competition_ids, position__gte=1, position__lte=max(CLUB_POINTS))
+        .filter(on_result_date)  # one filter(), so both bounds apply to the same membership
+        .values('athlete__memberships__club_id', 'competition_id')
+        .annotate(
+            season=ExtractYear('competition__start_date'),
+            points=Sum(club_points()),
+            scoring_results=Count('id'),
+            wins=Count('id', filter=Q(position=1)),
+        )
+        .order_by()
+    )
+    return [
+        ClubStanding(
+            club_id=row['athlete__memberships__club_id'],
+            competition_id=row['competition_id'],
+            season=row['season'],
+            points=row['points'],
+            scoring_results=row['scoring_results'],
+            wins=row['wins'],
+        )
+        for row in rows
+    ]
+
+
+def refresh_club_standings(competition_ids) -> None:
+    """
+    Replace the standings of the given competitions only; the rest of the table is untouched.
+    Competitions with archived results keep the standings they had when they were archived,
+    since their results are no longer in Results to recompute them from.
+    """
+    competition_ids = set(competition_ids) - set(
+        ArchivedResult.objects.filter(competition_id__in=competition_ids).values_list('competition_id', flat=True)
+    )
+    with transaction.atomic():
+        ClubStanding.objects.filter(competition_id__in=competition_ids).delete()
+        ClubStanding.objects.bulk_create(compute_standings(competition_ids))
+        transaction.on_commit(lambda: cache.set(STANDINGS_VERSION_KEY, time.time_ns(), None))
+
+
+def schedule_club_standings_refresh(competition_ids) -> None:
+    # after commit and after the reranks scheduled before it, since points come from positions
+    schedule(refresh_club_standings, competition_ids)
+
+
+def club_rankings(season: int | None = None, competition_id: int | None = None) -> list[dict]:
+    """
+    Clubs by points at one competition, or summed over a season's competitions. Read from
+    the standings table, never from Results, and cached until the standings change.
+    """
+    key = f'club-rankings:{cache.get(STANDINGS_VERSION_KEY, 0)}:{season}:{competition_id}'
+    rankings = cache.get(key)
+    if rankings is None:
+        standings = ClubStanding.objects.all()
+        if competition_id:
+            standings = standings.filter(competition_id=competition_id)
+        elif season:
+            standings = standings.filter(season=season)
+        rankings = list(
+            standings
+            .values('club_id', 'club__name', 'club__country')
+            .annotate(
+                total=Sum('points'),
+                competitions=Count('competition', distinct=True),
+                scoring_results=Sum('scoring_results'),
+                wins=Sum('wins'),
+            )
+            .order_by('-total', '-wins', 'club__name')
+        )
+        cache.set(key, rankings, CACHE_TIMEOUT)
+    return rankings
@@ -0,0 +1,248 @@
+import csv
+import io
+import json
+import struct
+import sys
+from array import array
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+# (column, lookup) pairs of a flat result row joined with athlete, competition, discipline and category
+EXPORT_FIELDS = [
+    ('result_id', 'id'),
+    ('athlete_id', 'athlete_id'),
+    ('first_name', 'athlete__first_name'),
+    ('last_name', 'athlete__last_name'),
+    ('gender', 'athlete__gender'),
+    ('nationality', 'athlete__nationality'),
+    ('birth_date', 'athlete__birth_date'),
+    ('competition', 'competition__name'),
+    ('city', 'competition__city'),
+    ('country', 'competition__country'),
+    ('start_date', 'competition__start_date'),
+    ('end_date', 'competition__end_date'),
+    ('competition_category', 'competition__category__category_name'),
+    ('discipline', 'discipline__name'),
+    ('age_category', 'age_category__name'),
+    ('position', 'position'),
+    ('result_value', 'result_value'),
+    ('result_date', 'result_date'),
+    ('round', 'heat__round__round_type'),  # empty for results without a heat
+    ('heat', 'heat__number'),  # 0 for results without a heat
+]
+EXPORT_COLUMNS = [column for column, _ in EXPORT_FIELDS]
+# columns added later, filled with these values when reading older files
+OPTIONAL_COLUMNS = {'round': '', 'heat': 0}
+
+# column types of the columnar format
+COLUMN_TYPES = {
+    'result_id': 'int64',
+    'athlete_id': 'int64',
+    'birth_date': 'date',
+    'start_date': 'date',
+    'end_date': 'date',
+    'position': 'int64',
+    'result_value': 'decimal2',
+    'result_date': 'date',
+    'heat': 'int64',
+}
+
+DEFAULT_CHUNK_SIZE = 2000
+
+COLUMNAR_MAGIC = b'ATHCOL1\n'
+COLUMNAR_CONTENT_TYPE = 'application/x-athletics-columnar'
+
+_EPOCH = date(1970, 1, 1).toordinal()
+
+
+def export_rows(queryset, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Stream result rows as tuples in EXPORT_COLUMNS order. iterator() uses a server-side
+    cursor on PostgreSQL, so memory stays flat however many results there are.
+    """
+    return (
+        queryset
+        .order_by('id')
+        .values_list(*[lookup for _, lookup in EXPORT_FIELDS])
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def iter_csv(rows, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for count, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if count % chunk_size == 0:
+            yield _drain(buffer)
+    yield _drain(buffer)
+
+
+def iter_jsonl(rows, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    buffer = io.StringIO()
+    for count, row in enumerate(rows, start=1):
+        buffer.write(json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=_json_default))
+        buffer.write('\n')
+        if count % chunk_size == 0:
+            yield _drain(buffer)
+    yield _drain(buffer)
+
+
+def iter_columnar(rows, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Compact column-oriented binary format for analytics:
+
+        magic | uint32 header length | JSON header | block* | uint32 0
+
+    Each block starts with its uint32 row count followed by one length-prefixed payload per column:
+    int64 columns and decimals (scaled by 100) as little-endian int64 arrays, dates as int32 days since
+    1970-01-01, and strings dictionary-encoded per block (uint32 codes, int32 offsets, UTF-8 blob).
+    Missing strings are written as ''. Payloads load directly with numpy.frombuffer.
+    """
+    header = json.dumps({
+        'columns': [{'name': column, 'type': COLUMN_TYPES.get(column, 'str')} for column in EXPORT_COLUMNS],
+    }).encode()
+    yield COLUMNAR_MAGIC + struct.pack('<I', len(header)) + header
+
+    block = []
+    for row in rows:
+        block.append(row)
+        if len(block) == chunk_size:
+            yield _encode_block(block)
+            block = []
+    if block:
+        yield _encode_block(block)
+    yield struct.pack('<I', 0)
+
+
+def read_columnar(stream):
+    """
+    Read a columnar export back, yielding one {column: list of values} dict per block.
+    """
+    if stream.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+        raise ValueError('Not a columnar results export.')
+    (header_length,) = struct.unpack('<I', stream.read(4))
+    columns = json.loads(stream.read(header_length))['columns']
+
+    while True:
+        (row_count,) = struct.unpack('<I', stream.read(4))
+        if row_count == 0:
+            return
+        block = {}
+        for column in columns:
+            (length,) = struct.unpack('<I', stream.read(4))
+            block[column['name']] = _decode_column(column['type'], stream.read(length), row_count)
+        yield block
+
+
+def read_export_file(path) -> list[dict]:
+    """
+    Read a results export file (.csv, .jsonl or .athcol) back into row dicts with dates and
+    decimals restored. Uses no Django APIs, so it can run in a worker process.
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix == '.csv':
+        with open(path, newline='', encoding='utf-8') as stream:
+            rows = list(csv.DictReader(stream))
+    elif suffix == '.jsonl':
+        with open(path, encoding='utf-8') as stream:
+            rows = [json.loads(line) for line in stream if line.strip()]
+    elif suffix == '.athcol':
+        with open(path, 'rb') as stream:
+            return [dict(zip(block, values)) for block in read_columnar(stream) for values in zip(*block.values())]
+    else:
+        raise ValueError(f'{path}: unsupported file type "{suffix}", expected .csv, .jsonl or .athcol.')
+
+    for row in rows:
+        for column, default in OPTIONAL_COLUMNS.items():
+            row.setdefault(column, default)
+        missing = [column for column in EXPORT_COLUMNS if column not in row]
+        if missing:
+            raise ValueError(f'{path}: missing columns {", ".join(missing)}.')
+        for column in EXPORT_COLUMNS:
+            column_type = COLUMN_TYPES.get(column, 'str')
+            if column_type == 'date':
+                row[column] = date.fromisoformat(row[column])
+            elif column_type == 'decimal2':
+                row[column] = Decimal(row[column])
+            elif column_type == 'int64':
+                row[column] = int(row[column] or 0)  # empty in CSV, null in JSON lines
+            elif row[column] is None:
+                row[column] = ''  # as in CSV and the columnar format
+    return rows
+
+
+def _encode_block(block: list[tuple]) -> bytes:
+    parts = [struct.pack('<I', len(block))]
+    for index, column in enumerate(EXPORT_COLUMNS):
+        values = [row[index] for row in block]
+        payload = _encode_column(COLUMN_TYPES.get(column, 'str'), values)
+        parts.append(struct.pack('<I', len(payload)))
+        parts.append(payload)
+    return b''.join(parts)
+
+
+def _encode_column(column_type: str, values: list) -> bytes:
+    if column_type == 'int64':
+        return _le_bytes(array('q', [value or 0 for value in values]))
+    if column_type == 'decimal2':
+        return _le_bytes(array('q', [int(value * 100) for value in values]))
+    if column_type == 'date':
+        return _le_bytes(array('i', [value.toordinal() - _EPOCH for value in values]))
+
+    dictionary, codes = {}, array('I')
+    for value in values:
+        codes.append(dictionary.setdefault(value or '', len(dictionary)))
+    encoded = [value.encode() for value in dictionary]
+    offsets = array('i', [0])
+    for value in encoded:
+        offsets.append(offsets[-1] + len(value))
+    return struct.pack('<I', len(encoded)) + _le_bytes(codes) + _le_bytes(offsets) + b''.join(encoded)
+
+
+def _decode_column(column_type: str, payload: bytes, row_count: int) -> list:
+    if column_type in ('int64', 'decimal2'):
+        values = _from_le_bytes('q', payload)
+        return [Decimal(value).scaleb(-2) for value in values] if column_type == 'decimal2' else values.tolist()
+    if column_type == 'date':
+        return [date.fromordinal(value + _EPOCH) for value in _from_le_bytes('i', payload)]
+
+    (size,) = struct.unpack_from('<I', payload)
+    codes_end = 4 + row_count * 4
+    offsets_end = codes_end + (size + 1) * 4
+    codes = _from_le_bytes('I', payload[4:codes_end])
+    offsets = _from_le_bytes('i', payload[codes_end:offsets_end])
+    blob = payload[offsets_end:]
+    dictionary = [blob[offsets[i]:offsets[i + 1]].decode() for i in range(size)]
+    return [dictionary[code] for code in codes]
+
+
+def _le_bytes(values: array) -> bytes:
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_le_bytes(typecode: str, payload: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(payload)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def _drain(buffer: io.StringIO) -> str:
+    value = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return value
+
+
+def _json_default(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f'Cannot serialize {type(value).__name__}')
@@ -0,0 +1,111 @@
+from django import forms
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from .models import Results
+from .scoring import points_for
+from .signals import results_bulk_created
+
+
+class BulkResultForm(forms.Form):
+    # plain choice fields instead of ModelChoiceField, which would run one query per row and field
+    athlete = forms.TypedChoiceField(
+        coerce=int,
+        empty_value=None
+    )
+    age_category = forms.TypedChoiceField(
+        coerce=int,
+        empty_value=None,
+        required=False
+    )
+    result_value = forms.DecimalField(
+        max_digits=7,
+        decimal_places=2,
+        min_value=0
+    )
+    result_date = forms.DateField(
+        widget=forms.DateInput(attrs={'type': 'date'})
+    )
+
+    def __init__(self, *args, athlete_choices=(), category_choices=(), default_date=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['athlete'].choices = [('', '---------')] + list(athlete_choices)
+        self.fields['age_category'].choices = [('', '---------')] + list(category_choices)
+        self.fields['result_date'].initial = default_date
+
+
+class BaseBulkResultsFormSet(forms.BaseFormSet):
+    """
+    All rows of one heat / field event. Reference data is loaded once for the whole
+    formset and every row is validated in memory, then saved with a single bulk_create
+    and ranked in the database.
+    """
+
+    def __init__(self, *args, competition, discipline, **kwargs):
+        self.competition = competition
+        self.discipline = discipline
+        self.athletes = {a.pk: a for a in discipline.athlete.all()}
+        self.age_categories = {c.pk: c for c in competition.age_groups.all()}
+        self.results = []
+
+        kwargs['form_kwargs'] = {
+            'athlete_choices': [(pk, str(a)) for pk, a in self.athletes.items()],
+            'category_choices': [(pk, str(c)) for pk, c in self.age_categories.items()],
+            'default_date': competition.start_date,
+        }
+        super().__init__(*args, **kwargs)
+
+    def clean(self):
+        if any(self.errors):
+            return
+
+        self.results = []
+        seen_athletes = set()
+
+        for form in self.forms:
+            if not form.has_changed():
+                continue
+
+            data = form.cleaned_data
+            if data['athlete'] in seen_athletes:
+                form.add_error('athlete', 'Athlete is entered more than once.')
+                continue
+            seen_athletes.add(data['athlete'])
+
+            result = Results(
+                athlete=self.athletes[data['athlete']],
+                competition=self.competition,
+                discipline=self.discipline,
+                age_category=self.age_categories.get(data['age_category']),
+                result_value=data['result_value'],
+                result_date=data['result_date'],
+                position=0,
+            )
+
+            try:
+                result.clean()  # related objects are already attached, so no queries here
+            except ValidationError as e:
+                for field, messages in e.message_dict.items():
+                    form.add_error(field if field in form.fields else None, messages)
+                continue
+
+            self.results.append(result)
+
+        if not self.results and not any(self.errors):
+            raise ValidationError('Enter at least one result.')
+
+    def save(self) -> list[Results]:
+        for result in self.results:
+            result.points = points_for(result)
+        with transaction.atomic():
+            created = Results.objects.bulk_create(self.results)
+            results_bulk_created(created)
+        return created
+
+
+BulkResultsFormSet = forms.formset_factory(
+    BulkResultForm,
+    formset=BaseBulkResultsFormSet,
+    extra=12,
+    max_num=100,
+    validate_max=True
+)
@@ -0,0 +1,164 @@
+from typing import NamedTuple
+from datetime import date
+from decimal import Decimal
+from django.db import connection, transaction
+from django.db.models import Q
+from athletes.models import Athlete, Discipline
+from athletes.utils import is_timed_discipline
+from competitions.models import Competition, ScheduledEvent
+from .models import Results, HeadToHead, Heat, Round
+from .utils import schedule
+
+# pairs that met at least this many times get a precomputed HeadToHead row
+MIN_MEETINGS = 3
+
+RESULTS_TABLE = connection.ops.quote_name(Results._meta.db_table)
+DISCIPLINE_TABLE = connection.ops.quote_name(Discipline._meta.db_table)
+COMPETITION_TABLE = connection.ops.quote_name(Competition._meta.db_table)
+HEAT_TABLE = connection.ops.quote_name(Heat._meta.db_table)
+ROUND_TABLE = connection.ops.quote_name(Round._meta.db_table)
+
+# two results only meet within one round; results without a heat count as one round of their own
+SAME_ROUND_SQL = "COALESCE(ha.round_id, 0) = COALESCE(hb.round_id, 0)"
+
+# SQL twin of is_timed_discipline(): track events start with their distance
+TIMED_SQL = "SUBSTR(d.name, 1, 1) BETWEEN '0' AND '9'"
+
+
+class Meeting(NamedTuple):
+    competition: str
+    discipline: str
+    result_date: date
+    athlete_value: Decimal
+    athlete_position: int
+    opponent_value: Decimal
+    opponent_position: int
+    round_type: str  # empty for results without a heat
+    timed: bool
+
+    @property
+    def round_name(self) -> str:
+        return ScheduledEvent.RoundType(self.round_type).label if self.round_type else ''
+
+    @property
+    def winner(self) -> str | None:
+        if self.athlete_value == self.opponent_value:
+            return None
+        athlete_ahead = self.athlete_value < self.opponent_value
+        return 'athlete' if athlete_ahead == self.timed else 'opponent'
+
+    @property
+    def margin(self) -> Decimal:
+        return abs(self.athlete_value - self.opponent_value)
+
+
+def meetings(athlete_id: int, opponent_id: int) -> list[Meeting]:
+    """
+    Every round of a competition/discipline both athletes took part in, via one self-join on results.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT c.name, d.name, a.result_date, a.result_value, a.position, b.result_value, b.position,
+                   COALESCE(r.round_type, '')
+            FROM {RESULTS_TABLE} a
+            JOIN {RESULTS_TABLE} b ON b.competition_id = a.competition_id AND b.discipline_id = a.discipline_id
+            LEFT JOIN {HEAT_TABLE} ha ON ha.id = a.heat_id
+            LEFT JOIN {HEAT_TABLE} hb ON hb.id = b.heat_id
+            LEFT JOIN {ROUND_TABLE} r ON r.id = ha.round_id
+            JOIN {COMPETITION_TABLE} c ON c.id = a.competition_id
+            JOIN {DISCIPLINE_TABLE} d ON d.id = a.discipline_id
+            WHERE a.athlete_id = %s AND b.athlete_id = %s AND {SAME_ROUND_SQL}
+            ORDER BY a.result_date DESC, d.name, a.id
+            """,
+            [athlete_id, opponent_id]
+        )
+        return [
+            Meeting(*row, timed=is_timed_discipline(row[1]))
+            for row in cursor.fetchall()
+        ]
+
+
+def pair_summaries(athlete_ids=None, min_meetings: int = MIN_MEETINGS) -> list[HeadToHead]:
+    """
+    Win/loss summary of every pair of athletes with at least min_meetings meetings, computed with
+    one grouped self-join. Restricted to pairs involving athlete_ids when given.
+    """
+    params = []
+    athlete_filter = ''
+    if athlete_ids is not None:
+        athlete_ids = list(athlete_ids)
+        placeholders = ', '.join(['%s'] * len(athlete_ids))
+        athlete_filter = f'AND (a.athlete_id IN ({placeholders}) OR b.athlete_id IN ({placeholders}))'
+        params = athlete_ids * 2
+    params.append(min_meetings)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT
+                a.athlete_id,
+                b.athlete_id,
+                COUNT(*),
+                SUM(CASE WHEN ({TIMED_SQL} AND a.result_value < b.result_value)
+                          OR (NOT ({TIMED_SQL}) AND a.result_value > b.result_value) THEN 1 ELSE 0 END),
+                SUM(CASE WHEN ({TIMED_SQL} AND b.result_value < a.result_value)
+                          OR (NOT ({TIMED_SQL}) AND b.result_value > a.result_value) THEN 1 ELSE 0 END),
+                SUM(CASE WHEN a.result_value = b.result_value THEN 1 ELSE 0 END),
+                MAX(a.result_date)
+            FROM {RESULTS_TABLE} a
+            JOIN {RESULTS_TABLE} b
+                ON b.competition_id = a.competition_id
+                AND b.discipline_id = a.discipline_id
+                AND b.athlete_id > a.athlete_id
+            LEFT JOIN {HEAT_TABLE} ha ON ha.id = a.heat_id
+            LEFT JOIN {HEAT_TABLE} hb ON hb.id = b.heat_id
+            JOIN {DISCIPLINE_TABLE} d ON d.id = a.discipline_id
+            WHERE {SAME_ROUND_SQL} {athlete_filter}
+            GROUP BY a.athlete_id, b.athlete_id
+            HAVING COUNT(*) >= %s
+            """,
+            params
+        )
+        return [
+            HeadToHead(
+                athlete_id=athlete_id,
+                opponent_id=opponent_id,
+                meetings=count,
+                athlete_wins=athlete_wins,
+                opponent_wins=opponent_wins,
+                ties=ties,
+                last_met=last_met,
+            )
+            for athlete_id, opponent_id, count, athlete_wins, opponent_wins, ties, last_met in cursor.fetchall()
+        ]
+
+
+def refresh_head_to_head(athlete_ids=None) -> int:
+    """
+    Rebuild the precomputed summaries, for all pairs or only those involving athlete_ids.
+    """
+    summaries = pair_summaries(athlete_ids)
+    with transaction.atomic():
+        stale = HeadToHead.objects.all()
+        if athlete_ids is not None:
+            stale = stale.filter(Q(athlete_id__in=athlete_ids) | Q(opponent_id__in=athlete_ids))
+        stale.delete()
+        HeadToHead.objects.bulk_create(summaries)
+    return len(summaries)
+
+
+def schedule_head_to_head_refresh(athlete_ids) -> None:
+    schedule(refresh_head_to_head, athlete_ids)
+
+
+def rivals(athlete: Athlete):
+    """
+    Precomputed summaries of an athlete's frequent rivals, most meetings first.
+    """
+    return (
+        HeadToHead.objects
+        .filter(Q(athlete=athlete) | Q(opponent=athlete))
+        .select_related('athlete', 'opponent')
+        .order_by('-meetings', '-last_met')
+    )
@@ -0,0 +1,314 @@
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import NamedTuple
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from athletes.matching import AthleteMatcher
+from athletes.models import Athlete, AgeCategory, Discipline
+from athletes.utils import name_key
+from competitions.models import Competition, CompetitionCategory, ScheduledEvent
+from .exports import read_export_file
+from .models import Results, Round, Heat
+from .scoring import coefficients, points_for
+from .signals import results_bulk_created
+from .snapshot import publish_snapshot
+
+DEFAULT_WRITE_WORKERS = 4
+WRITE_BATCH_SIZE = 1000
+
+
+class ImportReport(NamedTuple):
+    files: int
+    rows: int
+    created: list[int]  # ids of the new results
+    skipped: int  # already imported
+    errors: list[str]
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:  # rows read, validated and written per second
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def parse_files(paths: list[str], workers: int | None = None) -> list[list[dict]]:
+    """
+    Parse files concurrently in a process pool; workers=1 parses them in this process.
+    """
+    if workers == 1 or len(paths) == 1:
+        return [read_export_file(path) for path in paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(read_export_file, paths))
+
+
+class ReferenceData:
+    """
+    Athletes, competitions, disciplines, categories, rounds and heats, each loaded once per
+    import and resolved in memory for every row. Missing athletes, competitions, rounds and heats
+    are kept unsaved while the rows are validated; create() then inserts, in bulk, only those
+    that valid rows use, so rejected rows leave nothing behind.
+    """
+
+    def __init__(self, rows: list[dict]):
+        self.disciplines = {d.name: d for d in Discipline.objects.all()}
+        self.age_categories = {(c.name, c.gender): c for c in AgeCategory.objects.all()}
+        self.competition_categories = {c.category_name: c for c in CompetitionCategory.objects.all()}
+        # soft-deleted competitions included, so importing their results again does not recreate them
+        self.competitions = {(c.name, c.start_date): c for c in Competition.all_objects.select_related('category')}
+        self.athletes = AthleteMatcher(Athlete.all_objects.all())
+        names = {row['competition'] for row in rows}
+        self.rounds = {
+            self.round_key((r.competition.name, r.competition.start_date), r.discipline_id, r.age_category_id, r.round_type): r
+            for r in Round.objects.filter(competition__name__in=names).select_related('competition')
+        }
+        self.heats = {
+            (self.round_key((h.round.competition.name, h.round.competition.start_date), h.round.discipline_id,
+                            h.round.age_category_id, h.round.round_type), h.number): h
+            for h in Heat.objects.filter(round__competition__name__in=names).select_related('round__competition')
+        }
+
+    @staticmethod
+    def round_key(competition_key: tuple, discipline_id: int, age_category_id, round_type: str) -> tuple:
+        return *competition_key, discipline_id, age_category_id, round_type
+
+    def competition(self, row: dict) -> Competition:
+        key = (row['competition'], row['start_date'])
+        competition = self.competitions.get(key)
+        if competition is None:
+            category = self.competition_categories.get(row['competition_category'])
+            if category is None:
+                raise ValidationError(f'Unknown competition category "{row["competition_category"]}".')
+            if row['start_date'] > row['end_date']:
+                raise ValidationError('Competition start date is after its end date.')
+            competition = self.competitions[key] = Competition(
+                name=row['competition'],
+                city=row['city'],
+                country=row['country'],
+                start_date=row['start_date'],
+                end_date=row['end_date'],
+                category=category,
+            )
+        return competition
+
+    def athlete(self, row: dict) -> Athlete:
+        athlete = self.athletes.match(
+            row['first_name'], row['last_name'], row['birth_date'], row['nationality'], row['gender']
+        )
+        if athlete is None:
+            athlete = Athlete(
+                first_name=row['first_name'],
+                last_name=row['last_name'],
+                nationality=row['nationality'],
+                birth_date=row['birth_date'],
+                gender=row['gender'],
+                name_key=name_key(row['first_name'], row['last_name']),  # bulk_create skips Athlete.save()
+            )
+            self.athletes.add(athlete)  # later rows of the same athlete match it
+        return athlete
+
+    def heat(self, row: dict, competition: Competition, discipline: Discipline, age_category) -> Heat | None:
+        if not row['round']:
+            return None
+        if row['round'] not in ScheduledEvent.RoundType.values:
+            raise ValidationError(f'Unknown round "{row["round"]}".')
+        round_key = self.round_key(
+            (competition.name, competition.start_date), discipline.pk, age_category.pk if age_category else None, row['round']
+        )
+        round_ = self.rounds.get(round_key)
+        if round_ is None:
+            round_ = self.rounds[round_key] = Round(
+                competition=competition, discipline=discipline, age_category=age_category, round_type=row['round']
+            )
+        heat = self.heats.get((round_key, row['heat'] or 1))
+        if heat is None:
+            heat = self.heats[(round_key, row['heat'] or 1)] = Heat(round=round_, number=row['heat'] or 1)
+        return heat
+
+    def result(self, row: dict) -> Results:
+        athlete = self.athlete(row)
+        competition = self.competition(row)
+        discipline = self.disciplines.get(row['discipline'])
+        if discipline is None:
+            raise ValidationError(f'Unknown discipline "{row["discipline"]}".')
+        age_category = None
+        if row['age_category']:
+            age_category = self.age_categories.get((row['age_category'], athlete.gender))
+            if age_category is None:
+                raise ValidationError(f'Unknown age category "{row["age_category"]}".')
+        return Results(
+            athlete=athlete,
+            competition=competition,
+            discipline=discipline,
+            age_category=age_category,
+            result_value=row['result_value'],
+            result_date=row['result_date'],
+            heat=self.heat(row, competition, discipline, age_category),
+        )
+
+    def create(self, results: list[Results]) -> None:
+        """
+        Insert the unsaved competitions, athletes, rounds and heats the given results use.
+        bulk_create fills in their primary keys, which the results pick up when they are saved.
+        """
+        competitions = _unsaved(result.competition for result in results)
+        Competition.objects.bulk_create(competitions)
+        Athlete.objects.bulk_create(_unsaved(result.athlete for result in results))
+        heats = [result.heat for result in results if result.heat is not None]
+        rounds = _unsaved(heat.round for heat in heats)
+        Round.objects.bulk_create(rounds)
+        _link_rounds(rounds, {round_.competition_id for round_ in rounds})
+        Heat.objects.bulk_create(_unsaved(heats))
+
+
+def _unsaved(objects) -> list:
+    # each unsaved object once, in first-seen order; unsaved model instances are not hashable
+    unsaved = {}
+    for obj in objects:
+        if obj.pk is None:
+            unsaved.setdefault(id(obj), obj)
+    return list(unsaved.values())
+
+
+def _link_rounds(new_rounds: list[Round], competition_ids: set) -> None:
+    # files carry no round order, so new rounds lead to the next round type of their event (heats -> final)
+    if not new_rounds:
+        return
+    order = {round_type: index for index, round_type in enumerate(ScheduledEvent.RoundType.values)}
+    events = defaultdict(list)
+    for round_ in Round.objects.filter(competition_id__in=competition_ids):
+        events[(round_.competition_id, round_.discipline_id, round_.age_category_id)].append(round_)
+    linked = []
+    for rounds in events.values():
+        rounds.sort(key=lambda round_: order[round_.round_type])
+        for round_, following in zip(rounds, rounds[1:]):
+            if round_.next_round_id is None:
+                round_.next_round = following
+                linked.append(round_)
+    Round.objects.bulk_update(linked, ['next_round'])
+
+
+def import_results(paths: list[str], parse_workers: int | None = None,
+                   write_workers: int = DEFAULT_WRITE_WORKERS) -> ImportReport:
+    """
+    Import meet files: parse them in a process pool and validate every row against reference
+    data loaded once. Only then create the athletes, competitions, rounds and heats the valid rows
+    need, and write each competition's results as one bulk insert in its own transaction, with at
+    most write_workers transactions in flight. Ranking, records, head-to-head and caches are
+    refreshed once for every batch that committed, also when another batch failed (its error is
+    raised afterwards). Rows already in the database are skipped, so a file can be imported again
+    safely.
+    """
+    started = time.perf_counter()
+    parsed = parse_files([str(path) for path in paths], parse_workers)
+    rows = [row for file_rows in parsed for row in file_rows]
+
+    reference = ReferenceData(rows)
+    existing = {
+        (athlete_id, competition, start_date, discipline_id, result_date, value, round_type or '', heat or 0)
+        for athlete_id, competition, start_date, discipline_id, result_date, value, round_type, heat in (
+            Results.objects
+            .filter(competition__name__in={row['competition'] for row in rows})
+            .values_list(
+                'athlete_id', 'competition__name', 'competition__start_date', 'discipline_id', 'result_date',
+                'result_value', 'heat__round__round_type', 'heat__number',
+            )
+        )
+    }
+
+    valid, errors, skipped = [], [], 0
+    for row in rows:
+        try:
+            result = reference.result(row)
+            result.clean()  # related objects are attached, so no queries here
+        except ValidationError as e:
+            errors.append(f'{row["first_name"]} {row["last_name"]}, {row["competition"]}: {"; ".join(e.messages)}')
+            continue
+        # the same mark in another round or heat is another result
+        heat = result.heat
+        key = (
+            result.athlete.pk or ('new', id(result.athlete)), row['competition'], row['start_date'],
+            result.discipline_id, result.result_date, result.result_value,
+            heat.round.round_type if heat else '', heat.number if heat else 0,
+        )
+        if key in existing:
+            skipped += 1
+            continue
+        existing.add(key)
+        valid.append(result)
+
+    with transaction.atomic():
+        reference.create(valid)
+
+    batches = {}
+    table = coefficients()
+    for result in valid:
+        result.points = points_for(result, table)
+        batches.setdefault(result.competition.pk, []).append(result)
+
+    if connection.vendor == 'sqlite':
+        write_workers = 1  # SQLite allows a single writer at a time
+
+    created, failures = [], []
+    if write_workers > 1 and len(batches) > 1:
+        with ThreadPoolExecutor(max_workers=write_workers) as pool:
+            for future in [pool.submit(_write_batch, batch) for batch in batches.values()]:
+                try:
+                    created += future.result()
+                except Exception as e:
+                    failures.append(e)
+    else:
+        for batch in batches.values():
+            try:
+                created += _write_batch(batch, close=False)
+            except Exception as e:
+                failures.append(e)
+
+    # ranking, records (in date order), head-to-head, statistics and cached pages, once for all committed rows
+    if created:
+        with transaction.atomic():
+            results_bulk_created(sorted(created, key=lambda result: (result.result_date, result.pk)))
+            _link_references(created)
+        if settings.RESULTS_SNAPSHOT_DIR:
+            publish_snapshot(settings.RESULTS_SNAPSHOT_DIR)  # workers map the new version instead of the pre-import one
+    if failures:
+        raise failures[0]
+
+    return ImportReport(
+        files=len(parsed),
+        rows=len(rows),
+        created=[result.pk for result in created],
+        skipped=skipped,
+        errors=errors,
+        seconds=time.perf_counter() - started,
+    )
+
+
+def _write_batch(batch: list[Results], close: bool = True) -> list[Results]:
+    # each pool thread has its own database connection, closed when its batch is written
+    try:
+        with transaction.atomic():
+            return Results.objects.bulk_create(batch, batch_size=WRITE_BATCH_SIZE)
+    finally:
+        if close:
+            connection.close()
+
+
+def _link_references(results: list[Results]) -> None:
+    # athletes compete in the imported disciplines, competitions hold the imported age categories
+    disciplines = Athlete.disciplines.through
+    disciplines.objects.bulk_create(
+        [
+            disciplines(athlete_id=athlete_id, discipline_id=discipline_id)
+            for athlete_id, discipline_id in {(r.athlete_id, r.discipline_id) for r in results}
+        ],
+        ignore_conflicts=True
+    )
+    age_groups = Competition.age_groups.through
+    age_groups.objects.bulk_create(
+        [
+            age_groups(competition_id=competition_id, agecategory_id=category_id)
+            for competition_id, category_id in {(r.competition_id, r.age_category_id) for r in results if r.age_category_id}
+        ],
+        ignore_conflicts=True
+    )
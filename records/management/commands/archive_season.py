@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+from records.archive import archive_season, restore_season, archived_seasons
+
+
+class Command(BaseCommand):
+    help = (
+        'Move the results of finished seasons out of the results table into the archive '
+        '(partitioned by season on PostgreSQL), or back with --restore.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('seasons', nargs='*', type=int, help='years to archive')
+        parser.add_argument('--restore', action='store_true', help='move the seasons back into the results table')
+        parser.add_argument('--list', action='store_true', help='list the archived seasons')
+
+    def handle(self, *args, **options):
+        if options['list']:
+            seasons = archived_seasons()
+            self.stdout.write(', '.join(map(str, seasons)) if seasons else 'No archived seasons.')
+            return
+        if not options['seasons']:
+            raise CommandError('Pass at least one season (year).')
+
+        for season in options['seasons']:
+            if options['restore']:
+                moved = restore_season(season)
+                self.stdout.write(self.style.SUCCESS(f'{season}: restored {moved} results.'))
+                continue
+            try:
+                moved = archive_season(season)
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.stdout.write(self.style.SUCCESS(f'{season}: archived {moved} results.'))
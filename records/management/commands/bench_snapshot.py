@@ -0,0 +1,55 @@
+import time
+from datetime import date
+import numpy as np
+from django.core.management.base import BaseCommand
+from records.snapshot import ResultsSnapshot, COLUMNS
+
+
+class Command(BaseCommand):
+    help = 'Measure memory use and query speed of the in-memory results snapshot on synthetic data.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5_000_000)
+        parser.add_argument('--athletes', type=int, default=200_000)
+        parser.add_argument('--disciplines', type=int, default=40)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        rng = np.random.default_rng(0)
+        first_day = date(2000, 1, 1).toordinal()
+
+        started = time.perf_counter()
+        snapshot = ResultsSnapshot({
+            'id': np.arange(1, rows + 1, dtype=COLUMNS['id'][0]),
+            'athlete_id': rng.integers(1, options['athletes'], rows, dtype=COLUMNS['athlete_id'][0]),
+            'discipline_id': rng.integers(1, options['disciplines'], rows, dtype=COLUMNS['discipline_id'][0]),
+            'age_category_id': rng.integers(-1, 24, rows, dtype=COLUMNS['age_category_id'][0]),
+            'gender': rng.integers(0, 2, rows, dtype=COLUMNS['gender'][0]),
+            'date': np.sort(rng.integers(first_day, first_day + 9000, rows, dtype=COLUMNS['date'][0])),
+            'value': rng.integers(950, 30000, rows, dtype=COLUMNS['value'][0]),
+            'points': rng.integers(-1, 1400, rows, dtype=COLUMNS['points'][0]),
+        })
+        self.stdout.write(f'Generated {rows:,} rows in {time.perf_counter() - started:.2f}s')
+        self.stdout.write(
+            f'Memory: {snapshot.nbytes / 2 ** 20:.1f} MiB ({snapshot.nbytes / rows:.1f} bytes per result)'
+        )
+        for name, column in snapshot.columns.items():
+            self.stdout.write(f'  {name:<16} {column.dtype!s:<6} {column.nbytes / 2 ** 20:8.1f} MiB')
+
+        season = (date(2020, 1, 1), date(2020, 12, 31))
+        queries = {
+            'filter discipline+season': lambda: snapshot.mask(discipline_id=1, date_from=season[0], date_to=season[1]).sum(),
+            'count per discipline': lambda: snapshot.group_by('discipline_id'),
+            'mean per age category (F)': lambda: snapshot.group_by('age_category_id', 'mean', snapshot.mask(gender='F')),
+            'top 100 of discipline': lambda: snapshot.top_k(100, True, snapshot.mask(discipline_id=1)),
+            'top 100 by points (M)': lambda: snapshot.top_k(100, False, snapshot.mask(gender='M'), 'points'),
+            'athlete best per discipline': lambda: snapshot.group_by('discipline_id', 'min', snapshot.mask(athlete_id=42)),
+        }
+        for label, query in queries.items():
+            timings = []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                query()
+                timings.append(time.perf_counter() - started)
+            self.stdout.write(f'{label:<30} best {min(timings) * 1000:8.1f} ms')
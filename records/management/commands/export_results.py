@@ -0,0 +1,41 @@
+import sys
+from django.core.management.base import BaseCommand
+from records.exports import export_rows, iter_csv, iter_jsonl, iter_columnar, DEFAULT_CHUNK_SIZE
+from records.models import Results
+from records.views import filter_results
+
+ENCODERS = {
+    'csv': iter_csv,
+    'jsonl': iter_jsonl,
+    'columnar': iter_columnar,
+}
+
+
+class Command(BaseCommand):
+    help = 'Stream all results, joined with athlete, competition, discipline and category, to a file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=ENCODERS, default='csv')
+        parser.add_argument('--output', help='File to write, defaults to stdout.')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--year', type=int)
+        parser.add_argument('--competition', help='Part of the competition name.')
+
+    def handle(self, *args, **options):
+        queryset = filter_results(Results.objects.all(), options['year'], options['competition'])
+        chunks = ENCODERS[options['format']](export_rows(queryset, options['chunk_size']), options['chunk_size'])
+
+        binary = options['format'] == 'columnar'
+        if options['output']:
+            output = open(options['output'], 'wb' if binary else 'w', newline=None if binary else '')
+        else:
+            output = sys.stdout.buffer if binary else sys.stdout
+
+        try:
+            for chunk in chunks:
+                output.write(chunk)
+        finally:
+            if options['output']:
+                output.close()
+        if options['output']:
+            self.stdout.write(self.style.SUCCESS(f"Exported results to {options['output']}."))
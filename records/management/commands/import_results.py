@@ -0,0 +1,76 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from athletes.models import Athlete
+from competitions.models import Competition
+from records.importer import import_results, ImportReport, DEFAULT_WRITE_WORKERS
+from records.models import Results, Round, Heat
+
+# what an import creates besides results, in delete order
+IMPORTED_MODELS = [
+    Heat,
+    Round,
+    Competition.age_groups.through,
+    Competition,
+    Athlete.disciplines.through,
+    Athlete,
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Import meet result files in the results export format (.csv, .jsonl or .athcol). '
+        'Files are parsed in parallel processes and each competition is written in its own transaction.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('files', nargs='+')
+        parser.add_argument('--parse-workers', type=int, help='processes parsing files, defaults to the CPU count')
+        parser.add_argument('--write-workers', type=int, default=DEFAULT_WRITE_WORKERS,
+                            help='competitions written concurrently')
+        parser.add_argument('--serial', action='store_true', help='parse and write one file at a time')
+        parser.add_argument(
+            '--benchmark',
+            action='store_true',
+            help='import serially, delete everything it created again, then import concurrently and compare'
+        )
+
+    def handle(self, *args, **options):
+        files = options['files']
+        if options['benchmark']:
+            return self.benchmark(files, options['parse_workers'], options['write_workers'])
+
+        if options['serial']:
+            report = import_results(files, parse_workers=1, write_workers=1)
+        else:
+            report = import_results(files, options['parse_workers'], options['write_workers'])
+        for error in report.errors:
+            self.stderr.write(error)
+        self.report('imported', report)
+
+    def benchmark(self, files: list[str], parse_workers: int | None, write_workers: int):
+        # both passes must do the same work, so everything the serial pass added is deleted before the concurrent one;
+        # rows are told apart by id, so run it on a database nobody else writes to
+        managers = {model: getattr(model, 'all_objects', model.objects) for model in IMPORTED_MODELS}  # soft-deleted rows too
+        before = {model: manager.aggregate(last=Max('pk'))['last'] or 0 for model, manager in managers.items()}
+        serial = import_results(files, parse_workers=1, write_workers=1)
+        self.report('serial', serial)
+        if not serial.created:
+            self.stderr.write('Nothing new to import; benchmark with files that are not imported yet.')
+            return
+        with transaction.atomic():
+            Results.objects.filter(pk__in=serial.created).delete()
+            for model, last_id in before.items():
+                managers[model].filter(pk__gt=last_id).delete()
+
+        concurrent = import_results(files, parse_workers, write_workers)
+        self.report('concurrent', concurrent)
+        if serial.seconds and concurrent.seconds:
+            self.stdout.write(f'speed-up: {serial.seconds / concurrent.seconds:.2f}x')
+
+    def report(self, label: str, report: ImportReport):
+        self.stdout.write(self.style.SUCCESS(
+            f'{label}: {report.files} files, {report.rows} rows, {len(report.created)} new results, '
+            f'{report.skipped} already imported, {len(report.errors)} rejected '
+            f'in {report.seconds:.2f}s ({report.rows_per_second:,.0f} rows/s)'
+        ))
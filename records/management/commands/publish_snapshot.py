@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from records.snapshot import publish_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Write a new memory-mapped results snapshot version and make it the current one.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--directory', default=settings.RESULTS_SNAPSHOT_DIR)
+        parser.add_argument('--keep', type=int, default=3, help='Number of versions to keep on disk.')
+
+    def handle(self, *args, **options):
+        if not options['directory']:
+            raise CommandError('Set RESULTS_SNAPSHOT_DIR or pass --directory.')
+        version = publish_snapshot(options['directory'], keep=options['keep'])
+        self.stdout.write(self.style.SUCCESS(f'Published snapshot {version}.'))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from records.models import Results, Record
+from records.registry import detect_records
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the records registry and its history by replaying all results in date order.'
+
+    def handle(self, *args, **options):
+        results = (
+            Results.objects
+            .select_related('athlete', 'competition', 'discipline')
+            .order_by('result_date', 'id')
+        )
+        created = 0
+        with transaction.atomic():
+            Record.objects.all().delete()
+            for result in results.iterator(chunk_size=2000):
+                created += len(detect_records(result))
+
+        current = Record.objects.filter(is_current=True).count()
+        self.stdout.write(self.style.SUCCESS(f'Registered {created} records, {current} of them current.'))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from competitions.models import Competition
+from records.clubs import refresh_club_standings
+from records.models import ClubStanding
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the club standings of the given competitions, or of every competition. '
+        'Competitions of archived seasons keep their standings.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('competitions', nargs='*', type=int, help='competition ids to rebuild (default: all)')
+
+    def handle(self, *args, **options):
+        competition_ids = options['competitions'] or Competition.all_objects.values_list('pk', flat=True)
+        refresh_club_standings(competition_ids)
+        self.stdout.write(self.style.SUCCESS(f'Stored {ClubStanding.objects.count()} club standings.'))
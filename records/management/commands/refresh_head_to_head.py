@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from records.head_to_head import refresh_head_to_head
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the precomputed head-to-head summaries of frequent rivals.'
+
+    def handle(self, *args, **options):
+        pairs = refresh_head_to_head()
+        self.stdout.write(self.style.SUCCESS(f'Stored {pairs} head-to-head summaries.'))
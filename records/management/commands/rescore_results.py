@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from records.scoring import rescore, load_default_coefficients, RESCORE_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Recompute performance points of all results from the scoring tables.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--load-defaults',
+            action='store_true',
+            help='Store the built-in World Athletics coefficients for existing disciplines first.'
+        )
+        parser.add_argument('--batch-size', type=int, default=RESCORE_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        if options['load_defaults']:
+            loaded = load_default_coefficients()
+            self.stdout.write(f'Loaded {loaded} scoring coefficients.')
+
+        scored = rescore(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Scored {scored} results.'))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from athletes.models import AgeCategory
+from records.age_categories import revalidate_age_categories
+
+
+class Command(BaseCommand):
+    help = (
+        'List results whose age category does not fit the athlete at the competition any more '
+        '(age or gender), and with --fix move them in bulk to the fitting age group of their competition. '
+        'Results in a heat, or that no age group of the competition fits, are only reported.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('categories', nargs='*', type=int, help='age category ids to check (default: all)')
+        parser.add_argument('--fix', action='store_true', help='move the mismatched results to the fitting category')
+
+    def handle(self, *args, **options):
+        rows = revalidate_age_categories(options['categories'] or None, fix=options['fix'])
+        categories = AgeCategory.objects.in_bulk()
+        for row in rows:
+            line = f'result #{row["id"]}: age {row["age"]}, {row["athlete__gender"]}, in {categories[row["age_category_id"]]}'
+            if 'fixed_category_id' in row:
+                line += f' -> {categories[row["fixed_category_id"]]}'
+            elif 'skipped' in row:
+                line += f', not moved: {row["skipped"]}'
+            self.stdout.write(line)
+
+        skipped = sum('skipped' in row for row in rows)
+        if not rows:
+            self.stdout.write(self.style.SUCCESS('Every result fits its age category.'))
+        elif options['fix']:
+            self.stdout.write(self.style.SUCCESS(f'Moved {len(rows) - skipped} results.'))
+            if skipped:
+                self.stdout.write(self.style.WARNING(f'{skipped} results need a manual fix.'))
+        else:
+            self.stdout.write(self.style.WARNING(f'{len(rows)} results do not fit their age category, run with --fix.'))
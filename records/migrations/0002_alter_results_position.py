@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 16:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('records', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='results',
+            name='position',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
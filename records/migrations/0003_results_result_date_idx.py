@@ -0,0 +1,19 @@
+# Generated by Django 6.0.1 on 2026-10-19 16:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('athletes', '0006_rename_agecategories_agecategory_and_more'),
+        ('competitions', '0003_rename_date_competition_end_date_and_more'),
+        ('records', '0002_alter_results_position'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='results',
+            index=models.Index(fields=['result_date'], name='results_result_date_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 6.0.1 on 2026-10-19 16:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('athletes', '0006_rename_agecategories_agecategory_and_more'),
+        ('competitions', '0003_rename_date_competition_end_date_and_more'),
+        ('records', '0003_results_result_date_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Record',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gender', models.CharField(choices=[('M', 'Male'), ('F', 'Female')], max_length=1)),
+                ('scope', models.CharField(choices=[('WORLD', 'World'), ('NATIONAL', 'National'), ('CHAMPIONSHIP', 'Championship')], max_length=12)),
+                ('scope_key', models.CharField(blank=True, default='', max_length=150)),
+                ('mark', models.DecimalField(decimal_places=2, max_digits=7)),
+                ('set_on', models.DateField()),
+                ('is_current', models.BooleanField(default=True)),
+                ('age_category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='records', to='athletes.agecategory')),
+                ('athlete', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='records', to='athletes.athlete')),
+                ('competition', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='records', to='competitions.competition')),
+                ('discipline', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='records', to='athletes.discipline')),
+                ('previous', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='broken_by', to='records.record')),
+                ('result', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='records', to='records.results')),
+            ],
+            options={
+                'ordering': ['discipline__name', 'gender', 'scope', 'scope_key'],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('is_current', True)), fields=('discipline', 'gender', 'age_category', 'scope', 'scope_key'), name='unique_current_record'), models.UniqueConstraint(condition=models.Q(('age_category__isnull', True), ('is_current', True)), fields=('discipline', 'gender', 'scope', 'scope_key'), name='unique_current_open_record')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 6.0.1 on 2026-10-19 16:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('athletes', '0006_rename_agecategories_agecategory_and_more'),
+        ('records', '0004_record'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HeadToHead',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('meetings', models.PositiveIntegerField()),
+                ('athlete_wins', models.PositiveIntegerField()),
+                ('opponent_wins', models.PositiveIntegerField()),
+                ('ties', models.PositiveIntegerField()),
+                ('last_met', models.DateField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('athlete', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='head_to_head_as_athlete', to='athletes.athlete')),
+                ('opponent', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='head_to_head_as_opponent', to='athletes.athlete')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('athlete', 'opponent'), name='unique_head_to_head_pair'), models.CheckConstraint(condition=models.Q(('athlete__lt', models.F('opponent'))), name='head_to_head_ordered_pair')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 6.0.1 on 2026-10-19 16:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('athletes', '0006_rename_agecategories_agecategory_and_more'),
+        ('records', '0005_headtohead'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='results',
+            name='points',
+            field=models.PositiveIntegerField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.CreateModel(
+            name='ScoringCoefficient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gender', models.CharField(choices=[('M', 'Male'), ('F', 'Female')], max_length=1)),
+                ('a', models.FloatField()),
+                ('b', models.FloatField()),
+                ('c', models.FloatField()),
+                ('unit_scale', models.PositiveIntegerField(default=1)),
+                ('discipline', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scoring_coefficients', to='athletes.discipline')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('discipline', 'gender'), name='unique_scoring_discipline_gender')],
+            },
+        ),
+    ]
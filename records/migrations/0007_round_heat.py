@@ -0,0 +1,64 @@
+# Generated by Django 6.0.1 on 2026-10-19 17:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('athletes', '0006_rename_agecategories_agecategory_and_more'),
+        ('competitions', '0004_scheduledevent'),
+        ('records', '0006_results_points_scoringcoefficient'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Heat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveSmallIntegerField()),
+            ],
+            options={
+                'ordering': ['round', 'number'],
+            },
+        ),
+        migrations.AddField(
+            model_name='results',
+            name='qualification',
+            field=models.CharField(blank=True, choices=[('Q', 'Q (place or standard)'), ('q', 'q (best of the rest)')], default='', editable=False, max_length=1),
+        ),
+        migrations.AddField(
+            model_name='results',
+            name='heat',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='results', to='records.heat'),
+        ),
+        migrations.CreateModel(
+            name='Round',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('round_type', models.CharField(choices=[('QUALIFICATION', 'Qualification'), ('HEATS', 'Heats'), ('QUARTER_FINAL', 'Quarter-final'), ('SEMI_FINAL', 'Semi-final'), ('FINAL', 'Final')], max_length=20)),
+                ('qualifiers_per_heat', models.PositiveSmallIntegerField(default=0)),
+                ('qualifying_mark', models.DecimalField(blank=True, decimal_places=2, max_digits=7, null=True)),
+                ('fastest_losers', models.PositiveSmallIntegerField(default=0)),
+                ('min_advancing', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('age_category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='rounds', to='athletes.agecategory')),
+                ('competition', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rounds', to='competitions.competition')),
+                ('discipline', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rounds', to='athletes.discipline')),
+                ('next_round', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='previous_round', to='records.round')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='heat',
+            name='round',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='heats', to='records.round'),
+        ),
+        migrations.AddConstraint(
+            model_name='round',
+            constraint=models.UniqueConstraint(fields=('competition', 'discipline', 'age_category', 'round_type'), name='unique_round'),
+        ),
+        migrations.AddConstraint(
+            model_name='heat',
+            constraint=models.UniqueConstraint(fields=('round', 'number'), name='unique_heat_number'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 6.0.1 on 2026-10-19 17:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def create_archive_table(apps, schema_editor):
+    model = apps.get_model('records', 'ArchivedResult')
+    if schema_editor.connection.vendor != 'postgresql':
+        schema_editor.create_model(model)
+        return
+    # declarative range partitioning by result_date, records.archive adds one partition per season
+    sql, params = schema_editor.table_sql(model)
+    schema_editor.execute(f'{sql} PARTITION BY RANGE ({schema_editor.quote_name("result_date")})', params or None)
+    schema_editor.deferred_sql.extend(schema_editor._model_indexes_sql(model))
+
+
+def drop_archive_table(apps, schema_editor):
+    schema_editor.delete_model(apps.get_model('records', 'ArchivedResult'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('athletes', '0008_athlete_deleted_at'),
+        ('competitions', '0005_competition_deleted_at'),
+        ('records', '0007_round_heat'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='ArchivedResult',
+                    fields=[
+                        ('pk', models.CompositePrimaryKey('result_id', 'result_date', blank=True, editable=False, primary_key=True, serialize=False)),
+                        ('result_id', models.BigIntegerField()),
+                        ('position', models.PositiveIntegerField(default=0)),
+                        ('result_value', models.DecimalField(decimal_places=2, max_digits=7)),
+                        ('result_date', models.DateField()),
+                        ('points', models.PositiveIntegerField(blank=True, null=True)),
+                        ('qualification', models.CharField(blank=True, choices=[('Q', 'Q (place or standard)'), ('q', 'q (best of the rest)')], default='', max_length=1)),
+                        ('age_category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_results', to='athletes.agecategory')),
+                        ('athlete', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_results', to='athletes.athlete')),
+                        ('competition', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_results', to='competitions.competition')),
+                        ('discipline', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_results', to='athletes.discipline')),
+                        ('heat', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_results', to='records.heat')),
+                    ],
+                ),
+            ],
+        ),
+        migrations.RunPython(create_archive_table, drop_archive_table),
+    ]
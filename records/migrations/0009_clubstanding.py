@@ -0,0 +1,32 @@
+# Generated by Django 6.0.1 on 2026-10-19 17:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('athletes', '0009_club_clubmembership'),
+        ('competitions', '0005_competition_deleted_at'),
+        ('records', '0008_archivedresult'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClubStanding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('season', models.PositiveSmallIntegerField()),
+                ('points', models.PositiveIntegerField(default=0)),
+                ('scoring_results', models.PositiveIntegerField(default=0)),
+                ('wins', models.PositiveIntegerField(default=0)),
+                ('club', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standings', to='athletes.club')),
+                ('competition', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='club_standings', to='competitions.competition')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['competition', '-points'], name='club_standing_competition_idx'), models.Index(fields=['season'], name='club_standing_season_idx')],
+                'constraints': [models.UniqueConstraint(fields=('club', 'competition'), name='unique_club_standing')],
+            },
+        ),
+    ]
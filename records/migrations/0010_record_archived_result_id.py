@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 17:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('records', '0009_clubstanding'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='record',
+            name='archived_result_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -1,8 +1,18 @@
 from django.db import models
 from django.db.models import ForeignKey
 from django.core.exceptions import ValidationError
+from athletes.models import GenderChoice
+from competitions.models import ScheduledEvent
 from athletes.utils import calculate_age
 
+# qualification marks: Q by place in heat or by qualifying standard, q by best marks among the rest
+QUALIFIED_BY_PLACE = 'Q'
+QUALIFIED_BY_MARK = 'q'
+QUALIFICATION_CHOICES = [
+    (QUALIFIED_BY_PLACE, 'Q (place or standard)'),
+    (QUALIFIED_BY_MARK, 'q (best of the rest)'),
+]
+
 
 # Create your models here.
 class Results(models.Model):
@@ -28,7 +38,10 @@ class Results(models.Model):
         blank=True,
         related_name='results'
     )
-    position = models.PositiveIntegerField()
+    position = models.PositiveIntegerField(  # derived from result_value on every insert/update/delete, see records.signals
+        default=0,
+        editable=False
+    )
 
     result_value = models.DecimalField(
         max_digits=7,
@@ -36,6 +49,46 @@ class Results(models.Model):
         help_text='Time (seconds) or distance (meters)'
     )
     result_date = models.DateField()  # result date must be between start_date and end_date of competitions table, otherwise data is inconsistent
+    points = models.PositiveIntegerField(  # performance points from the discipline's scoring table, see records.scoring
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=True
+    )
+    heat = models.ForeignKey(  # empty for events without rounds
+        'Heat',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='results'
+    )
+    qualification = models.CharField(  # set for a whole round by records.qualification
+        max_length=1,
+        choices=QUALIFICATION_CHOICES,
+        blank=True,
+        default='',
+        editable=False
+    )
+
+    loaded_partition_key = None
+
+    class Meta:
+        indexes = [
+            # admin date hierarchy and the year filter on the results page
+            models.Index(fields=['result_date'], name='results_result_date_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if {'competition_id', 'discipline_id', 'age_category_id'} <= set(field_names):
+            instance.loaded_partition_key = instance.partition_key  # remembered so a moved result reranks its old partition too
+        return instance
+
+    @property
+    def partition_key(self) -> tuple:
+        # results are reranked per key, and within it per round (records.utils.rerank_partition)
+        return self.competition_id, self.discipline_id, self.age_category_id
 
     def clean(self):
         errors = {}
@@ -80,9 +133,345 @@ class Results(models.Model):
                     'Athlete gender does not match age category gender.'
                 )
 
+        # validate the heat belongs to this competition and discipline
+        if self.heat_id:
+            heat_round = self.heat.round
+            if (heat_round.competition_id, heat_round.discipline_id) != (self.competition_id, self.discipline_id):
+                errors['heat'] = 'Heat belongs to a different competition or discipline.'
+            elif heat_round.age_category_id != self.age_category_id:
+                errors['heat'] = 'Heat belongs to a round of a different age category.'
+
         if errors:
             raise ValidationError(errors)
 
     def save(self, *args, **kwargs):
         self.full_clean()  # to validate everything before saving the model
         super().save(*args, **kwargs)
+
+
+class ArchivedResult(models.Model):
+    """
+    A result of an archived season, moved out of Results by records.archive so queries on
+    current seasons only scan hot rows. On PostgreSQL the table is partitioned by result_date,
+    one partition per season, hence result_date in the primary key.
+    """
+    pk = models.CompositePrimaryKey('result_id', 'result_date')
+    result_id = models.BigIntegerField()  # id the row had in Results, kept for a restore
+    athlete = models.ForeignKey(
+        'athletes.Athlete',
+        on_delete=models.CASCADE,
+        related_name='archived_results'
+    )
+    competition = models.ForeignKey(
+        'competitions.Competition',
+        on_delete=models.CASCADE,
+        related_name='archived_results'
+    )
+    discipline = models.ForeignKey(
+        'athletes.Discipline',
+        on_delete=models.CASCADE,
+        related_name='archived_results'
+    )
+    age_category = models.ForeignKey(
+        'athletes.AgeCategory',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='archived_results'
+    )
+    heat = models.ForeignKey(
+        'Heat',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='archived_results'
+    )
+    position = models.PositiveIntegerField(
+        default=0
+    )
+    result_value = models.DecimalField(
+        max_digits=7,
+        decimal_places=2
+    )
+    result_date = models.DateField()
+    points = models.PositiveIntegerField(
+        null=True,
+        blank=True
+    )
+    qualification = models.CharField(
+        max_length=1,
+        choices=QUALIFICATION_CHOICES,
+        blank=True,
+        default=''
+    )
+
+    def __str__(self) -> str:
+        return f"{self.athlete_id} {self.discipline_id} {self.result_value} ({self.result_date})"
+
+
+class Round(models.Model):
+    """
+    One round of an event at a competition, with the rules for advancing to the next one.
+    """
+    competition = models.ForeignKey(
+        'competitions.Competition',
+        on_delete=models.CASCADE,
+        related_name='rounds'
+    )
+    discipline = models.ForeignKey(
+        'athletes.Discipline',
+        on_delete=models.CASCADE,
+        related_name='rounds'
+    )
+    age_category = models.ForeignKey(
+        'athletes.AgeCategory',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='rounds'
+    )
+    round_type = models.CharField(
+        max_length=20,
+        choices=ScheduledEvent.RoundType.choices
+    )
+    qualifiers_per_heat = models.PositiveSmallIntegerField(  # first N of every heat advance (Q)
+        default=0
+    )
+    qualifying_mark = models.DecimalField(  # everyone reaching this mark advances (Q)
+        max_digits=7,
+        decimal_places=2,
+        null=True,
+        blank=True
+    )
+    fastest_losers = models.PositiveSmallIntegerField(  # then the best N marks of the rest advance (q)
+        default=0
+    )
+    min_advancing = models.PositiveSmallIntegerField(  # field events: "or at least the 12 best" fills up with q
+        null=True,
+        blank=True
+    )
+    next_round = models.OneToOneField(
+        'self',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='previous_round'
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['competition', 'discipline', 'age_category', 'round_type'],
+                name='unique_round'
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.competition.name} {self.discipline.name} {self.get_round_type_display()}"
+
+
+class Heat(models.Model):
+    round = models.ForeignKey(
+        Round,
+        on_delete=models.CASCADE,
+        related_name='heats'
+    )
+    number = models.PositiveSmallIntegerField()
+
+    class Meta:
+        ordering = ['round', 'number']
+        constraints = [
+            models.UniqueConstraint(fields=['round', 'number'], name='unique_heat_number'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.round} heat {self.number}"
+
+
+class Record(models.Model):
+    class Scope(models.TextChoices):
+        WORLD = 'WORLD', 'World'
+        NATIONAL = 'NATIONAL', 'National'
+        CHAMPIONSHIP = 'CHAMPIONSHIP', 'Championship'
+
+    discipline = models.ForeignKey(
+        'athletes.Discipline',
+        on_delete=models.CASCADE,
+        related_name='records'
+    )
+    gender = models.CharField(
+        max_length=1,
+        choices=GenderChoice.choices
+    )
+    age_category = models.ForeignKey(  # empty for open (all ages) records
+        'athletes.AgeCategory',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='records'
+    )
+    scope = models.CharField(
+        max_length=12,
+        choices=Scope.choices
+    )
+    scope_key = models.CharField(  # nationality for national records, competition name for championship records
+        max_length=150,
+        blank=True,
+        default=''
+    )
+    mark = models.DecimalField(
+        max_digits=7,
+        decimal_places=2
+    )
+    athlete = models.ForeignKey(
+        'athletes.Athlete',
+        on_delete=models.CASCADE,
+        related_name='records'
+    )
+    competition = models.ForeignKey(
+        'competitions.Competition',
+        on_delete=models.CASCADE,
+        related_name='records'
+    )
+    result = models.ForeignKey(  # kept nullable so the record survives if the result row is removed
+        Results,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='records'
+    )
+    archived_result_id = models.BigIntegerField(  # result of an archived season, linked again when it is restored
+        null=True,
+        blank=True
+    )
+    set_on = models.DateField()
+    previous = models.OneToOneField(  # the record this one broke, which forms the history chain
+        'self',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='broken_by'
+    )
+    is_current = models.BooleanField(
+        default=True
+    )
+
+    class Meta:
+        ordering = ['discipline__name', 'gender', 'scope', 'scope_key']
+        constraints = [
+            # only one current record per key, the partial unique indexes also serve the lookup on every new result
+            models.UniqueConstraint(
+                fields=['discipline', 'gender', 'age_category', 'scope', 'scope_key'],
+                condition=models.Q(is_current=True),
+                name='unique_current_record'
+            ),
+            models.UniqueConstraint(  # NULL age categories are never equal, so open records need their own index
+                fields=['discipline', 'gender', 'scope', 'scope_key'],
+                condition=models.Q(is_current=True, age_category__isnull=True),
+                name='unique_current_open_record'
+            ),
+        ]
+
+    @property
+    def key(self) -> tuple:
+        return self.age_category_id, self.scope, self.scope_key
+
+    def __str__(self) -> str:
+        return f"{self.get_scope_display()} record {self.discipline} ({self.gender}): {self.mark}"
+
+
+class HeadToHead(models.Model):
+    # precomputed summary for frequent rivals, always stored with the lower athlete id first
+    athlete = models.ForeignKey(
+        'athletes.Athlete',
+        on_delete=models.CASCADE,
+        related_name='head_to_head_as_athlete'
+    )
+    opponent = models.ForeignKey(
+        'athletes.Athlete',
+        on_delete=models.CASCADE,
+        related_name='head_to_head_as_opponent'
+    )
+    meetings = models.PositiveIntegerField()
+    athlete_wins = models.PositiveIntegerField()
+    opponent_wins = models.PositiveIntegerField()
+    ties = models.PositiveIntegerField()
+    last_met = models.DateField()
+    updated_at = models.DateTimeField(
+        auto_now=True
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['athlete', 'opponent'], name='unique_head_to_head_pair'),
+            models.CheckConstraint(condition=models.Q(athlete__lt=models.F('opponent')), name='head_to_head_ordered_pair'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.athlete} vs {self.opponent}: {self.athlete_wins}-{self.opponent_wins}"
+
+
+class ScoringCoefficient(models.Model):
+    # points = A * (B - T) ** C for track events, A * (M - B) ** C for field events
+    discipline = models.ForeignKey(
+        'athletes.Discipline',
+        on_delete=models.CASCADE,
+        related_name='scoring_coefficients'
+    )
+    gender = models.CharField(
+        max_length=1,
+        choices=GenderChoice.choices
+    )
+    a = models.FloatField()
+    b = models.FloatField()
+    c = models.FloatField()
+    unit_scale = models.PositiveIntegerField(  # 100 for jumps, whose tables are in centimetres
+        default=1
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['discipline', 'gender'], name='unique_scoring_discipline_gender')
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.discipline} ({self.gender}): A={self.a} B={self.b} C={self.c}"
+
+
+class ClubStanding(models.Model):
+    """
+    A club's score at one competition, maintained by records.clubs from result positions.
+    Season rankings add these rows up, so they never touch Results.
+    """
+    club = models.ForeignKey(
+        'athletes.Club',
+        on_delete=models.CASCADE,
+        related_name='standings'
+    )
+    competition = models.ForeignKey(
+        'competitions.Competition',
+        on_delete=models.CASCADE,
+        related_name='club_standings'
+    )
+    season = models.PositiveSmallIntegerField()  # year of the competition start, for season rankings
+    points = models.PositiveIntegerField(
+        default=0
+    )
+    scoring_results = models.PositiveIntegerField(  # results that placed within the scoring places
+        default=0
+    )
+    wins = models.PositiveIntegerField(
+        default=0
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['club', 'competition'], name='unique_club_standing'),
+        ]
+        indexes = [
+            models.Index(fields=['competition', '-points'], name='club_standing_competition_idx'),
+            models.Index(fields=['season'], name='club_standing_season_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.club} at {self.competition.name}: {self.points}"
@@ -0,0 +1,67 @@
+from itertools import groupby
+from django.db import transaction
+from .models import Results, Round, QUALIFIED_BY_PLACE, QUALIFIED_BY_MARK
+from .registry import is_better
+from .utils import bump_results_version
+
+
+def qualify_round(round_: Round) -> dict[int, str]:
+    """
+    Work out who advances from a whole round in one pass: the first qualifiers_per_heat of every
+    heat and everyone reaching qualifying_mark get Q, then the best fastest_losers marks of the rest
+    (topped up to min_advancing) get q. Athletes tied with the last qualifier advance as well.
+
+    One query reads every result of the round and one bulk update writes the flags,
+    however many heats and athletes there are. Returns {result id: flag} of the qualifiers.
+    """
+    lower_is_better = round_.discipline.is_timed
+    rows = list(
+        Results.objects
+        .filter(heat__round=round_)
+        .order_by('heat__number', 'result_value' if lower_is_better else '-result_value', 'id')
+        .values_list('id', 'heat_id', 'result_value', 'qualification')
+    )
+
+    flags = {}
+    for _, heat_rows in groupby(rows, key=lambda row: row[1]):
+        heat_rows = list(heat_rows)
+        for result_id, _, _, _ in _take_with_ties(heat_rows, round_.qualifiers_per_heat):
+            flags[result_id] = QUALIFIED_BY_PLACE
+
+    if round_.qualifying_mark is not None:
+        for result_id, _, mark, _ in rows:
+            if not is_better(round_.qualifying_mark, mark, lower_is_better):  # reached the standard
+                flags[result_id] = QUALIFIED_BY_PLACE
+
+    rest = sorted(
+        (row for row in rows if row[0] not in flags),
+        key=lambda row: row[2],
+        reverse=not lower_is_better
+    )
+    extra = round_.fastest_losers
+    if round_.min_advancing:
+        extra = max(extra, round_.min_advancing - len(flags))
+    for result_id, _, _, _ in _take_with_ties(rest, extra):
+        flags[result_id] = QUALIFIED_BY_MARK
+
+    # write only the flags that changed, in one statement
+    changed = [
+        Results(pk=result_id, qualification=flags.get(result_id, ''))
+        for result_id, _, _, current in rows
+        if flags.get(result_id, '') != current
+    ]
+    if changed:
+        with transaction.atomic():
+            Results.objects.bulk_update(changed, ['qualification'], batch_size=1000)
+            bump_results_version()  # bulk_update sends no signals
+    return flags
+
+
+def _take_with_ties(rows: list[tuple], count: int) -> list[tuple]:
+    # rows are sorted best first; the mark of the last place taken also takes everyone tied with it
+    if count <= 0 or not rows:
+        return []
+    cutoff = rows[min(count, len(rows)) - 1][2]
+    taken = rows[:count]
+    taken += [row for row in rows[count:] if row[2] == cutoff]
+    return taken
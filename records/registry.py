@@ -0,0 +1,173 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from athletes.models import Discipline
+from .models import Results, Record
+from .utils import schedule
+
+
+def is_better(mark, reference, lower_is_better: bool) -> bool:
+    return mark < reference if lower_is_better else mark > reference
+
+
+def candidate_keys(result: Results) -> list[tuple]:
+    """
+    Every record a result can set: world, national and championship records,
+    each for the result's age category and for the open (all ages) list.
+    """
+    scopes = [
+        (Record.Scope.WORLD, ''),
+        (Record.Scope.NATIONAL, result.athlete.nationality),
+        (Record.Scope.CHAMPIONSHIP, result.competition.name),
+    ]
+    categories = {result.age_category_id, None}
+    return [(category_id, scope, scope_key) for category_id in categories for scope, scope_key in scopes]
+
+
+def detect_records(result: Results) -> list[Record]:
+    """
+    Check a new result against the current records with one indexed lookup and register
+    every record it breaks. Equalling a record does not replace the holder. A result dated
+    before a current record was set may rewrite that chain's history instead, so the chain is
+    rebuilt from the result's date after commit.
+
+    The current records are locked while they are compared. Two results breaking a key that
+    has no record yet cannot lock anything, so the second insert hits unique_current_record;
+    it is then checked once more against the record the first one set.
+    """
+    for attempt in range(2):
+        try:
+            with transaction.atomic():
+                return _detect_records(result)
+        except IntegrityError:
+            if attempt:
+                raise
+
+
+def _detect_records(result: Results) -> list[Record]:
+    keys = candidate_keys(result)
+    athlete, discipline = result.athlete, result.discipline
+
+    key_filter = Q()
+    for category_id, scope, scope_key in keys:
+        key_filter |= _category_q(category_id) & Q(scope=scope, scope_key=scope_key)
+
+    current = {
+        record.key: record
+        for record in Record.objects.select_for_update().filter(
+            key_filter,
+            is_current=True,
+            discipline=discipline,
+            gender=athlete.gender,
+        )
+    }
+
+    new_records, rebuild = [], set()
+    for key in keys:
+        holder = current.get(key)
+        category_id, scope, scope_key = key
+        if holder is not None and result.result_date < holder.set_on:
+            # entered after later records were set: if it beats the record of its day, the chain from then on changes
+            if _beats_record_on(result, key):
+                rebuild.add((discipline.pk, athlete.gender, category_id, scope, scope_key, result.result_date))
+            continue
+        if holder is not None and not is_better(result.result_value, holder.mark, discipline.is_timed):
+            continue
+        new_records.append(_record_for(result, category_id, scope, scope_key, holder))
+
+    if new_records:
+        broken = [record.previous_id for record in new_records if record.previous_id]
+        Record.objects.filter(pk__in=broken).update(is_current=False)
+        Record.objects.bulk_create(new_records)
+    if rebuild:
+        schedule_records_rebuild(rebuild)
+    return new_records
+
+
+def _beats_record_on(result: Results, key: tuple) -> bool:
+    category_id, scope, scope_key = key
+    record = (
+        Record.objects
+        .filter(
+            _category_q(category_id), discipline=result.discipline, gender=result.athlete.gender,
+            scope=scope, scope_key=scope_key, set_on__lte=result.result_date,
+        )
+        .order_by('-set_on', '-pk')
+        .first()
+    )
+    return record is None or is_better(result.result_value, record.mark, result.discipline.is_timed)
+
+
+def _category_q(category_id) -> Q:
+    return Q(age_category_id=category_id) if category_id is not None else Q(age_category__isnull=True)
+
+
+def _record_for(result: Results, category_id, scope: str, scope_key: str, previous: Record | None) -> Record:
+    return Record(
+        discipline=result.discipline,
+        gender=result.athlete.gender,
+        age_category_id=category_id,
+        scope=scope,
+        scope_key=scope_key,
+        mark=result.result_value,
+        athlete=result.athlete,
+        competition=result.competition,
+        result=result,
+        set_on=result.result_date,
+        previous=previous,
+    )
+
+
+def held_records(result_ids) -> set[tuple]:
+    """
+    (discipline_id, gender, age_category_id, scope, scope_key, set_on) of every record the results hold,
+    taken before they are deleted or changed so rebuild_records can recompute those chains.
+    """
+    return set(
+        Record.objects
+        .filter(result_id__in=result_ids)
+        .values_list('discipline_id', 'gender', 'age_category_id', 'scope', 'scope_key', 'set_on')
+    )
+
+
+def rebuild_records(held) -> None:
+    """
+    Recompute the record chains of held_records() entries from the date of the held record on:
+    records set since then are dropped and the remaining results of that key are replayed in
+    date order, so the next best result takes over instead of a record pointing at nothing.
+    """
+    since = {}
+    for *key, set_on in held:
+        since[tuple(key)] = min(set_on, since.get(tuple(key), set_on))
+    disciplines = Discipline.objects.in_bulk({key[0] for key in since})
+    for (discipline_id, gender, category_id, scope, scope_key), set_on in since.items():
+        with transaction.atomic():
+            _rebuild_chain(disciplines[discipline_id], gender, category_id, scope, scope_key, set_on)
+
+
+def _rebuild_chain(discipline: Discipline, gender: str, category_id, scope: str, scope_key: str, since) -> None:
+    chain = Record.objects.select_for_update().filter(
+        _category_q(category_id), discipline=discipline, gender=gender, scope=scope, scope_key=scope_key
+    )
+    tail = chain.filter(set_on__lt=since).order_by('-set_on', '-pk').first()  # the last record that stays
+    chain.filter(set_on__gte=since).delete()
+
+    results = Results.objects.filter(discipline=discipline, athlete__gender=gender, result_date__gte=since)
+    if category_id is not None:
+        results = results.filter(age_category_id=category_id)
+    if scope == Record.Scope.NATIONAL:
+        results = results.filter(athlete__nationality=scope_key)
+    elif scope == Record.Scope.CHAMPIONSHIP:
+        results = results.filter(competition__name=scope_key)
+
+    for result in results.select_related('athlete', 'competition', 'discipline').order_by('result_date', 'id'):
+        if tail is None or is_better(result.result_value, tail.mark, discipline.is_timed):
+            if tail is not None and tail.is_current:
+                Record.objects.filter(pk=tail.pk).update(is_current=False)
+            tail = _record_for(result, category_id, scope, scope_key, tail)
+            tail.save()
+    if tail is not None and not tail.is_current:  # nothing beat the record before the held one
+        Record.objects.filter(pk=tail.pk).update(is_current=True)
+
+
+def schedule_records_rebuild(held) -> None:
+    schedule(rebuild_records, held)
@@ -0,0 +1,221 @@
+from __future__ import annotations
+import time
+from datetime import date
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Sum, Count, Q
+from athletes.models import Discipline
+from athletes.utils import is_timed_discipline
+from common.utils import lazy_import
+from .models import Results, ScoringCoefficient
+from .snapshot import get_snapshot, mark_stale
+from .utils import deciding_round, schedule
+
+np = lazy_import('numpy')
+
+# World Athletics combined events tables: (gender, discipline) -> (A, B, C, unit scale)
+DEFAULT_COEFFICIENTS = {
+    ('M', '100m Sprint'): (25.4347, 18.0, 1.81, 1),
+    ('M', '400m Run'): (1.53775, 82.0, 1.81, 1),
+    ('M', '1500m Run'): (0.03768, 480.0, 1.85, 1),
+    ('M', '110m Hurdles'): (5.74352, 28.5, 1.92, 1),
+    ('M', 'Long Jump'): (0.14354, 220.0, 1.40, 100),
+    ('M', 'High Jump'): (0.8465, 75.0, 1.42, 100),
+    ('M', 'Pole Vault'): (0.2797, 100.0, 1.35, 100),
+    ('M', 'Shot Put'): (51.39, 1.5, 1.05, 1),
+    ('M', 'Discus Throw'): (12.91, 4.0, 1.10, 1),
+    ('M', 'Javelin Throw'): (10.14, 7.0, 1.08, 1),
+    ('F', '200m Sprint'): (4.99087, 42.5, 1.81, 1),
+    ('F', '800m Run'): (0.11193, 254.0, 1.88, 1),
+    ('F', '100m Hurdles'): (9.23076, 26.7, 1.835, 1),
+    ('F', 'Long Jump'): (0.188807, 210.0, 1.41, 100),
+    ('F', 'High Jump'): (1.84523, 75.0, 1.348, 100),
+    ('F', 'Shot Put'): (56.0211, 1.5, 1.05, 1),
+    ('F', 'Javelin Throw'): (15.9803, 3.8, 1.04, 1),
+}
+
+COMBINED_EVENTS = {
+    'Decathlon': ('M', [
+        '100m Sprint', 'Long Jump', 'Shot Put', 'High Jump', '400m Run',
+        '110m Hurdles', 'Discus Throw', 'Pole Vault', 'Javelin Throw', '1500m Run',
+    ]),
+    'Heptathlon': ('F', [
+        '100m Hurdles', 'High Jump', 'Shot Put', '200m Sprint', 'Long Jump', 'Javelin Throw', '800m Run',
+    ]),
+}
+
+RESCORE_BATCH_SIZE = 50000
+# results on the rankings page, and the extra snapshot candidates read in case some are filtered out
+RANKING_SIZE = 100
+RANKING_CANDIDATE_MARGIN = 50
+
+# bumped in the shared cache whenever a coefficient changes, so every process reloads its table
+COEFFICIENTS_VERSION_KEY = 'scoring-coefficients-version'
+
+_coefficients = None
+_coefficients_version = None
+
+
+def coefficients() -> dict:
+    """
+    {(discipline_id, gender): (a, b, c, unit_scale, timed)}, loaded once per process and
+    reloaded when clear_coefficients() has bumped the shared version, in any process.
+    """
+    global _coefficients, _coefficients_version
+    version = cache.get_or_set(COEFFICIENTS_VERSION_KEY, 0, None)
+    if _coefficients is None or version != _coefficients_version:
+        _coefficients = {
+            (coefficient.discipline_id, coefficient.gender): (
+                coefficient.a, coefficient.b, coefficient.c, coefficient.unit_scale,
+                is_timed_discipline(coefficient.discipline.name),
+            )
+            for coefficient in ScoringCoefficient.objects.select_related('discipline')
+        }
+        _coefficients_version = version
+    return _coefficients
+
+
+def clear_coefficients() -> None:
+    global _coefficients
+    _coefficients = None
+    # after commit, so other processes do not reload the table before the change is visible to them
+    transaction.on_commit(lambda: cache.set(COEFFICIENTS_VERSION_KEY, time.time_ns(), None))
+
+
+def compute_points(values, a: float, b: float, c: float, unit_scale: int, timed: bool) -> np.ndarray:
+    """
+    Vectorized scoring of result values of one discipline and gender. Marks beyond the
+    table's zero point (slower than B, or shorter than B) score 0.
+    """
+    values = np.asarray(values, dtype=np.float64) * unit_scale
+    distance = b - values if timed else values - b
+    return np.floor(a * np.clip(distance, 0, None) ** c).astype(np.int64)
+
+
+def points_for(result: Results, table: dict | None = None) -> int | None:
+    # pass table when scoring many results, so the shared version is not read for each of them
+    coefficient = (table if table is not None else coefficients()).get((result.discipline_id, result.athlete.gender))
+    if coefficient is None:
+        return None
+    return int(compute_points([float(result.result_value)], *coefficient)[0])
+
+
+def rescore(queryset=None, batch_size: int = RESCORE_BATCH_SIZE) -> int:
+    """
+    Recompute points of every result in queryset. Rows are read in batches, scored per
+    (discipline, gender) group with NumPy and written back with bulk_update.
+    """
+    if queryset is None:
+        queryset = Results.objects.all()
+    rows = queryset.order_by().values_list('id', 'discipline_id', 'athlete__gender', 'result_value')
+    table = coefficients()
+
+    updated = 0
+    batch = []
+    for row in rows.iterator(chunk_size=batch_size):
+        batch.append(row)
+        if len(batch) == batch_size:
+            updated += _rescore_batch(batch, table)
+            batch = []
+    if batch:
+        updated += _rescore_batch(batch, table)
+    if updated:
+        mark_stale()  # bulk_update sends no signals, and the snapshot holds the points
+    return updated
+
+
+def rescore_partitions(partitions) -> int:
+    """
+    Rescore the results of the given (discipline_id, gender) pairs, e.g. after their coefficients changed.
+    """
+    partition_filter = Q()
+    for discipline_id, gender in partitions:
+        partition_filter |= Q(discipline_id=discipline_id, athlete__gender=gender)
+    return rescore(Results.objects.filter(partition_filter))
+
+
+def schedule_rescore(partitions) -> None:
+    # once per transaction, after commit; clear_coefficients() bumps the version first, so the new table is read
+    schedule(rescore_partitions, partitions)
+
+
+def _rescore_batch(batch: list[tuple], table: dict) -> int:
+    ids = np.fromiter((row[0] for row in batch), dtype=np.int64, count=len(batch))
+    discipline_ids = np.fromiter((row[1] for row in batch), dtype=np.int64, count=len(batch))
+    genders = np.array([row[2] for row in batch])
+    values = np.fromiter((row[3] for row in batch), dtype=np.float64, count=len(batch))
+
+    points = np.full(len(batch), -1, dtype=np.int64)  # -1 marks results without a scoring table
+    for (discipline_id, gender), coefficient in table.items():
+        mask = (discipline_ids == discipline_id) & (genders == gender)
+        if mask.any():
+            points[mask] = compute_points(values[mask], *coefficient)
+
+    scored = [
+        Results(id=int(result_id), points=int(value) if value >= 0 else None)
+        for result_id, value in zip(ids, points)
+    ]
+    with transaction.atomic():
+        Results.objects.bulk_update(scored, ['points'], batch_size=1000)
+    return len(scored)
+
+
+def load_default_coefficients() -> int:
+    """
+    Store DEFAULT_COEFFICIENTS for the disciplines that exist, replacing current values.
+    """
+    disciplines = Discipline.objects.in_bulk([name for _, name in DEFAULT_COEFFICIENTS], field_name='name')
+    rows = [
+        ScoringCoefficient(discipline=disciplines[name], gender=gender, a=a, b=b, c=c, unit_scale=unit_scale)
+        for (gender, name), (a, b, c, unit_scale) in DEFAULT_COEFFICIENTS.items()
+        if name in disciplines
+    ]
+    ScoringCoefficient.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['discipline', 'gender'],
+        update_fields=['a', 'b', 'c', 'unit_scale'],
+    )
+    clear_coefficients()
+    return len(rows)
+
+
+def best_scored(queryset, gender: str, year: int | None = None, limit: int = RANKING_SIZE) -> list[Results]:
+    """
+    The limit best-scored results of a gender in queryset, highest points first. With the results
+    snapshot enabled the candidates are picked there, so the database only reads those rows.
+    """
+    queryset = queryset.filter(athlete__gender=gender).order_by('-points', 'pk')
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        mask = snapshot.mask(
+            gender=gender,
+            date_from=date(year, 1, 1) if year else None,
+            date_to=date(year, 12, 31) if year else None,
+        )
+        mask &= snapshot.columns['points'] >= 0
+        candidates = snapshot.top_k(limit + RANKING_CANDIDATE_MARGIN, False, mask, 'points')
+        best = list(queryset.filter(pk__in=candidates.tolist())[:limit])
+        # the candidates are enough unless more than the margin were filtered out (e.g. soft-deleted athletes)
+        if len(best) == limit or len(candidates) == int(mask.sum()):
+            return best
+    return list(queryset[:limit])
+
+
+def combined_totals(event: str, queryset=None):
+    """
+    Combined-events totals per athlete and competition, best first. Only complete sets count,
+    one deciding-round result in each of the event's disciplines, so an athlete who ran a heat
+    and a final, or only entered a few of the disciplines at a meet, is not listed.
+    """
+    gender, disciplines = COMBINED_EVENTS[event]
+    if queryset is None:
+        queryset = Results.objects.all()
+    return (
+        queryset
+        .filter(deciding_round(), athlete__gender=gender, discipline__name__in=disciplines, points__isnull=False)
+        .values('athlete', 'athlete__first_name', 'athlete__last_name', 'competition', 'competition__name')
+        .annotate(total=Sum('points'), events=Count('discipline', distinct=True), scored=Count('id'))
+        .filter(events=len(disciplines), scored=len(disciplines))
+        .order_by('-total')
+    )
@@ -0,0 +1,147 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+from athletes.models import Athlete, AgeCategory, ClubMembership, Discipline
+from competitions.models import Competition
+from .age_categories import schedule_revalidation
+from .clubs import schedule_club_standings_refresh
+from .models import Results, ScoringCoefficient, Round, Heat
+from .head_to_head import schedule_head_to_head_refresh
+from .registry import detect_records, held_records, schedule_records_rebuild
+from .scoring import points_for, clear_coefficients, schedule_rescore
+from .snapshot import mark_added, mark_stale
+from .statistics import invalidate_statistics, bump_discipline_links_version
+from .utils import schedule_rerank, bump_results_version
+
+
+@receiver(pre_save, sender=Results)
+def score_on_save(sender, instance: Results, raw: bool = False, **kwargs) -> None:
+    if not raw:
+        instance.points = points_for(instance)
+
+
+@receiver(post_save, sender=Results)
+def rerank_on_save(sender, instance: Results, **kwargs) -> None:
+    partitions = {instance.partition_key}
+    if instance.loaded_partition_key:  # the result may have moved out of another partition
+        partitions.add(instance.loaded_partition_key)
+    instance.loaded_partition_key = instance.partition_key
+    schedule_rerank(partitions)
+    schedule_club_standings_refresh({partition[0] for partition in partitions})
+    schedule_head_to_head_refresh({instance.athlete_id})
+    invalidate_statistics({partition[1:] for partition in partitions})
+    bump_results_version()
+    if kwargs.get('created'):
+        mark_added()  # new rows are picked up incrementally, changed ones need a rebuild
+    else:
+        mark_stale()
+
+
+@receiver(post_delete, sender=Results)
+def rerank_on_delete(sender, instance: Results, **kwargs) -> None:
+    schedule_rerank({instance.partition_key})
+    schedule_club_standings_refresh({instance.competition_id})
+    schedule_head_to_head_refresh({instance.athlete_id})
+    invalidate_statistics({instance.partition_key[1:]})
+    bump_results_version()
+    mark_stale()
+
+
+@receiver(post_save, sender=Round)
+@receiver(post_delete, sender=Round)
+def rerank_on_round_change(sender, instance: Round, **kwargs) -> None:
+    # positions are per round, and a new next round changes which round decides the event
+    schedule_rerank({(instance.competition_id, instance.discipline_id, instance.age_category_id)})
+    schedule_club_standings_refresh({instance.competition_id})
+    bump_results_version()
+
+
+@receiver(post_save, sender=Heat)
+@receiver(post_delete, sender=Heat)
+def rerank_on_heat_change(sender, instance: Heat, **kwargs) -> None:
+    # a deleted heat leaves its results without one (SET_NULL sends no signals); a deleted round is handled above
+    partitions = list(
+        Round.objects.filter(pk=instance.round_id).values_list('competition_id', 'discipline_id', 'age_category_id')
+    )
+    schedule_rerank(partitions)
+    schedule_club_standings_refresh({partition[0] for partition in partitions})
+    bump_results_version()
+
+
+@receiver(post_save, sender=Results)
+def check_records_on_save(sender, instance: Results, created: bool, raw: bool = False, **kwargs) -> None:
+    if raw:
+        return
+    if not created:
+        # a corrected mark may no longer hold its records; their chains are recomputed after commit
+        schedule_records_rebuild(held_records({instance.pk}))
+    detect_records(instance)
+
+
+@receiver(pre_delete, sender=Results)
+def remember_held_records(sender, instance: Results, **kwargs) -> None:
+    # Record.result is set to NULL by the delete, so find the records before it
+    instance.held_records = held_records({instance.pk})
+
+
+@receiver(post_delete, sender=Results)
+def rebuild_records_on_delete(sender, instance: Results, **kwargs) -> None:
+    schedule_records_rebuild(getattr(instance, 'held_records', ()))
+
+
+def results_bulk_created(results: list[Results]) -> None:
+    """
+    bulk_create sends no signals, so callers run the post_save work for a batch of new results here.
+    """
+    partitions = {result.partition_key for result in results}
+    schedule_rerank(partitions)
+    schedule_club_standings_refresh({partition[0] for partition in partitions})
+    schedule_head_to_head_refresh({result.athlete_id for result in results})
+    invalidate_statistics({partition[1:] for partition in partitions})
+    bump_results_version()
+    mark_stale()  # concurrent batches commit out of id order, which the incremental refresh cannot follow
+    for result in results:
+        detect_records(result)
+
+
+@receiver(post_save, sender=Athlete)
+@receiver(post_delete, sender=Athlete)
+@receiver(post_save, sender=Competition)
+@receiver(post_delete, sender=Competition)
+@receiver(post_save, sender=Discipline)
+@receiver(post_delete, sender=Discipline)
+def drop_cached_results_pages(sender, **kwargs) -> None:
+    # results pages show athlete, competition and discipline names
+    bump_results_version()
+
+
+@receiver(m2m_changed, sender=Athlete.disciplines.through)
+def drop_cached_discipline_summaries(sender, action: str, **kwargs) -> None:
+    # the disciplines page counts the athletes of each discipline
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        transaction.on_commit(bump_discipline_links_version)
+
+
+@receiver(post_save, sender=ClubMembership)
+@receiver(post_delete, sender=ClubMembership)
+def refresh_club_standings_on_transfer(sender, instance: ClubMembership, **kwargs) -> None:
+    # the athlete's results may now count for another club
+    schedule_club_standings_refresh(
+        Results.objects.filter(athlete_id=instance.athlete_id).values_list('competition_id', flat=True).distinct()
+    )
+
+
+@receiver(post_save, sender=ScoringCoefficient)
+@receiver(post_delete, sender=ScoringCoefficient)
+def reload_coefficients(sender, instance: ScoringCoefficient, raw: bool = False, **kwargs) -> None:
+    clear_coefficients()
+    if not raw:
+        # the points of the discipline and gender were computed with the old coefficients
+        schedule_rescore({(instance.discipline_id, instance.gender)})
+
+
+@receiver(post_save, sender=AgeCategory)
+def revalidate_on_category_change(sender, instance: AgeCategory, created: bool, raw: bool = False, **kwargs) -> None:
+    # changed bounds or gender can leave existing results outside their category
+    if not created and not raw:
+        schedule_revalidation({instance.pk})
@@ -0,0 +1,355 @@
+from __future__ import annotations
+import calendar
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from common.utils import lazy_import
+from athletes.models import Athlete, Discipline
+from .models import Results
+
+np = lazy_import('numpy')  # only processes that build or query a snapshot pay for importing numpy
+
+# column -> (dtype, lookup); marks are stored in hundredths so they stay exact in an int32
+COLUMNS = {
+    'id': ('int64', 'id'),
+    'athlete_id': ('int32', 'athlete_id'),
+    'discipline_id': ('int16', 'discipline_id'),
+    'age_category_id': ('int16', 'age_category_id'),  # -1 when the result has no age category
+    'gender': ('int8', 'athlete__gender'),  # 0 male, 1 female
+    'date': ('int32', 'result_date'),  # proleptic ordinal, date.toordinal()
+    'value': ('int32', 'result_value'),
+    'points': ('int32', 'points'),  # -1 when the result is not scored
+}
+
+BUILD_CHUNK_SIZE = 100000
+DENSE_GROUP_LIMIT = 1_000_000
+
+# published snapshots: <RESULTS_SNAPSHOT_DIR>/<version>/*.npy, with the live version named in CURRENT
+CURRENT_FILE = 'CURRENT'
+PUBLISHED_CHECK_SECONDS = 5
+
+# ids below the newest one that a refresh reads again, for rows committed out of id order
+REFRESH_OVERLAP_IDS = 1000
+# bumped in the shared cache by mark_stale(), so every process rebuilds its snapshot
+SNAPSHOT_VERSION_KEY = 'results-snapshot-version'
+
+
+class ResultsSnapshot:
+    """
+    Read-only columnar copy of Results held in NumPy arrays. Historical results do not change,
+    so analytical queries (filters, group-bys, top-k) can run here instead of in the database.
+    """
+
+    def __init__(self, columns: dict[str, np.ndarray], athletes=None, disciplines=None, version=None):
+        self.columns = columns
+        self.last_id = int(columns['id'].max()) if len(columns['id']) else 0
+        self.athletes = athletes  # NameLookup, only on published snapshots
+        self.disciplines = disciplines
+        self.version = version
+
+    def __len__(self) -> int:
+        return len(self.columns['id'])
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in self.columns.values())
+
+    @property
+    def values(self) -> np.ndarray:
+        return self.columns['value'] / 100
+
+    @classmethod
+    def empty(cls) -> 'ResultsSnapshot':
+        return cls({name: np.empty(0, dtype=dtype) for name, (dtype, _) in COLUMNS.items()})
+
+    @classmethod
+    def build(cls, queryset=None, chunk_size: int = BUILD_CHUNK_SIZE) -> 'ResultsSnapshot':
+        snapshot = cls.empty()
+        snapshot.extend(queryset if queryset is not None else Results.objects.all(), chunk_size)
+        return snapshot
+
+    def refresh(self, chunk_size: int = BUILD_CHUNK_SIZE) -> int:
+        """
+        Append results created since the snapshot was built. Returns the number of new rows.
+        A row can commit after rows with higher ids, so the last REFRESH_OVERLAP_IDS ids are
+        looked at again; bulk writes mark the snapshot stale instead.
+        """
+        since = max(0, self.last_id - REFRESH_OVERLAP_IDS)
+        ids = self.columns['id']
+        known = ids[ids > since].tolist()
+        return self.extend(Results.objects.filter(id__gt=since).exclude(id__in=known), chunk_size)
+
+    def extend(self, queryset, chunk_size: int = BUILD_CHUNK_SIZE) -> int:
+        rows = queryset.order_by('id').values_list(*[lookup for _, lookup in COLUMNS.values()])
+        chunks = {name: [self.columns[name]] for name in COLUMNS}
+        added = 0
+        batch = []
+        for row in rows.iterator(chunk_size=chunk_size):
+            batch.append(row)
+            if len(batch) == chunk_size:
+                added += _append_chunk(chunks, batch)
+                batch = []
+        if batch:
+            added += _append_chunk(chunks, batch)
+
+        if added:
+            self.columns = {name: np.concatenate(parts) for name, parts in chunks.items()}
+            self.last_id = int(self.columns['id'].max())
+        return added
+
+    def mask(self, athlete_id=None, discipline_id=None, age_category_id=None, gender=None,
+             date_from=None, date_to=None) -> np.ndarray:
+        """
+        Boolean row mask for the given filters; dates are datetime.date objects.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if athlete_id is not None:
+            mask &= self.columns['athlete_id'] == athlete_id
+        if discipline_id is not None:
+            mask &= self.columns['discipline_id'] == discipline_id
+        if age_category_id is not None:
+            mask &= self.columns['age_category_id'] == age_category_id
+        if gender is not None:
+            mask &= self.columns['gender'] == (1 if gender == 'F' else 0)
+        if date_from is not None:
+            mask &= self.columns['date'] >= date_from.toordinal()
+        if date_to is not None:
+            mask &= self.columns['date'] <= date_to.toordinal()
+        return mask
+
+    def group_by(self, column: str, aggregate: str = 'count', mask=None) -> dict:
+        """
+        {key: count | mean | min | max of the mark} for every value of column within mask.
+        """
+        keys = self.columns[column]
+        values = self.values
+        if mask is not None:
+            keys, values = keys[mask], values[mask]
+        if len(keys) == 0:
+            return {}
+        low = int(keys.min())
+        if int(keys.max()) - low <= DENSE_GROUP_LIMIT:
+            # ids are small dense integers, so bincount beats the sort inside np.unique
+            codes = (keys - low).astype(np.intp)
+            counts = np.bincount(codes)
+            present = np.flatnonzero(counts)
+            unique, counts = present + low, counts[present]
+            inverse = np.searchsorted(present, codes) if aggregate in ('min', 'max') else codes
+        else:
+            unique, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+            present = None
+
+        if aggregate == 'count':
+            result = counts
+        elif aggregate == 'mean':
+            sums = np.bincount(inverse, weights=values)
+            result = (sums if present is None else sums[present]) / counts
+        elif aggregate in ('min', 'max'):
+            result = np.full(len(unique), np.inf if aggregate == 'min' else -np.inf)
+            (np.minimum if aggregate == 'min' else np.maximum).at(result, inverse, values)
+        else:
+            raise ValueError(f'Unknown aggregate {aggregate!r}.')
+        return dict(zip(unique.tolist(), result.tolist()))
+
+    def top_k(self, k: int, lower_is_better: bool, mask=None, column: str = 'value') -> np.ndarray:
+        """
+        Result ids of the k best marks (or other column, e.g. points) within mask, best first.
+        """
+        ids = self.columns['id']
+        values = self.columns[column]
+        if mask is not None:
+            ids, values = ids[mask], values[mask]
+        k = min(k, len(values))
+        if k == 0:
+            return ids[:0]
+        ranked = values if lower_is_better else -values.astype(np.int64)
+        best = np.argpartition(ranked, k - 1)[:k]
+        return ids[best[np.argsort(ranked[best], kind='stable')]]
+
+
+class NameLookup:
+    """
+    id -> name over sorted id, offset and UTF-8 blob arrays, so it can live in a memory-mapped file.
+    """
+
+    def __init__(self, ids: np.ndarray, offsets: np.ndarray, blob: np.ndarray):
+        self.ids, self.offsets, self.blob = ids, offsets, blob
+
+    @classmethod
+    def from_pairs(cls, pairs) -> 'NameLookup':
+        pairs = sorted(pairs)
+        encoded = [name.encode() for _, name in pairs]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(name) for name in encoded], out=offsets[1:])
+        blob = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+        return cls(np.array([pk for pk, _ in pairs], dtype=np.int64), offsets, blob)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def get(self, pk: int, default=None):
+        index = int(np.searchsorted(self.ids, pk))
+        if index == len(self.ids) or self.ids[index] != pk:
+            return default
+        return self.blob[self.offsets[index]:self.offsets[index + 1]].tobytes().decode()
+
+    def save(self, directory: Path, prefix: str) -> None:
+        for name in ('ids', 'offsets', 'blob'):
+            np.save(directory / f'{prefix}_{name}.npy', getattr(self, name))
+
+    @classmethod
+    def load(cls, directory: Path, prefix: str) -> 'NameLookup':
+        return cls(*(np.load(directory / f'{prefix}_{name}.npy', mmap_mode='r') for name in ('ids', 'offsets', 'blob')))
+
+
+def publish_snapshot(directory, keep: int = 3) -> str:
+    """
+    Write results columns plus athlete and discipline lookups as .npy files into a new version
+    directory, then point CURRENT at it with an atomic rename. Workers map the files read-only,
+    so every process shares the same pages. Only the newest `keep` versions are kept; removing
+    files an older worker still maps is safe on POSIX.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    now = time.time_ns()  # before reading, so a change committed during the build makes the version stale
+    snapshot = ResultsSnapshot.build()
+    version = f'{time.strftime("%Y%m%dT%H%M%S", time.gmtime(now // 10 ** 9))}.{now % 10 ** 9:09d}-{snapshot.last_id}'
+
+    staging = directory / f'.staging-{version}'
+    staging.mkdir()
+    for name, column in snapshot.columns.items():
+        np.save(staging / f'results_{name}.npy', column)
+    NameLookup.from_pairs(
+        (pk, f'{first} {last}') for pk, first, last in Athlete.all_objects.values_list('id', 'first_name', 'last_name').iterator()
+    ).save(staging, 'athletes')
+    NameLookup.from_pairs(Discipline.objects.values_list('id', 'name')).save(staging, 'disciplines')
+    staging.rename(directory / version)
+
+    pointer = directory / f'.{CURRENT_FILE}-{version}'
+    pointer.write_text(version)
+    os.replace(pointer, directory / CURRENT_FILE)
+
+    versions = sorted(path for path in directory.iterdir() if path.is_dir() and not path.name.startswith('.'))
+    for old in versions[:-keep]:
+        shutil.rmtree(old, ignore_errors=True)
+    return version
+
+
+def open_snapshot(directory) -> ResultsSnapshot | None:
+    """
+    Map the published version named in CURRENT read-only, or None if nothing was published yet.
+    """
+    directory = Path(directory)
+    try:
+        version = (directory / CURRENT_FILE).read_text().strip()
+    except FileNotFoundError:
+        return None
+
+    path = directory / version
+    try:
+        columns = {name: np.load(path / f'results_{name}.npy', mmap_mode='r') for name in COLUMNS}
+    except FileNotFoundError:  # published by a release with fewer columns, unusable until the next publish
+        return None
+    return ResultsSnapshot(
+        columns,
+        athletes=NameLookup.load(path, 'athletes'),
+        disciplines=NameLookup.load(path, 'disciplines'),
+        version=version,
+    )
+
+
+def _append_chunk(chunks: dict, batch: list[tuple]) -> int:
+    columns = list(zip(*batch))
+    for (name, (dtype, _)), values in zip(COLUMNS.items(), columns):
+        if name == 'age_category_id':
+            values = [-1 if value is None else value for value in values]
+        elif name == 'gender':
+            values = [1 if value == 'F' else 0 for value in values]
+        elif name == 'date':
+            values = [value.toordinal() for value in values]
+        elif name == 'value':
+            values = [int(value * 100) for value in values]
+        elif name == 'points':
+            values = [-1 if value is None else value for value in values]
+        chunks[name].append(np.array(values, dtype=dtype))
+    return len(batch)
+
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+_snapshot_version = None
+_refreshed_at = 0.0
+_checked_at = 0.0
+
+
+def get_snapshot() -> ResultsSnapshot | None:
+    """
+    The process-wide snapshot, or None when RESULTS_SNAPSHOT_ENABLED is off.
+
+    With RESULTS_SNAPSHOT_DIR set, this is the published version mapped from disk, swapped for a
+    newer one as soon as CURRENT changes, and None while results changed since it was published. Otherwise the snapshot is built in this process on first
+    use, topped up with new rows at most every RESULTS_SNAPSHOT_REFRESH_SECONDS, and rebuilt once
+    mark_stale() has bumped the shared version, in any process.
+    """
+    global _snapshot, _snapshot_version, _refreshed_at
+    if not settings.RESULTS_SNAPSHOT_ENABLED:
+        return None
+    if settings.RESULTS_SNAPSHOT_DIR:
+        return _get_published_snapshot()
+
+    interval = settings.RESULTS_SNAPSHOT_REFRESH_SECONDS
+    with _snapshot_lock:
+        now = time.monotonic()
+        version = cache.get_or_set(SNAPSHOT_VERSION_KEY, 0, None)
+        if _snapshot is None or version != _snapshot_version:
+            _snapshot, _snapshot_version = ResultsSnapshot.build(), version
+            _refreshed_at = now
+        elif now - _refreshed_at >= interval:
+            _snapshot.refresh()
+            _refreshed_at = now
+        return _snapshot
+
+
+def _get_published_snapshot() -> ResultsSnapshot | None:
+    global _snapshot, _checked_at
+    with _snapshot_lock:
+        now = time.monotonic()
+        if _snapshot is None or now - _checked_at >= PUBLISHED_CHECK_SECONDS:
+            _checked_at = now
+            try:
+                version = (Path(settings.RESULTS_SNAPSHOT_DIR) / CURRENT_FILE).read_text().strip()
+            except FileNotFoundError:
+                return None
+            if _snapshot is None or _snapshot.version != version:
+                _snapshot = open_snapshot(settings.RESULTS_SNAPSHOT_DIR)  # the old mapping goes with its last reference
+        if _snapshot is None or cache.get(SNAPSHOT_VERSION_KEY, 0) > published_at(_snapshot.version):
+            return None  # results changed since it was published, read the database until the next publish
+        return _snapshot
+
+
+def published_at(version: str) -> int:
+    # publish time in nanoseconds, from the "<UTC seconds>.<nanoseconds>-<last id>" version name
+    seconds, nanoseconds = version.split('-')[0].split('.')
+    return calendar.timegm(time.strptime(seconds, '%Y%m%dT%H%M%S')) * 10 ** 9 + int(nanoseconds)
+
+
+def mark_stale() -> None:
+    # after commit, so no process rebuilds from rows that may still roll back
+    transaction.on_commit(lambda: cache.set(SNAPSHOT_VERSION_KEY, time.time_ns(), None))
+
+
+def mark_added() -> None:
+    # new rows: a built snapshot picks them up on its next refresh, a published one only on the next publish
+    if settings.RESULTS_SNAPSHOT_DIR:
+        mark_stale()
+
+
+def preload_snapshot() -> None:
+    # called by the WSGI/ASGI entry points so the first request does not pay for the build
+    if settings.RESULTS_SNAPSHOT_ENABLED and settings.RESULTS_SNAPSHOT_PRELOAD:
+        get_snapshot()
@@ -0,0 +1,59 @@
+document.addEventListener('DOMContentLoaded', function() {
+    const form = document.querySelector('.results');
+    const searchUrl = form.dataset.searchUrl;
+
+    function debounce(func, delay) {
+        let timeout;
+        return function(...args) {
+            const context = this;
+            clearTimeout(timeout);
+            timeout = setTimeout(() => func.apply(context, args), delay);
+        };
+    }
+
+    // each name input suggests matching athletes and keeps the id of the chosen one in its hidden field
+    document.querySelectorAll('.athlete-search').forEach(function(input) {
+        const hidden = form.querySelector(`input[name="${input.dataset.target}"]`);
+        const options = document.getElementById(input.getAttribute('list'));
+        let found = {}; // name -> id of the latest suggestions
+        let inFlight = null;
+
+        const search = async () => {
+            if (inFlight) {
+                inFlight.abort();
+            }
+            inFlight = new AbortController();
+            try {
+                const response = await fetch(`${searchUrl}?q=${encodeURIComponent(input.value)}`, {signal: inFlight.signal});
+                if (!response.ok) {
+                    return;
+                }
+                const data = await response.json();
+                found = {};
+                options.innerHTML = '';
+                data.athletes.forEach(function(athlete) {
+                    found[athlete.name] = athlete.id;
+                    const option = document.createElement('option');
+                    option.value = athlete.name;
+                    options.appendChild(option);
+                });
+            } catch (e) {
+                if (e.name !== 'AbortError') {
+                    console.error('Error searching athletes:', e);
+                }
+            }
+        };
+        const debouncedSearch = debounce(search, 300);
+
+        input.addEventListener('input', function() {
+            if (input.value in found) {
+                hidden.value = found[input.value];
+                return;
+            }
+            hidden.value = '';
+            if (input.value.trim().length >= 2) {
+                debouncedSearch();
+            }
+        });
+    });
+});
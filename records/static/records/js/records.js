@@ -15,17 +15,31 @@ document.addEventListener('DOMContentLoaded', function() {
         };
     }
 
+    let inFlight = null; // the request of the previous filter, cancelled when the filter changes again
+
     const fetchResults = async () => {
         const formData = new FormData(resultsForm);
         const params = new URLSearchParams(formData).toString();
         const url = `${window.location.pathname}?${params}`;
 
+        if (inFlight) {
+            inFlight.abort();
+        }
+        inFlight = new AbortController();
+
         try {
             const response = await fetch(url, {
                 headers: {
                     'X-Requested-With': 'XMLHttpRequest' // Identify as AJAX request
-                }
+                },
+                signal: inFlight.signal
             });
+            if (response.status === 429) {
+                // rate limited: try again once the server says a request is free
+                const retryAfter = parseInt(response.headers.get('Retry-After') || '1', 10);
+                setTimeout(fetchResults, retryAfter * 1000);
+                return;
+            }
             if (!response.ok) {
                 throw new Error(`HTTP error! status: ${response.status}`);
             }
@@ -69,6 +83,9 @@ document.addEventListener('DOMContentLoaded', function() {
             }
 
         } catch (e) {
+            if (e.name === 'AbortError') {
+                return; // superseded by a newer filter
+            }
             console.error('Error fetching results:', e);
             if (tableWrapper) tableWrapper.innerHTML = '<p>Error loading results.</p>';
         }
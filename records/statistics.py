@@ -0,0 +1,229 @@
+import time
+from datetime import date
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, Max, Min, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from athletes.models import Athlete, Discipline
+from common.utils import lazy_import
+from .models import Results
+from .snapshot import get_snapshot
+from .utils import results_version
+
+np = lazy_import('numpy')
+
+PERCENTILES = [p / 100 for p in range(1, 100)]
+HISTOGRAM_BINS = 20
+CACHE_TIMEOUT = 60 * 60 * 24  # entries are orphaned by invalidate_statistics() as soon as results change
+
+# bumped when athletes pick up or drop disciplines; changed results bump records.utils.results_version()
+DISCIPLINE_LINKS_VERSION_KEY = 'discipline-links-version'
+
+
+def _version_key(discipline_id: int, age_category_id=None) -> str:
+    return f'results-stats-version:{discipline_id}:{age_category_id or "all"}'
+
+
+def statistics_key(discipline_id: int, age_category_id=None, season=None, gender=None) -> str:
+    # every season and gender of a (discipline, category) partition shares one version, so a
+    # single write drops them all, including the season a result was moved out of
+    version = cache.get(_version_key(discipline_id, age_category_id), 0)
+    return f'results-stats:{discipline_id}:{age_category_id or "all"}:{season or "all"}:{gender or "all"}:{version}'
+
+
+def discipline_statistics(discipline, age_category_id=None, season=None, gender=None) -> dict:
+    """
+    Count, mean, spread, percentiles 1-99 and a histogram of the marks in one
+    (discipline, age category, season, gender) partition, cached until a result in it changes.
+    """
+    key = statistics_key(discipline.pk, age_category_id, season, gender)
+    stats = cache.get(key)
+    if stats is None:
+        snapshot = get_snapshot()
+        if snapshot is not None:  # whatever the database, the in-memory copy spares it the scan
+            stats = _snapshot_statistics(snapshot, discipline.pk, age_category_id, season, gender)
+        elif connection.vendor == 'postgresql':
+            stats = _database_statistics(discipline.pk, age_category_id, season, gender)
+        else:
+            stats = _numpy_statistics(discipline.pk, age_category_id, season, gender)
+        stats['lower_is_better'] = discipline.is_timed
+        cache.set(key, stats, CACHE_TIMEOUT)
+    return stats
+
+
+def share_beaten(stats: dict, value: float) -> float | None:
+    """
+    Share (0-1) of the partition's marks that value beats, interpolated from the cached percentiles.
+    """
+    if not stats['count']:
+        return None
+    below = float(np.interp(value, stats['percentiles'], PERCENTILES, left=0.0, right=1.0))
+    return 1 - below if stats['lower_is_better'] else below
+
+
+def invalidate_statistics(partitions) -> None:
+    """
+    Drop the cached statistics of the given (discipline_id, age_category_id) partitions
+    and of the all-categories view of their disciplines.
+    """
+    keys = set()
+    for discipline_id, age_category_id in partitions:
+        keys.add(_version_key(discipline_id, age_category_id))
+        keys.add(_version_key(discipline_id))
+    # after commit, so no statistics are cached again from rows that may still roll back
+    transaction.on_commit(lambda: cache.set_many(dict.fromkeys(keys, time.time_ns()), None))
+
+
+def discipline_summaries() -> list[dict]:
+    """
+    Every discipline with its athlete count, result count, best mark per gender and the date it
+    was last contested, from one grouped query over results. Cached until results, athletes,
+    disciplines or athlete-discipline links change.
+    """
+    key = f'discipline-summaries:{results_version()}:{cache.get(DISCIPLINE_LINKS_VERSION_KEY, 0)}'
+    summaries = cache.get(key)
+    if summaries is None:
+        summaries = _discipline_summaries()
+        cache.set(key, summaries, CACHE_TIMEOUT)
+    return summaries
+
+
+def bump_discipline_links_version() -> None:
+    cache.set(DISCIPLINE_LINKS_VERSION_KEY, time.time_ns(), None)
+
+
+def _discipline_summaries() -> list[dict]:
+    links = Athlete.disciplines.through.objects
+    # a subquery, so athlete links and results are not joined into one cross product
+    athlete_count = (
+        links.filter(discipline_id=OuterRef('pk'), athlete__deleted_at__isnull=True)
+        .values('discipline_id')
+        .annotate(count=Count('*'))
+        .values('count')
+    )
+    men, women = Q(results__athlete__gender='M'), Q(results__athlete__gender='F')
+    disciplines = Discipline.objects.annotate(
+        athlete_count=Coalesce(Subquery(athlete_count), 0),
+        result_count=Count('results'),
+        last_contested=Max('results__result_date'),
+        lowest_men=Min('results__result_value', filter=men),
+        highest_men=Max('results__result_value', filter=men),
+        lowest_women=Min('results__result_value', filter=women),
+        highest_women=Max('results__result_value', filter=women),
+    ).order_by('pk')
+
+    summaries = []
+    for discipline in disciplines:
+        timed = discipline.is_timed
+        summaries.append({
+            'id': discipline.pk,
+            'name': discipline.name,
+            'unit': 's' if timed else 'm',
+            'athlete_count': discipline.athlete_count,
+            'result_count': discipline.result_count,
+            'best_men': discipline.lowest_men if timed else discipline.highest_men,
+            'best_women': discipline.lowest_women if timed else discipline.highest_women,
+            'last_contested': discipline.last_contested,
+        })
+    return summaries
+
+
+def _partition(discipline_id: int, age_category_id, season, gender):
+    queryset = Results.objects.filter(discipline_id=discipline_id)
+    if age_category_id:
+        queryset = queryset.filter(age_category_id=age_category_id)
+    if season:
+        queryset = queryset.filter(result_date__gte=date(season, 1, 1), result_date__lt=date(season + 1, 1, 1))
+    if gender:
+        queryset = queryset.filter(athlete__gender=gender)
+    return queryset
+
+
+def _database_statistics(discipline_id: int, age_category_id, season, gender) -> dict:
+    """
+    PostgreSQL computes everything with ordered-set aggregates, so no marks leave the database.
+    """
+    sql, params = _partition(discipline_id, age_category_id, season, gender).values('result_value').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT COUNT(*), AVG(v), STDDEV_POP(v), MIN(v), MAX(v),
+                   percentile_cont(%s::double precision[]) WITHIN GROUP (ORDER BY v)
+            FROM ({sql}) AS partition (v)
+            """,
+            [PERCENTILES, *params]
+        )
+        count, mean, stddev, low, high, percentiles = cursor.fetchone()
+        if not count:
+            return _empty_statistics()
+
+        cursor.execute(
+            f"""
+            SELECT LEAST(width_bucket(v, %s, %s, %s), %s), COUNT(*)
+            FROM ({sql}) AS partition (v)
+            GROUP BY 1
+            """,
+            [low, high if high > low else low + 1, HISTOGRAM_BINS, HISTOGRAM_BINS, *params]
+        )
+        counts = [0] * HISTOGRAM_BINS
+        for bucket, bucket_count in cursor.fetchall():
+            counts[bucket - 1] = bucket_count
+
+    edges = np.linspace(float(low), float(high if high > low else low + 1), HISTOGRAM_BINS + 1)
+    return {
+        'count': count,
+        'mean': float(mean),
+        'stddev': float(stddev),
+        'min': float(low),
+        'max': float(high),
+        'percentiles': [float(p) for p in percentiles],
+        'histogram': {'edges': edges.tolist(), 'counts': counts},
+    }
+
+
+def _snapshot_statistics(snapshot, discipline_id: int, age_category_id, season, gender) -> dict:
+    mask = snapshot.mask(
+        discipline_id=discipline_id,
+        age_category_id=age_category_id or None,
+        gender=gender or None,
+        date_from=date(season, 1, 1) if season else None,
+        date_to=date(season, 12, 31) if season else None,
+    )
+    return _array_statistics(snapshot.values[mask])
+
+
+def _numpy_statistics(discipline_id: int, age_category_id, season, gender) -> dict:
+    """
+    Fallback for databases without percentile_cont: read the marks and compute with NumPy.
+    """
+    rows = _partition(discipline_id, age_category_id, season, gender).values_list('result_value', flat=True)
+    return _array_statistics(np.fromiter((float(value) for value in rows.iterator()), dtype=np.float64))
+
+
+def _array_statistics(values: np.ndarray) -> dict:
+    if not len(values):
+        return _empty_statistics()
+
+    low, high = float(values.min()), float(values.max())
+    counts, edges = np.histogram(values, bins=HISTOGRAM_BINS, range=(low, high if high > low else low + 1))
+    return {
+        'count': int(len(values)),
+        'mean': float(values.mean()),
+        'stddev': float(values.std()),
+        'min': low,
+        'max': high,
+        'percentiles': np.quantile(values, PERCENTILES).tolist(),
+        'histogram': {'edges': edges.tolist(), 'counts': counts.tolist()},
+    }
+
+
+def _empty_statistics() -> dict:
+    return {
+        'count': 0,
+        'mean': None,
+        'stddev': None,
+        'min': None,
+        'max': None,
+        'percentiles': [],
+        'histogram': {'edges': [], 'counts': []},
+    }
@@ -1,3 +1,691 @@
-from django.test import TestCase
+import csv
+import tempfile
+import time
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from athletes.models import Athlete, AgeCategory, Club, ClubMembership, Discipline
+from athletes.matching import AthleteMatcher, merge_athletes
+from competitions.models import Competition, CompetitionCategory, ScheduledEvent
+from .age_categories import revalidate_age_categories
+from .archive import archive_season, restore_season
+from .clubs import refresh_club_standings
+from .exports import EXPORT_COLUMNS, read_export_file
+from .forms import BulkResultsFormSet
+from .head_to_head import meetings
+from .importer import import_results
+from .registry import detect_records
+from .scoring import (
+    COEFFICIENTS_VERSION_KEY, COMBINED_EVENTS, best_scored, clear_coefficients, coefficients, combined_totals,
+    load_default_coefficients, points_for, rescore,
+)
+from .models import Results, ArchivedResult, Round, Heat, ClubStanding, Record, ScoringCoefficient
+from .snapshot import SNAPSHOT_VERSION_KEY, ResultsSnapshot, get_snapshot, publish_snapshot
+from .statistics import discipline_statistics
+from .utils import results_version, schedule
 
-# Create your tests here.
+
+class ResultsTestCase(TestCase):
+    """
+    One senior men's 400m at one competition, with a few athletes. Results are created with their
+    on_commit work (reranks, refreshes) executed, as they would be outside a test transaction.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = CompetitionCategory.objects.create(category_name=CompetitionCategory.Categories.OUTDOOR)
+        cls.competition = Competition.objects.create(
+            name='Nationals', country='Poland', city='Warsaw',
+            start_date=date(2024, 6, 1), end_date=date(2024, 6, 2), category=cls.category,
+        )
+        cls.discipline = Discipline.objects.create(name='400m Run')
+        cls.senior = AgeCategory.objects.create(name=AgeCategory.Name.SENIOR_OPEN, gender='M')
+        cls.competition.age_groups.add(cls.senior)
+        cls.athletes = [
+            Athlete.objects.create(
+                first_name=f'Runner{i}', last_name='Test', nationality='Poland', birth_date=date(1995, 1, 1), gender='M'
+            )
+            for i in range(4)
+        ]
+
+    def setUp(self):
+        self.addCleanup(clear_coefficients)  # the table is cached per process, drop what a test loaded
+
+    def add_result(self, athlete: Athlete, value: str, heat: Heat | None = None, competition=None, **kwargs) -> Results:
+        kwargs = {'discipline': self.discipline, 'age_category': self.senior, **kwargs}
+        with self.captureOnCommitCallbacks(execute=True):
+            result = Results.objects.create(
+                athlete=athlete,
+                competition=competition or self.competition,
+                result_value=Decimal(value),
+                result_date=(competition or self.competition).start_date,
+                heat=heat,
+                **kwargs
+            )
+        result.refresh_from_db()
+        return result
+
+    def add_rounds(self) -> tuple[Heat, Heat]:
+        with self.captureOnCommitCallbacks(execute=True):
+            final = Round.objects.create(
+                competition=self.competition, discipline=self.discipline, age_category=self.senior,
+                round_type=ScheduledEvent.RoundType.FINAL,
+            )
+            heats = Round.objects.create(
+                competition=self.competition, discipline=self.discipline, age_category=self.senior,
+                round_type=ScheduledEvent.RoundType.HEATS, next_round=final,
+            )
+            return Heat.objects.create(round=heats, number=1), Heat.objects.create(round=final, number=1)
+
+    def positions(self) -> dict[int, int]:
+        return dict(Results.objects.values_list('id', 'position'))
+
+
+class BulkEntryTests(ResultsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.discipline.athlete.add(*self.athletes)
+
+    def row(self, athlete: Athlete, value: str, **overrides) -> dict:
+        return {'athlete': athlete.pk, 'age_category': self.senior.pk, 'result_value': value, 'result_date': '2024-06-01',
+                **overrides}
+
+    def data(self, rows: list[dict]) -> dict:
+        data = {'form-TOTAL_FORMS': str(len(rows)), 'form-INITIAL_FORMS': '0'}
+        for index, row in enumerate(rows):
+            data.update({f'form-{index}-{field}': value for field, value in row.items()})
+        return data
+
+    def formset(self, rows: list[dict]) -> BulkResultsFormSet:
+        return BulkResultsFormSet(self.data(rows), competition=self.competition, discipline=self.discipline)
+
+    def test_athlete_entered_twice_is_rejected(self):
+        formset = self.formset([self.row(self.athletes[0], '45.00'), self.row(self.athletes[0], '46.00')])
+        self.assertFalse(formset.is_valid())
+        self.assertEqual(formset.errors[1], {'athlete': ['Athlete is entered more than once.']})
+
+    def test_rows_are_validated_like_results(self):
+        junior = AgeCategory.objects.create(name=AgeCategory.Name.UNDER_20, gender='M')
+        women = AgeCategory.objects.create(name=AgeCategory.Name.SENIOR_OPEN, gender='F')
+        self.competition.age_groups.add(junior, women)
+        formset = self.formset([
+            self.row(self.athletes[0], '45.00', age_category=junior.pk),
+            self.row(self.athletes[1], '45.50', age_category=women.pk),
+            self.row(self.athletes[2], '46.00', result_date='2024-06-05'),
+            self.row(self.athletes[3], '46.50'),
+        ])
+
+        self.assertFalse(formset.is_valid())
+        self.assertEqual(
+            [sorted(errors) for errors in formset.errors], [['age_category'], ['age_category'], ['result_date'], []]
+        )
+        self.assertIn('Athlete is 29 years old', formset.errors[0]['age_category'][0])
+        self.assertFalse(Results.objects.exists())
+
+    def test_empty_sheet_is_rejected(self):
+        formset = self.formset([{'athlete': '', 'age_category': '', 'result_value': '', 'result_date': '2024-06-01'}])
+        self.assertFalse(formset.is_valid())
+        self.assertEqual(formset.non_form_errors(), ['Enter at least one result.'])
+
+    def test_heat_of_another_discipline_is_rejected(self):
+        heat, _ = self.add_rounds()
+        result = Results(
+            athlete=self.athletes[0], competition=self.competition, discipline=Discipline.objects.create(name='800m Run'),
+            age_category=self.senior, result_value=Decimal('45.00'), result_date=date(2024, 6, 1), heat=heat,
+        )
+        with self.assertRaisesMessage(ValidationError, 'different competition or discipline'):
+            result.clean()
+
+    def test_bulk_save_runs_the_post_save_work(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            load_default_coefficients()
+        self.client.force_login(User.objects.create_user('official', password='x', is_staff=True))
+        rows = [self.row(self.athletes[0], '46.00'), self.row(self.athletes[1], '45.00'), self.row(self.athletes[2], '45.50')]
+        version = results_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('bulk_entry', args=[self.competition.pk, self.discipline.pk]), self.data(rows)
+            )
+        self.assertRedirects(response, reverse('results'))
+
+        results = {result.athlete_id: result for result in Results.objects.all()}
+        self.assertEqual([results[athlete.pk].position for athlete in self.athletes[:3]], [3, 1, 2])
+        self.assertTrue(all(result.points for result in results.values()))
+        record = Record.objects.get(scope=Record.Scope.WORLD, age_category__isnull=True, is_current=True)
+        self.assertEqual(record.result_id, results[self.athletes[1].pk].pk)
+        self.assertNotEqual(results_version(), version)  # cached pages are dropped
+
+class ScheduleTests(TestCase):
+    def test_items_are_handled_once_per_transaction(self):
+        calls = []
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                schedule(calls.append, [1, 2])
+                schedule(calls.append, [2, 3])
+        self.assertEqual(calls, [{1, 2, 3}])
+
+    def test_items_of_a_rolled_back_block_are_dropped(self):
+        calls = []
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                schedule(calls.append, [1])
+                try:
+                    with transaction.atomic():
+                        schedule(calls.append, [2])
+                        raise IntegrityError
+                except IntegrityError:
+                    pass
+        self.assertEqual(calls, [{1}])
+
+
+class RerankTests(ResultsTestCase):
+    def test_ties_share_a_place(self):
+        first = self.add_result(self.athletes[0], '45.00')
+        tied = [self.add_result(athlete, '45.50') for athlete in self.athletes[1:3]]
+        last = self.add_result(self.athletes[3], '46.00')
+
+        positions = self.positions()
+        self.assertEqual(positions[first.pk], 1)
+        self.assertEqual([positions[result.pk] for result in tied], [2, 2])
+        self.assertEqual(positions[last.pk], 4)
+
+    def test_delete_closes_the_gap(self):
+        first = self.add_result(self.athletes[0], '45.00')
+        second = self.add_result(self.athletes[1], '45.50')
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(self.positions()[second.pk], 1)
+
+    def test_rounds_are_ranked_separately(self):
+        heat, final = self.add_rounds()
+        fast_heat = self.add_result(self.athletes[0], '45.00', heat=heat)
+        self.add_result(self.athletes[1], '45.60', heat=heat)
+        winner = self.add_result(self.athletes[1], '45.50', heat=final)
+        runner_up = self.add_result(self.athletes[0], '45.70', heat=final)
+
+        positions = self.positions()
+        self.assertEqual(positions[fast_heat.pk], 1)
+        self.assertEqual(positions[winner.pk], 1)
+        self.assertEqual(positions[runner_up.pk], 2)
+
+    def test_meetings_pair_results_of_the_same_round(self):
+        heat, final = self.add_rounds()
+        self.add_result(self.athletes[0], '45.00', heat=heat)
+        self.add_result(self.athletes[1], '45.60', heat=heat)
+        self.add_result(self.athletes[1], '45.50', heat=final)
+        self.add_result(self.athletes[0], '45.70', heat=final)
+
+        found = meetings(self.athletes[0].pk, self.athletes[1].pk)
+        self.assertEqual(sorted(meeting.round_type for meeting in found), ['FINAL', 'HEATS'])
+        self.assertEqual(
+            {meeting.round_type: meeting.winner for meeting in found}, {'HEATS': 'athlete', 'FINAL': 'opponent'}
+        )
+
+    def test_heat_of_another_age_category_is_rejected(self):
+        open_round = Round.objects.create(
+            competition=self.competition, discipline=self.discipline, age_category=None,
+            round_type=ScheduledEvent.RoundType.FINAL,
+        )
+        heat = Heat.objects.create(round=open_round, number=1)
+        with self.assertRaises(ValidationError) as raised:
+            self.add_result(self.athletes[0], '45.00', heat=heat)
+        self.assertIn('heat', raised.exception.message_dict)
+
+
+class ClubStandingTests(ResultsTestCase):
+    def setUp(self):
+        self.club = Club.objects.create(name='Warsaw AC', country='Poland')
+        self.rival_club = Club.objects.create(name='Krakow AC', country='Poland')
+        ClubMembership.objects.create(athlete=self.athletes[0], club=self.club, start_date=date(2020, 1, 1))
+        ClubMembership.objects.create(athlete=self.athletes[1], club=self.rival_club, start_date=date(2020, 1, 1))
+
+    def standings(self) -> dict[str, int]:
+        return dict(ClubStanding.objects.values_list('club__name', 'points'))
+
+    def test_only_the_deciding_round_scores(self):
+        heat, final = self.add_rounds()
+        self.add_result(self.athletes[0], '45.00', heat=heat)
+        self.add_result(self.athletes[1], '45.60', heat=heat)
+        self.add_result(self.athletes[1], '45.50', heat=final)
+        self.add_result(self.athletes[0], '45.70', heat=final)
+
+        self.assertEqual(self.standings(), {'Krakow AC': 8, 'Warsaw AC': 7})
+
+    def test_result_counts_for_the_club_on_the_result_date(self):
+        membership = self.athletes[0].memberships.get()
+        membership.end_date = date(2023, 12, 31)
+        membership.save()
+        ClubMembership.objects.create(athlete=self.athletes[0], club=self.rival_club, start_date=date(2024, 1, 1))
+        self.add_result(self.athletes[0], '45.00')
+
+        self.assertEqual(self.standings(), {'Krakow AC': 8})
+
+    def test_overlapping_membership_is_rejected_on_save(self):
+        with self.assertRaises(ValidationError):
+            ClubMembership.objects.create(athlete=self.athletes[0], club=self.rival_club, start_date=date(2022, 1, 1))
+
+    def test_merge_moves_memberships_and_refuses_overlaps(self):
+        duplicate = Athlete.objects.create(
+            first_name='Runner2', last_name='Tset', nationality='Poland', birth_date=date(1995, 1, 1), gender='M'
+        )
+        ClubMembership.objects.create(athlete=duplicate, club=self.club, start_date=date(2021, 1, 1))
+        merge_athletes(self.athletes[2], [duplicate])
+        self.assertEqual(list(self.athletes[2].memberships.values_list('club__name', flat=True)), ['Warsaw AC'])
+
+        with self.assertRaises(ValidationError):
+            merge_athletes(self.athletes[0], [self.athletes[1]])
+        self.assertTrue(Athlete.objects.filter(pk=self.athletes[1].pk).exists())
+
+    def test_refresh_keeps_standings_of_archived_seasons(self):
+        self.add_result(self.athletes[0], '45.00')
+        archive_season(self.competition.start_date.year)
+        refresh_club_standings([self.competition.pk])
+
+        self.assertEqual(self.standings(), {'Warsaw AC': 8})
+
+
+class RecordRegistryTests(ResultsTestCase):
+    def world_record(self) -> Record:
+        return Record.objects.get(scope=Record.Scope.WORLD, age_category__isnull=True, is_current=True)
+
+    def test_better_result_breaks_the_record(self):
+        first = self.add_result(self.athletes[0], '45.50')
+        second = self.add_result(self.athletes[1], '45.00')
+        self.add_result(self.athletes[2], '45.00')  # equalling does not replace the holder
+
+        record = self.world_record()
+        self.assertEqual(record.result_id, second.pk)
+        self.assertEqual(record.previous.result_id, first.pk)
+        self.assertEqual(Record.objects.filter(is_current=True).count(), 6)  # world, national, championship x category, open
+
+    def test_deleting_the_holder_hands_the_record_to_the_next_best(self):
+        self.add_result(self.athletes[0], '45.50')
+        holder = self.add_result(self.athletes[1], '45.00')
+        runner_up = self.add_result(self.athletes[2], '45.20')
+        with self.captureOnCommitCallbacks(execute=True):
+            holder.delete()
+
+        record = self.world_record()
+        self.assertEqual(record.result_id, runner_up.pk)
+        self.assertEqual(record.mark, Decimal('45.20'))
+        self.assertFalse(Record.objects.filter(result__isnull=True).exists())
+
+    def test_deleting_the_only_result_removes_the_record(self):
+        holder = self.add_result(self.athletes[0], '45.50')
+        with self.captureOnCommitCallbacks(execute=True):
+            holder.delete()
+        self.assertFalse(Record.objects.exists())
+
+    def test_corrected_mark_gives_the_record_back(self):
+        previous = self.add_result(self.athletes[0], '45.50')
+        holder = self.add_result(self.athletes[1], '45.00')
+        holder.result_value = Decimal('46.00')
+        with self.captureOnCommitCallbacks(execute=True):
+            holder.save()
+
+        record = self.world_record()
+        self.assertEqual(record.result_id, previous.pk)
+        self.assertIsNone(record.previous)
+
+
+    def test_out_of_order_result_rewrites_the_chain(self):
+        earlier = Competition.objects.create(
+            name='Spring Meet', country='Poland', city='Cracow',
+            start_date=date(2024, 5, 1), end_date=date(2024, 5, 1), category=self.category,
+        )
+        june = self.add_result(self.athletes[0], '45.50')
+        may = self.add_result(self.athletes[1], '46.00', competition=earlier)  # the first mark, so a record on its day
+        record = self.world_record()
+        self.assertEqual((record.result_id, record.previous.result_id), (june.pk, may.pk))
+
+        best = self.add_result(self.athletes[2], '45.00', competition=earlier)  # entered late, beats both
+        record = self.world_record()
+        self.assertEqual((record.result_id, record.previous.result_id), (best.pk, may.pk))
+        # it never beat the record of its day; it still holds the Nationals championship records
+        self.assertFalse(Record.objects.filter(result=june).exclude(scope=Record.Scope.CHAMPIONSHIP).exists())
+
+        self.add_result(self.athletes[3], '45.80', competition=earlier)  # beats nothing on its day
+        self.assertEqual(self.world_record().result_id, best.pk)
+        self.assertEqual(Record.objects.filter(scope=Record.Scope.WORLD, age_category__isnull=True).count(), 2)
+
+class ImportTests(ResultsTestCase):
+    def row(self, first_name: str, value: str, **overrides) -> dict:
+        row = {
+            'athlete_id': '', 'first_name': first_name, 'last_name': 'Import', 'gender': 'M',
+            'nationality': 'Poland', 'birth_date': '1996-02-02', 'competition': 'Open Meeting', 'city': 'Gdansk',
+            'country': 'Poland', 'start_date': '2024-07-01', 'end_date': '2024-07-01',
+            'competition_category': 'OUTDOOR', 'discipline': '400m Run', 'age_category': 'SEN',
+            'position': '', 'result_value': value, 'result_date': '2024-07-01', 'round': '', 'heat': '',
+        }
+        return {**row, **overrides}
+
+    def import_rows(self, rows: list[dict]):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', newline='', encoding='utf-8') as stream:
+            writer = csv.DictWriter(stream, EXPORT_COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+            stream.flush()
+            with self.captureOnCommitCallbacks(execute=True):
+                return import_results([stream.name], parse_workers=1, write_workers=1)
+
+    def test_rejected_rows_create_nothing(self):
+        report = self.import_rows([
+            self.row('Valid', '46.00'),
+            self.row('Unknown', '46.00', discipline='Pole Vault Relay'),
+            self.row('Elsewhere', '46.00', competition='Other Meeting', age_category='U23'),
+        ])
+
+        self.assertEqual(len(report.created), 1)
+        self.assertEqual(len(report.errors), 2)
+        self.assertEqual(list(Athlete.objects.filter(last_name='Import').values_list('first_name', flat=True)), ['Valid'])
+        self.assertFalse(Competition.objects.filter(name='Other Meeting').exists())
+
+    def test_importing_again_skips_existing_rows(self):
+        rows = [self.row('Again', '46.00'), self.row('Twice', '46.50')]
+        self.import_rows(rows)
+        report = self.import_rows(rows)
+
+        self.assertEqual((len(report.created), report.skipped), (0, 2))
+        self.assertEqual(Results.objects.filter(competition__name='Open Meeting').count(), 2)
+
+    def test_equal_marks_in_different_rounds_are_kept(self):
+        report = self.import_rows([
+            self.row('Steady', '46.00', round='HEATS', heat='2'),
+            self.row('Steady', '46.00', round='FINAL', heat='1'),
+        ])
+
+        self.assertEqual(len(report.created), 2)
+        heats = Round.objects.get(competition__name='Open Meeting', round_type=ScheduledEvent.RoundType.HEATS)
+        self.assertEqual(heats.next_round.round_type, ScheduledEvent.RoundType.FINAL)
+        self.assertEqual(
+            set(Results.objects.filter(competition__name='Open Meeting').values_list('heat__round__round_type', 'position')),
+            {('HEATS', 1), ('FINAL', 1)},
+        )
+
+
+class ExportTests(ResultsTestCase):
+    def export(self, export_format: str, **params) -> list[dict]:
+        response = self.client.get(reverse('export_results', args=[export_format]), params)
+        suffix = {'csv': '.csv', 'jsonl': '.jsonl', 'columnar': '.athcol'}[export_format]
+        with tempfile.NamedTemporaryFile(suffix=suffix) as stream:
+            stream.write(b''.join(response.streaming_content))
+            stream.flush()
+            return read_export_file(stream.name)
+
+    @mock.patch.dict('common.ratelimit._limiters', clear=True)
+    @override_settings(RATE_LIMITS={})
+    def test_every_format_reads_back(self):
+        heat, _ = self.add_rounds()
+        in_heat = self.add_result(self.athletes[0], '45.25', heat=heat)
+        no_heat = self.add_result(self.athletes[1], '46.10', age_category=None)
+
+        for export_format in ('csv', 'jsonl', 'columnar'):
+            rows = {row['result_id']: row for row in self.export(export_format)}
+            self.assertEqual(set(rows), {in_heat.pk, no_heat.pk}, export_format)
+            row = rows[in_heat.pk]
+            self.assertEqual(
+                (row['first_name'], row['result_value'], row['result_date'], row['round'], row['heat']),
+                ('Runner0', Decimal('45.25'), date(2024, 6, 1), 'HEATS', 1),
+            )
+            row = rows[no_heat.pk]
+            self.assertEqual((row['age_category'], row['round'], row['heat']), ('', '', 0))
+            self.assertEqual(self.export(export_format, year=2023), [])
+
+    def test_invalid_year_is_rejected(self):
+        for url in (reverse('results'), reverse('export_results', args=['csv']), reverse('rankings')):
+            for year in ('abc', '99999'):
+                self.assertEqual(self.client.get(url, {'year': year}).status_code, 400, url)
+
+    @mock.patch.dict('common.ratelimit._limiters', clear=True)
+    @override_settings(RATE_LIMITS={'export': (0.001, 2)})
+    def test_exports_are_rate_limited(self):
+        url = reverse('export_results', args=['csv'])
+        self.assertEqual([self.client.get(url).status_code for _ in range(3)], [200, 200, 429])
+
+class ArchiveTests(ResultsTestCase):
+    def test_restore_links_records_to_their_results_again(self):
+        holder = self.add_result(self.athletes[0], '45.00')
+        self.add_result(self.athletes[1], '45.50')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(archive_season(2024), 2)
+        self.assertFalse(Results.objects.exists())
+        self.assertFalse(Record.objects.filter(result__isnull=False).exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(restore_season(2024), 2)
+        self.assertFalse(ArchivedResult.objects.exists())
+        self.assertEqual(set(Record.objects.values_list('result_id', flat=True)), {holder.pk})
+
+    def test_merge_moves_archived_results(self):
+        duplicate = Athlete.objects.create(
+            first_name='Runner0', last_name='Tset', nationality='Poland', birth_date=date(1995, 1, 1), gender='M'
+        )
+        self.add_result(duplicate, '45.00')
+        archive_season(2024)
+        merge_athletes(self.athletes[0], [duplicate])
+
+        self.assertEqual(ArchivedResult.objects.get().athlete, self.athletes[0])
+
+    def test_matcher_finds_soft_deleted_athletes(self):
+        self.athletes[0].soft_delete()
+        athlete = AthleteMatcher().match('Runner0', 'Test', date(1995, 1, 1), 'Poland', 'M')
+        self.assertEqual(athlete, self.athletes[0])
+
+    def test_admin_delete_hides_instead_of_cascading(self):
+        self.add_result(self.athletes[0], '45.00')
+        self.client.force_login(User.objects.create_superuser('admin', password='x'))
+        url = reverse('admin:athletes_athlete_delete', args=[self.athletes[0].pk])
+        self.assertNotContains(self.client.get(url), '45.00')  # no cascade listed on the confirmation page
+        self.client.post(url, {'post': 'yes'})
+        self.client.post(reverse('admin:athletes_athlete_changelist'), {
+            'action': 'delete_selected', '_selected_action': [self.athletes[1].pk], 'post': 'yes',
+        })
+
+        self.assertTrue(Athlete.all_objects.get(pk=self.athletes[0].pk).is_deleted)
+        self.assertFalse(Athlete.all_objects.get(pk=self.athletes[1].pk).is_deleted)  # no delete_selected action
+        self.assertEqual(Results.objects.count(), 1)
+
+
+class AthleteMatchingTests(TestCase):
+    def athlete(self, first_name: str, last_name: str, gender: str = 'F', birth_date: date = date(2000, 3, 1)) -> Athlete:
+        return Athlete.objects.create(
+            first_name=first_name, last_name=last_name, nationality='Kenya', birth_date=birth_date, gender=gender
+        )
+
+    def test_fuzzy_match_within_the_block(self):
+        athlete = self.athlete('Faith', 'Kipyegon')
+        matcher = AthleteMatcher()
+        self.assertEqual(matcher.match('Kipyegon', 'Faith', date(2000, 3, 1), 'kenya'), athlete)  # swapped, other case
+        self.assertEqual(matcher.match('Faith', 'Kipyegonn', date(2000, 3, 1), 'Kenya', 'F'), athlete)
+        self.assertIsNone(matcher.match('Faith', 'Kipyegonn', date(2000, 3, 1), 'Kenya', 'M'))
+        self.assertIsNone(matcher.match('Faith', 'Kipyegon', date(2000, 3, 2), 'Kenya'))  # another block
+        self.assertIsNone(matcher.match('Mary', 'Moraa', date(2000, 3, 1), 'Kenya'))
+
+    def test_duplicate_groups(self):
+        keep = self.athlete('Faith', 'Kipyegon')
+        typo = self.athlete('Faith', 'Kipyegonn')
+        accent = self.athlete('Fáith', 'Kipyegon')
+        self.athlete('Faith', 'Kipyegon', gender='M')
+        self.athlete('Faith', 'Kipyegon', birth_date=date(2001, 3, 1))
+        self.athlete('Mary', 'Moraa')
+
+        self.assertEqual(AthleteMatcher().duplicate_groups(), [[keep, typo, accent]])
+
+    def test_merge_deletes_soft_deleted_duplicates(self):
+        keep = self.athlete('Faith', 'Kipyegon')
+        duplicate = self.athlete('Faith', 'Kipyegonn')
+        duplicate.soft_delete()
+        call_command('merge_athletes', keep.pk, duplicate.pk, stdout=StringIO())
+
+        self.assertFalse(Athlete.all_objects.filter(pk=duplicate.pk).exists())
+
+
+class HeadToHeadViewTests(ResultsTestCase):
+    def test_invalid_athlete_ids_are_rejected(self):
+        url = reverse('head_to_head')
+        athlete_id = self.athletes[0].pk
+        self.assertEqual(self.client.get(url, {'athlete': 'abc'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'athlete': 999999}).status_code, 404)
+        self.assertEqual(self.client.get(url, {'athlete': athlete_id, 'opponent': athlete_id}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'athlete': athlete_id}).status_code, 200)
+
+    def test_search_matches_every_word(self):
+        response = self.client.get(reverse('athlete_search'), {'q': 'runner2 test'})
+        self.assertEqual(response.json(), {'athletes': [{'id': self.athletes[2].pk, 'name': 'Runner2 Test'}]})
+
+
+class ScoringTests(ResultsTestCase):
+    def test_only_complete_sets_get_a_combined_total(self):
+        _, names = COMBINED_EVENTS['Heptathlon']
+        disciplines = [Discipline.objects.get_or_create(name=name)[0] for name in names]
+        with self.captureOnCommitCallbacks(execute=True):
+            load_default_coefficients()
+        complete, partial = [
+            Athlete.objects.create(
+                first_name=name, last_name='Multi', nationality='Poland', birth_date=date(1998, 3, 3), gender='F'
+            )
+            for name in ('Complete', 'Partial')
+        ]
+        for athlete, entered in ((complete, disciplines), (partial, disciplines[:3])):
+            for discipline in entered:
+                self.add_result(athlete, '12.00', discipline=discipline, age_category=None)
+
+        totals = list(combined_totals('Heptathlon'))
+        self.assertEqual([row['athlete'] for row in totals], [complete.pk])
+        self.assertEqual(totals[0]['events'], 7)
+
+    def test_coefficients_reload_when_the_shared_version_changes(self):
+        self.assertEqual(coefficients(), {})
+        # bulk_create sends no signals, like a change made by another process
+        ScoringCoefficient.objects.bulk_create([ScoringCoefficient(discipline=self.discipline, gender='M', a=1.5, b=82, c=1.8)])
+        self.assertEqual(coefficients(), {})
+        cache.set(COEFFICIENTS_VERSION_KEY, time.time_ns(), None)  # what clear_coefficients() there does on commit
+        self.assertIn((self.discipline.pk, 'M'), coefficients())
+
+
+    def test_changed_coefficients_rescore_their_results(self):
+        result = self.add_result(self.athletes[0], '45.00')
+        self.assertIsNone(result.points)
+        with self.captureOnCommitCallbacks(execute=True):
+            coefficient = ScoringCoefficient.objects.create(discipline=self.discipline, gender='M', a=1.53775, b=82, c=1.81)
+        result.refresh_from_db()
+        self.assertEqual(result.points, points_for(result))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            coefficient.a = 2
+            coefficient.save()
+        scored = result.points
+        result.refresh_from_db()
+        self.assertGreater(result.points, scored)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            coefficient.delete()
+        result.refresh_from_db()
+        self.assertIsNone(result.points)
+
+class SnapshotTests(ResultsTestCase):
+    def test_refresh_picks_up_rows_committed_out_of_id_order(self):
+        early = self.add_result(self.athletes[0], '45.00')
+        later = self.add_result(self.athletes[1], '45.50')
+        early_id = early.pk
+        early.delete()
+        snapshot = ResultsSnapshot.build()
+        self.assertEqual(snapshot.columns['id'].tolist(), [later.pk])
+
+        self.add_result(self.athletes[0], '45.00', id=early_id)  # an id taken before the last one seen, committed after it
+        self.assertEqual(snapshot.refresh(), 1)
+        self.assertEqual(sorted(snapshot.columns['id'].tolist()), [early_id, later.pk])
+
+    @override_settings(RESULTS_SNAPSHOT_ENABLED=True, RESULTS_SNAPSHOT_DIR=None)
+    def test_changes_in_any_process_rebuild_the_snapshot(self):
+        first = get_snapshot()
+        self.assertIs(get_snapshot(), first)
+        cache.set(SNAPSHOT_VERSION_KEY, time.time_ns(), None)  # what mark_stale() in another process does on commit
+        self.assertIsNot(get_snapshot(), first)
+
+
+    def test_published_snapshot_is_read_until_results_change(self):
+        result = self.add_result(self.athletes[0], '45.00')
+        with tempfile.TemporaryDirectory() as directory, \
+                override_settings(RESULTS_SNAPSHOT_ENABLED=True, RESULTS_SNAPSHOT_DIR=directory), \
+                mock.patch('records.snapshot.PUBLISHED_CHECK_SECONDS', 0):
+            version = publish_snapshot(directory)
+            self.assertEqual(get_snapshot().version, version)
+            self.assertEqual(get_snapshot().columns['id'].tolist(), [result.pk])
+            self.assertEqual(discipline_statistics(self.discipline)['count'], 1)
+
+            self.add_result(self.athletes[1], '46.00')  # a new row the published files do not have
+            self.assertIsNone(get_snapshot())
+            self.assertEqual(discipline_statistics(self.discipline)['count'], 2)  # from the database
+
+            publish_snapshot(directory)
+            self.assertEqual(len(get_snapshot()), 2)
+
+    @override_settings(RESULTS_SNAPSHOT_ENABLED=True, RESULTS_SNAPSHOT_DIR=None, RESULTS_SNAPSHOT_REFRESH_SECONDS=60)
+    def test_statistics_and_rankings_read_the_snapshot(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            load_default_coefficients()
+        results = [self.add_result(athlete, value) for athlete, value in zip(self.athletes, ('45.00', '46.00', '47.00'))]
+        self.athletes[0].soft_delete()
+        cache.set(SNAPSHOT_VERSION_KEY, time.time_ns(), None)
+        get_snapshot()
+
+        with self.assertNumQueries(0):  # on any database, PostgreSQL included
+            stats = discipline_statistics(self.discipline)
+        self.assertEqual((stats['count'], stats['min'], stats['max']), (3, 45.0, 47.0))
+
+        live = Results.objects.filter(athlete__deleted_at__isnull=True)
+        self.assertEqual(best_scored(live, 'M', 2024, limit=1), [results[1]])
+        self.assertEqual(best_scored(live, 'M', 2023), [])
+        with mock.patch('records.scoring.RANKING_CANDIDATE_MARGIN', 0):
+            self.assertEqual(best_scored(live, 'M', limit=1), [results[1]])  # the only candidate was filtered out
+
+        snapshot = get_snapshot()
+        with self.captureOnCommitCallbacks(execute=True):
+            rescore()
+        self.assertIsNot(get_snapshot(), snapshot)  # the rescored points are read again
+
+
+class AgeCategoryRevalidationTests(ResultsTestCase):
+    def test_results_move_only_to_age_groups_of_their_competition(self):
+        junior = AgeCategory.objects.create(name=AgeCategory.Name.UNDER_20, gender='M')
+        under_23 = AgeCategory.objects.create(name=AgeCategory.Name.UNDER_23, gender='M')
+        other = Competition.objects.create(
+            name='U23 Cup', country='Poland', city='Poznan',
+            start_date=date(2024, 8, 1), end_date=date(2024, 8, 1), category=self.category,
+        )
+        other.age_groups.add(under_23)
+        heat, _ = self.add_rounds()
+        movable = self.add_result(self.athletes[0], '45.00')
+        in_heat = self.add_result(self.athletes[1], '45.50', heat=heat)
+        no_fit = self.add_result(self.athletes[2], '46.00', competition=other, age_category=None)
+        Results.objects.filter(pk__in=[movable.pk, in_heat.pk, no_fit.pk]).update(age_category=junior)
+        Record.objects.filter(age_category=self.senior).delete()
+        for result in Results.objects.order_by('result_date', 'id'):
+            detect_records(result)  # the records they set in the category they no longer fit
+
+        with self.captureOnCommitCallbacks(execute=True):
+            rows = {row['id']: row for row in revalidate_age_categories(fix=True)}
+
+        self.assertEqual(rows[movable.pk]['fixed_category_id'], self.senior.pk)
+        self.assertIn('skipped', rows[in_heat.pk])
+        self.assertIn('skipped', rows[no_fit.pk])
+        self.assertEqual(
+            dict(Results.objects.values_list('id', 'age_category_id')),
+            {movable.pk: self.senior.pk, in_heat.pk: junior.pk, no_fit.pk: junior.pk},
+        )
+        # the moved result holds the senior records now, the junior ones went to the next best
+        self.assertEqual(Record.objects.filter(age_category=self.senior, is_current=True, result=movable).count(), 3)
+        self.assertFalse(Record.objects.filter(age_category=junior, result=movable).exists())
+        self.assertEqual(
+            Record.objects.get(age_category=junior, scope=Record.Scope.WORLD, is_current=True).result_id, in_heat.pk
+        )
@@ -1,6 +1,14 @@
 from django.urls import path
-from records.views import results
+from records.views import results, export_results, records_list, head_to_head, athlete_search, rankings, club_rankings, statistics, bulk_entry
 
 urlpatterns = [
-    path("", results, name='results')
+    path("", results, name='results'),
+    path("export/<str:export_format>/", export_results, name='export_results'),
+    path("records/", records_list, name='records_list'),
+    path("head-to-head/", head_to_head, name='head_to_head'),
+    path("head-to-head/athletes/", athlete_search, name='athlete_search'),
+    path("rankings/", rankings, name='rankings'),
+    path("clubs/", club_rankings, name='club_rankings'),
+    path("statistics/", statistics, name='results_statistics'),
+    path("bulk-entry/<int:competition_id>/<int:discipline_id>/", bulk_entry, name='bulk_entry'),
 ]
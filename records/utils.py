@@ -0,0 +1,112 @@
+import time
+from threading import local
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Q
+from athletes.models import Discipline
+from .models import Results, Heat
+
+# per thread: the commit callback last queued for each task, see schedule()
+_queued = local()
+
+# part of every cached results page key, so changing it drops them all at once
+RESULTS_VERSION_KEY = 'results-version'
+
+
+def deciding_round():
+    """
+    Results that decide an event: those without a heat, and those of a round no later round
+    follows (the final, or the last round held so far). Heats and semis are left out, so an
+    athlete is counted once per event.
+    """
+    return Q(heat__isnull=True) | Q(heat__round__next_round__isnull=True)
+
+
+def rerank_partition(competition_id: int, discipline_id: int, age_category_id: int | None, lower_is_better: bool) -> None:
+    """
+    Recompute `position` for one (competition, discipline, age category) with a single
+    window-function UPDATE. Every round is ranked on its own, results without a heat together.
+    Equal marks share a place and the next place is skipped (1, 2, 2, 4).
+    """
+    table = connection.ops.quote_name(Results._meta.db_table)
+    heat_table = connection.ops.quote_name(Heat._meta.db_table)
+    order = 'ASC' if lower_is_better else 'DESC'
+    params = [competition_id, discipline_id]
+    if age_category_id is None:
+        category_filter = 'r.age_category_id IS NULL'
+    else:
+        category_filter = 'r.age_category_id = %s'
+        params.append(age_category_id)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE {table} SET position = ranked.place
+            FROM (
+                SELECT r.id, RANK() OVER (PARTITION BY h.round_id ORDER BY r.result_value {order}) AS place
+                FROM {table} r
+                LEFT JOIN {heat_table} h ON h.id = r.heat_id
+                WHERE r.competition_id = %s AND r.discipline_id = %s AND {category_filter}
+            ) AS ranked
+            WHERE {table}.id = ranked.id AND {table}.position <> ranked.place
+            """,
+            params
+        )
+
+
+def rerank_partitions(partitions) -> None:
+    partitions = set(partitions)
+    disciplines = Discipline.objects.in_bulk({discipline_id for _, discipline_id, _ in partitions})
+    for competition_id, discipline_id, age_category_id in partitions:
+        discipline = disciplines.get(discipline_id)
+        if discipline is not None:
+            rerank_partition(competition_id, discipline_id, age_category_id, discipline.is_timed)
+
+
+def schedule(task, items) -> None:
+    """
+    Collect items for task and call task(items) once the current transaction commits (immediately
+    in autocommit). Items touched several times in one transaction, e.g. by a cascade delete,
+    are handled once. Items scheduled in a block that rolls back are dropped with it.
+    """
+    if connection.in_atomic_block:
+        # join the task's callback of the same (savepoint) block, so they are discarded together on a rollback;
+        # a rollback or commit removes it from run_on_commit, so a remembered callback no longer found there is not reused
+        savepoint_ids = tuple(connection.savepoint_ids)
+        queued = _queued.__dict__.setdefault('callbacks', {})
+        index, callback_savepoint_ids, callback = queued.get(task, (None, None, None))
+        if (callback_savepoint_ids == savepoint_ids and index < len(connection.run_on_commit)
+                and connection.run_on_commit[index][1] is callback and not callback.done):
+            callback.items.update(items)
+            return
+        callback = _Scheduled(task, items)
+        queued[task] = (len(connection.run_on_commit), savepoint_ids, callback)
+        transaction.on_commit(callback)
+    else:
+        transaction.on_commit(_Scheduled(task, items))
+
+
+class _Scheduled:
+    # the commit callback of a task in one atomic block, holding that block's items
+    def __init__(self, task, items):
+        self.task = task
+        self.items = set(items)
+        self.done = False
+
+    def __call__(self) -> None:
+        self.done = True
+        if self.items:
+            self.task(self.items)
+
+
+def schedule_rerank(partitions) -> None:
+    schedule(rerank_partitions, partitions)
+
+
+def results_version() -> int:
+    return cache.get_or_set(RESULTS_VERSION_KEY, 0, None)
+
+
+def bump_results_version() -> None:
+    # after commit, and after the reranks scheduled before it, so no page is cached from half-updated rows
+    transaction.on_commit(lambda: cache.set(RESULTS_VERSION_KEY, time.time_ns(), None))
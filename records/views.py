@@ -1,36 +1,274 @@
-from django.http import HttpRequest, HttpResponse
-from django.shortcuts import render
+import hashlib
+from datetime import MAXYEAR, MINYEAR
+from django.conf import settings
+from django.core.exceptions import BadRequest
+from django.db.models import F, Q
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse, JsonResponse, Http404
+from django.shortcuts import render, redirect, get_object_or_404
 from django.template.loader import render_to_string # Added
-from .models import Results
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from athletes.models import Athlete, Discipline
+from common.compression import cached_compressed, compressed_response
+from common.ratelimit import rate_limit
+from common.utils import attach_formatted_dates
+from competitions.models import Competition
+from .archive import archived_seasons, is_archived
+from .clubs import club_rankings as compute_club_rankings
+from .exports import export_rows, iter_csv, iter_jsonl, iter_columnar, COLUMNAR_CONTENT_TYPE
+from .forms import BulkResultsFormSet
+from .head_to_head import meetings, rivals
+from .scoring import best_scored, combined_totals, COMBINED_EVENTS
+from .statistics import discipline_statistics, share_beaten
+from .models import Results, ArchivedResult, Record, ClubStanding
+from .utils import results_version
 
 # Create your views here.
+def filter_results(queryset, selected_year: int | None, selected_competition_name: str | None):
+    # results of soft-deleted athletes and competitions are kept but not listed
+    queryset = queryset.filter(athlete__deleted_at__isnull=True, competition__deleted_at__isnull=True)
+    if selected_year:
+        queryset = queryset.filter(result_date__year=selected_year)
+
+    if selected_competition_name:
+        queryset = queryset.filter(competition__name__icontains=selected_competition_name)
+    return queryset
+
+
+def results_source(selected_year: int | None):
+    # an archived season is read from the archive, everything else from the hot table
+    if selected_year and is_archived(selected_year):
+        return ArchivedResult.objects.all()
+    return Results.objects.all()
+
+
+def year_param(request: HttpRequest) -> int | None:
+    # ?year= as a number, 400 when it is not one
+    if not request.GET.get('year'):
+        return None
+    try:
+        year = int(request.GET['year'])
+    except ValueError:
+        raise BadRequest('year must be a number.')
+    if not MINYEAR <= year <= MAXYEAR:  # the year lookup builds dates from it
+        raise BadRequest('year is out of range.')
+    return year
+
+
+def add_display_values(results: list[Results]) -> list[Results]:
+    # per-row values are computed here once instead of by template filters on every row
+    for r in results:
+        r.unit = 's' if r.discipline.is_timed else 'm'
+    attach_formatted_dates(results, 'result_date', 'result_date_display', 'd M Y')
+    return results
+
+
+@rate_limit('results')  # the filter input fires a request per typing pause
 def results(request: HttpRequest) -> HttpResponse:
-    all_results = Results.objects.all()
+    selected_year = year_param(request)
+    selected_competition_name = (request.GET.get('competition_name') or '').strip() or None
+    partial = request.headers.get('x-requested-with') == 'XMLHttpRequest'
 
-    selected_year = request.GET.get('year')
-    selected_competition_name = request.GET.get('competition_name')
+    def render_page() -> str:
+        all_results = list(
+            filter_results(results_source(selected_year), selected_year, selected_competition_name)
+            .select_related('athlete', 'competition', 'discipline')
+        )
+        context = {
+            'results': add_display_values(all_results),
+            # all years with results, hot and archived
+            'years': sorted({d.year for d in Results.objects.dates('result_date', 'year')} | set(archived_seasons())),
+            'selected_year': selected_year,
+            'selected_competition_name': selected_competition_name,
+        }
+        # an AJAX request gets only the partial HTML, a regular one the full page
+        template_name = 'records/_results_partial.html' if partial else 'records/list.html'
+        return render_to_string(template_name, context, request=request)
 
-    if selected_year:
-        all_results = all_results.filter(result_date__year=selected_year)
-    
-    if selected_competition_name:
-        all_results = all_results.filter(competition__name__icontains=selected_competition_name)
+    # the page is the same for every visitor, so it is rendered and compressed once per filter;
+    # the partial only holds the table and the name filter is case-insensitive, so "Berl" and "berl" share it
+    name_filter = selected_competition_name.lower() if partial and selected_competition_name else selected_competition_name
+    filters = hashlib.md5(f'{selected_year}|{name_filter}'.encode()).hexdigest()
+    key = f'results-page:{results_version()}:{"partial" if partial else "full"}:{filters}'
+    timeout = settings.RESULTS_FILTER_CACHE_SECONDS if selected_competition_name else settings.RESULTS_PAGE_CACHE_SECONDS
+    response = compressed_response(request, cached_compressed(key, render_page, timeout))
+    patch_vary_headers(response, ('X-Requested-With',))  # the page and the partial share a URL
+    if partial:
+        patch_cache_control(response, private=True, max_age=settings.RESULTS_FILTER_CACHE_SECONDS)
+    return response
+
+
+EXPORT_FORMATS = {
+    'csv': (iter_csv, 'text/csv; charset=utf-8', 'results.csv'),
+    'jsonl': (iter_jsonl, 'application/x-ndjson', 'results.jsonl'),
+    'columnar': (iter_columnar, COLUMNAR_CONTENT_TYPE, 'results.athcol'),
+}
+
+
+@rate_limit('export')  # each export streams the whole table
+def export_results(request: HttpRequest, export_format: str) -> StreamingHttpResponse:
+    if export_format not in EXPORT_FORMATS:
+        raise Http404('Unknown export format.')
+    encoder, content_type, filename = EXPORT_FORMATS[export_format]
+
+    selected_year = year_param(request)
+    queryset = filter_results(results_source(selected_year), selected_year, request.GET.get('competition_name'))
+    if queryset.model is ArchivedResult:
+        queryset = queryset.annotate(id=F('result_id'))  # exported under the id it had in Results
+    response = StreamingHttpResponse(encoder(export_rows(queryset)), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
 
-    for r in all_results:
-        r.unit = 's' if r.discipline.name[0].isdigit() else 'm'
 
+def records_list(request: HttpRequest) -> HttpResponse:
+    selected_scope = request.GET.get('scope') or Record.Scope.WORLD
+    current_records = (
+        Record.objects
+        .filter(is_current=True, scope=selected_scope)
+        .select_related('discipline', 'age_category', 'athlete', 'competition')
+    )
     context = {
-        'results': all_results,
-        'years': sorted({r.result_date.year for r in Results.objects.all()}), # Get all years from all results
-        'selected_year': int(selected_year) if selected_year else None,
-        'selected_competition_name': selected_competition_name,
-        'competitions': {r.competition for r in Results.objects.all()} # Get all competitions from all results
+        'records': current_records,
+        'scopes': Record.Scope.choices,
+        'selected_scope': selected_scope,
     }
+    return render(request, 'records/records.html', context)
+
+
+ATHLETE_SEARCH_LIMIT = 20
+
+
+def athlete_param(request: HttpRequest, name: str) -> Athlete | None:
+    # an athlete id from the query string: 400 when it is not a number, 404 when there is no such athlete
+    if not request.GET.get(name):
+        return None
+    try:
+        athlete_id = int(request.GET[name])
+    except ValueError:
+        raise BadRequest(f'{name} must be an athlete id.')
+    return get_object_or_404(Athlete, pk=athlete_id)
+
+
+def head_to_head(request: HttpRequest) -> HttpResponse:
+    athlete = athlete_param(request, 'athlete')
+    opponent = athlete_param(request, 'opponent')
+    athlete_meetings = []
+    if athlete and opponent:
+        if athlete.pk == opponent.pk:
+            raise BadRequest('Pick two different athletes.')
+        athlete_meetings = meetings(athlete.pk, opponent.pk)
 
-    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
-        # If it's an AJAX request, return only the rendered partial HTML
-        html = render_to_string('records/_results_partial.html', context, request=request)
-        return HttpResponse(html)
-    else:
-        # For a regular request, render the full page
-        return render(request, 'records/list.html', context)
\ No newline at end of file
+    winners = [meeting.winner for meeting in athlete_meetings]
+    context = {
+        'athlete': athlete,
+        'opponent': opponent,
+        'meetings': athlete_meetings,
+        'athlete_wins': winners.count('athlete'),
+        'opponent_wins': winners.count('opponent'),
+        'ties': winners.count(None),
+        'rivals': rivals(athlete) if athlete and not opponent else [],
+    }
+    return render(request, 'records/head_to_head.html', context)
+
+
+def athlete_search(request: HttpRequest) -> JsonResponse:
+    """
+    Athletes whose first or last name contains every word of ?q=, for the head-to-head pickers.
+    """
+    words = (request.GET.get('q') or '').split()
+    if not words:
+        return JsonResponse({'athletes': []})
+    athletes = Athlete.objects.only('id', 'first_name', 'last_name').order_by('last_name', 'first_name')
+    for word in words:
+        athletes = athletes.filter(Q(first_name__icontains=word) | Q(last_name__icontains=word))
+    return JsonResponse({
+        'athletes': [{'id': athlete.pk, 'name': str(athlete)} for athlete in athletes[:ATHLETE_SEARCH_LIMIT]],
+    })
+
+
+def rankings(request: HttpRequest) -> HttpResponse:
+    selected_gender = request.GET.get('gender') or 'M'
+    selected_year = year_param(request)
+    selected_event = request.GET.get('event')
+
+    scored = filter_results(Results.objects.filter(points__isnull=False), selected_year, None)
+    top_results = best_scored(
+        scored.select_related('athlete', 'competition', 'discipline'), selected_gender, selected_year
+    )
+
+    context = {
+        'results': top_results,
+        'combined': combined_totals(selected_event, scored)[:50] if selected_event in COMBINED_EVENTS else [],
+        'events': COMBINED_EVENTS,
+        'years': Results.objects.dates('result_date', 'year', order='DESC'),
+        'selected_gender': selected_gender,
+        'selected_year': selected_year,
+        'selected_event': selected_event,
+    }
+    return render(request, 'records/rankings.html', context)
+
+
+def club_rankings(request: HttpRequest) -> HttpResponse:
+    try:
+        selected_season = int(request.GET['season']) if request.GET.get('season') else None
+        selected_competition = int(request.GET['competition']) if request.GET.get('competition') else None
+    except ValueError:
+        selected_season = selected_competition = None
+
+    context = {
+        'clubs': compute_club_rankings(selected_season, selected_competition),
+        'seasons': ClubStanding.objects.values_list('season', flat=True).distinct().order_by('-season'),
+        'competitions': Competition.objects.filter(club_standings__isnull=False).distinct().order_by('-start_date'),
+        'selected_season': selected_season,
+        'selected_competition': selected_competition,
+    }
+    return render(request, 'records/club_rankings.html', context)
+
+
+def statistics(request: HttpRequest) -> JsonResponse:
+    """
+    Mark distribution of a discipline, optionally narrowed to an age category, season and gender.
+    With ?value=10.90 the response also says which share of those marks the value beats.
+    """
+    try:
+        discipline = Discipline.objects.get(pk=int(request.GET['discipline']))
+        age_category_id = int(request.GET['age_category']) if request.GET.get('age_category') else None
+        season = int(request.GET['season']) if request.GET.get('season') else None
+        value = float(request.GET['value']) if request.GET.get('value') else None
+    except (KeyError, ValueError, Discipline.DoesNotExist):
+        return JsonResponse({'error': 'Pass an existing discipline id and numeric filters.'}, status=400)
+    gender = request.GET.get('gender') or None
+
+    stats = discipline_statistics(discipline, age_category_id, season, gender)
+    response = {
+        'discipline': discipline.name,
+        'age_category': age_category_id,
+        'season': season,
+        'gender': gender,
+        **stats,
+    }
+    if value is not None:
+        beaten = share_beaten(stats, value)
+        response['value'] = value
+        response['beats'] = beaten
+        response['top_percent'] = round((1 - beaten) * 100, 1) if beaten is not None else None
+    return JsonResponse(response)
+
+
+@staff_member_required
+def bulk_entry(request: HttpRequest, competition_id: int, discipline_id: int) -> HttpResponse:
+    competition = get_object_or_404(Competition, pk=competition_id)
+    discipline = get_object_or_404(Discipline, pk=discipline_id)
+    if request.method == "POST":
+        formset = BulkResultsFormSet(request.POST, competition=competition, discipline=discipline)
+        if formset.is_valid():
+            formset.save()
+            return redirect('results')
+    else:  # load an empty heat sheet if request is "GET"
+        formset = BulkResultsFormSet(competition=competition, discipline=discipline)
+    context = {
+        'formset': formset,
+        'competition': competition,
+        'discipline': discipline,
+    }
+    return render(request, 'records/bulk_entry.html', context)